@@ -0,0 +1,150 @@
+"""
+Benchmark: cross-request encode batching under concurrency.
+
+    python benchmarks/bench_encode_batching.py --concurrency 1,4,16,64
+    python benchmarks/bench_encode_batching.py --encoder minilm   # needs sentence-transformers
+
+Threads act as concurrent pipeline requests, each embedding a few uncached
+texts through SemanticMatcher.embed, with and without a shared EncodeBatcher.
+Reports requests per second, p50/p99 latency per request and the merged batch
+sizes achieved. The default `sim` encoder is the stub encoder behind a lock
+with a fixed per-call cost plus a per-text cost (--call-ms, --text-ms), the
+shape of a CPU transformer forward pass that saturates the cores.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from benchmarks.stub_encoder import StubEncoder  # noqa: E402
+from benchmarks.synthetic import synthetic_resumes  # noqa: E402
+from services.encode_batcher import EncodeBatcher  # noqa: E402
+from services.model_manager import ModelManager  # noqa: E402
+from services.semantic_matcher import SemanticMatcher  # noqa: E402
+
+
+class SimulatedEncoder:
+    """Stub embeddings with a serialized call_ms + text_ms * len(texts) cost per encode call."""
+
+    def __init__(self, call_ms: float, text_ms: float):
+        self.inner = StubEncoder()
+        self.call_seconds = call_ms / 1000.0
+        self.text_seconds = text_ms / 1000.0
+        self._lock = threading.Lock()
+
+    def encode(self, texts, **kwargs):
+        with self._lock:
+            time.sleep(self.call_seconds + self.text_seconds * len(texts))
+            return self.inner.encode(texts)
+
+
+def load_encoder(args):
+    if args.encoder == "sim":
+        return SimulatedEncoder(args.call_ms, args.text_ms)
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer("all-MiniLM-L6-v2")
+
+
+def percentile(values, q: float) -> float:
+    return round(float(np.percentile(values, q)) * 1000.0, 3)
+
+
+def run(encoder, texts, concurrency: int, requests: int, per_request: int, batching: bool, max_batch: int, wait_ms: float) -> dict:
+    manager = ModelManager("bench")
+    manager.use_model(encoder)
+    batcher = EncodeBatcher(manager.get, max_batch=max_batch, max_wait_ms=wait_ms) if batching else None
+    matcher = SemanticMatcher(model_manager=manager, batcher=batcher)
+    latencies = []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            # Distinct texts per request so nothing is deduplicated across callers.
+            batch = [f"{texts[(i * per_request + j) % len(texts)]} #{i}" for j in range(per_request)]
+            started = time.perf_counter()
+            matcher.embed(batch)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    out = {
+        "requests_per_second": round(len(latencies) / wall, 1),
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+    }
+    if batcher is not None:
+        sizes = batcher.stats()
+        out["batches"] = sizes["batches"]
+        out["mean_requests_per_batch"] = round(sizes["requests"] / max(sizes["batches"], 1), 2)
+        out["merged_batch_texts"] = {
+            f"le_{bound}": count
+            for bound, count in zip(
+                batcher.batch_texts.buckets,
+                next(iter(batcher.batch_texts._series.values()), []),
+            )
+            if count
+        }
+        batcher.close()
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Encode batching benchmark")
+    parser.add_argument("--encoder", choices=["sim", "minilm"], default="sim")
+    parser.add_argument("--call-ms", type=float, default=3.0)
+    parser.add_argument("--text-ms", type=float, default=0.3)
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--texts-per-request", type=int, default=4)
+    parser.add_argument("--max-batch", type=int, default=128)
+    parser.add_argument("--wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    try:
+        encoder = load_encoder(args)
+    except Exception as e:
+        print(json.dumps({"encoder": args.encoder, "skipped": f"{type(e).__name__}: {e}"}))
+        return
+
+    texts = synthetic_resumes(200, seed=5)
+    results = {}
+    for concurrency in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+        results[str(concurrency)] = {
+            mode: run(
+                encoder, texts, concurrency, args.requests, args.texts_per_request,
+                mode == "batched", args.max_batch, args.wait_ms,
+            )
+            for mode in ("direct", "batched")
+        }
+    print(json.dumps({
+        "encoder": args.encoder,
+        "requests": args.requests,
+        "texts_per_request": args.texts_per_request,
+        "max_batch": args.max_batch,
+        "wait_ms": args.wait_ms,
+        "concurrency": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark: sentence encoder backends (PyTorch reference vs ONNX Runtime fp32 / int8).
+
+    python benchmarks/bench_encoder_backends.py --count 256 --check
+    python benchmarks/bench_encoder_backends.py --backends torch,onnx-int8 --threads 4
+
+For each backend reports the load time (the first ONNX load includes the export
+and quantization into --onnx-dir), encode throughput over synthetic resumes and
+job descriptions, and parity with the torch reference: per-text cosine between
+the two backends' embeddings, the largest deviation of resume/job similarity
+scores (0-1 scale) and top-10 overlap of every job's resume ranking. --check
+exits 1 when a backend's score deviation exceeds --tolerance. Backends whose
+dependencies are missing are reported as skipped.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from benchmarks.synthetic import synthetic_job, synthetic_resumes  # noqa: E402
+from services.encoder_backends import BACKENDS, load_encoder, parity_report  # noqa: E402
+from services.semantic_matcher import SemanticMatcher  # noqa: E402
+
+
+def normalized(emb) -> np.ndarray:
+    emb = np.asarray(emb, dtype=np.float32)
+    return emb / np.maximum(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12)
+
+
+def top10_overlap(reference: np.ndarray, candidate: np.ndarray, resumes: int) -> float:
+    """Mean top-10 overlap of each job's resume ranking (jobs follow the resumes in the arrays)."""
+    ref_scores = reference[resumes:] @ reference[:resumes].T
+    cand_scores = candidate[resumes:] @ candidate[:resumes].T
+    k = min(10, resumes)
+    overlaps = [
+        len(set(np.argsort(-r)[:k].tolist()) & set(np.argsort(-c)[:k].tolist())) / float(k)
+        for r, c in zip(ref_scores, cand_scores)
+    ]
+    return float(np.mean(overlaps))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Encoder backend benchmark")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--model", default=SemanticMatcher.MODEL_NAME)
+    parser.add_argument("--onnx-dir", default=os.path.join("data", "onnx"))
+    parser.add_argument("--threads", type=int, default=0, help="ONNX Runtime intra-op threads (0 = default)")
+    parser.add_argument("--count", type=int, default=256, help="resumes")
+    parser.add_argument("--jobs", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=SemanticMatcher.ENCODE_BATCH_SIZE)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.02, help="max similarity score deviation from torch")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--seed", type=int, default=31)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    resumes = synthetic_resumes(args.count, seed=args.seed)
+    jobs = [synthetic_job(rng)["job_description"] for _ in range(args.jobs)]
+    texts = resumes + jobs
+    pairs = [(r, len(resumes) + j) for r in range(len(resumes)) for j in range(len(jobs))]
+    chars = sum(len(t) for t in texts)
+
+    results = {}
+    vectors = {}
+    for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        started = time.perf_counter()
+        try:
+            encoder = load_encoder(backend, args.model, args.onnx_dir, args.threads)
+            encoder.encode(["warmup"])
+        except Exception as e:
+            results[backend] = {"skipped": f"{type(e).__name__}: {e}"}
+            continue
+        load_seconds = time.perf_counter() - started
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            emb = encoder.encode(texts, batch_size=args.batch_size)
+            best = min(best, time.perf_counter() - started)
+        vectors[backend] = normalized(emb)
+        results[backend] = {
+            "load_seconds": round(load_seconds, 2),
+            "texts_per_second": round(len(texts) / best, 1),
+            "chars_per_second": round(chars / best, 1),
+        }
+
+    failures = []
+    reference = vectors.get("torch")
+    for backend, emb in vectors.items():
+        if backend == "torch":
+            continue
+        if reference is None:
+            results[backend]["parity"] = "skipped: torch reference unavailable"
+            continue
+        report = {key: round(value, 6) for key, value in parity_report(reference, emb, pairs).items()}
+        report["top10_overlap"] = round(top10_overlap(reference, emb, len(resumes)), 4)
+        report["within_tolerance"] = report["max_score_delta"] <= args.tolerance
+        results[backend]["parity"] = report
+        results[backend]["speedup_vs_torch"] = round(
+            results[backend]["texts_per_second"] / results["torch"]["texts_per_second"], 2
+        )
+        if not report["within_tolerance"]:
+            failures.append(backend)
+
+    print(json.dumps({
+        "model": args.model,
+        "texts": len(texts),
+        "batch_size": args.batch_size,
+        "tolerance": args.tolerance,
+        "backends": results,
+        "parity_failures": failures,
+    }, indent=2))
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark: keyword-stuffing penalty on adversarial long resumes.
+
+    python benchmarks/bench_keyword_stuffing.py --tokens 50000
+    python benchmarks/bench_keyword_stuffing.py --skills vocabulary   # every skill the parser knows
+
+Each document is scored by ScoringEngine.calculate_keyword_stuffing_penalty and
+by the previous skills x vocabulary substring scan (kept here as the reference);
+penalties must match and timings are reported per document, plus the mean cost
+on 10k ordinary synthetic resumes.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import SKILLS, synthetic_resumes  # noqa: E402
+from services.scoring_engine import ScoringEngine  # noqa: E402
+from services.skill_normalizer import SkillNormalizer  # noqa: E402
+
+
+def reference_penalty(resume_text: str, normalized_resume_skills: List[str]) -> float:
+    """Previous implementation: every skill tested against every distinct token."""
+    text = (resume_text or "").lower()
+    if not text:
+        return 0.0
+    tokens = re.findall(r"[a-zA-Z0-9\+\.#]+", text)
+    total_tokens = len(tokens)
+    if total_tokens == 0:
+        return 0.0
+    token_counts = Counter(tokens)
+    unique_ratio = len(set(tokens)) / max(total_tokens, 1)
+    max_freq = max(token_counts.values()) if token_counts else 0
+    spam_suspect = (total_tokens >= 2200 and unique_ratio < 0.12) or (
+        total_tokens >= 1400 and max_freq >= max(25, int(0.04 * total_tokens))
+    )
+    if not spam_suspect:
+        return 0.0
+    repetition_penalty = 0.0
+    for skill in normalized_resume_skills or []:
+        key = skill.lower().replace(" ", "")
+        if not key:
+            continue
+        occurrences = sum(c for t, c in token_counts.items() if key in t.replace(".", ""))
+        ratio = occurrences / total_tokens
+        if ratio > 0.10:
+            repetition_penalty += min(0.025, (ratio - 0.10) * 0.5)
+    return float(min(0.06, max(0.0, repetition_penalty)))
+
+
+def adversarial_documents(tokens: int, seed: int) -> Dict[str, str]:
+    rng = random.Random(seed)
+    skills = [s.lower() for s in SKILLS]
+    return {
+        # Classic spam: a handful of skills repeated over and over.
+        "repeated_skills": " ".join(rng.choice(skills[:6]) for _ in range(tokens)),
+        # Huge vocabulary of near-duplicate tokens embedding skill names, plus a spike that
+        # marks the document as spam so every variant must be matched against every skill.
+        "skill_variants": " ".join(
+            "java" if i % 10 == 0 else f"{rng.choice(skills).replace(' ', '')}{rng.randint(0, 10**6)}.v{rng.randint(0, 99)}"
+            for i in range(tokens)
+        ),
+        # Mostly distinct junk with one skill spammed often enough to trip max_freq.
+        "junk_with_spike": " ".join(
+            "python" if i % 20 == 0 else f"w{rng.getrandbits(40):x}" for i in range(tokens)
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Keyword-stuffing penalty benchmark")
+    parser.add_argument("--tokens", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=5)
+    parser.add_argument(
+        "--skills", choices=["synthetic", "vocabulary"], default="synthetic",
+        help="resume skills to score: the synthetic generator's, or the whole parser vocabulary",
+    )
+    args = parser.parse_args()
+
+    engine = ScoringEngine()
+    normalizer = SkillNormalizer()
+    if args.skills == "vocabulary":
+        skills = sorted({normalizer.normalize_skill(term) for term in SkillNormalizer.SKILL_TERMS})
+    else:
+        skills = normalizer.normalize_skills(SKILLS)
+    results = {}
+    for name, text in adversarial_documents(args.tokens, args.seed).items():
+        timings = {}
+        penalties = {}
+        for label, fn in (
+            ("indexed", engine.calculate_keyword_stuffing_penalty),
+            ("reference", reference_penalty),
+        ):
+            best = float("inf")
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                penalties[label] = fn(text, skills)
+                best = min(best, time.perf_counter() - started)
+            timings[label] = round(best * 1000.0, 2)
+        results[name] = {
+            "penalty": penalties["indexed"],
+            "matches_reference": penalties["indexed"] == penalties["reference"],
+            "indexed_ms": timings["indexed"],
+            "reference_ms": timings["reference"],
+            "speedup": round(timings["reference"] / max(timings["indexed"], 1e-6), 1),
+        }
+
+    # Typical resumes are far below the spam threshold and should cost next to nothing.
+    typical = synthetic_resumes(10000, seed=args.seed)
+    typical_us = {}
+    for label, fn in (
+        ("indexed", engine.calculate_keyword_stuffing_penalty),
+        ("reference", reference_penalty),
+    ):
+        started = time.perf_counter()
+        for text in typical:
+            fn(text, skills)
+        typical_us[label] = round((time.perf_counter() - started) / len(typical) * 1e6, 2)
+
+    print(json.dumps({
+        "tokens": args.tokens,
+        "skills": len(skills),
+        "documents": results,
+        "typical_resume_us": typical_us,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
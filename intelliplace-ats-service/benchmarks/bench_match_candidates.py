@@ -0,0 +1,139 @@
+"""
+Benchmark: reverse matching (job -> top-K indexed resumes).
+
+    python benchmarks/bench_match_candidates.py --count 20000 --queries 50 --dtype float32
+
+Embeds synthetic resumes with the stub encoder into a ResumeIndex and reports,
+per job query: the exact blockwise scan, the IVF search (build time, latency
+and recall@K against the exact scan), the worst stats() and exact-search
+latency from another thread while the IVF is rebuilt, and the per-pair
+SemanticMatcher.compute_similarity loop it replaces, measured on a sample and
+extrapolated to the whole pool (cold = resumes not cached yet, warm = every
+resume embedding already in the embedding cache).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from benchmarks.stub_encoder import StubEncoder  # noqa: E402
+from benchmarks.synthetic import synthetic_job, synthetic_resumes  # noqa: E402
+from services.embedding_store import EmbeddingStore  # noqa: E402
+from services.model_manager import ModelManager  # noqa: E402
+from services.resume_index import ResumeIndex  # noqa: E402
+from services.semantic_matcher import SemanticMatcher  # noqa: E402
+
+
+def per_pair_us(resumes, job_description: str, sample: int) -> dict:
+    manager = ModelManager("stub")
+    manager.use_model(StubEncoder())
+    matcher = SemanticMatcher(
+        embedding_store=EmbeddingStore("stub", memory_items=len(resumes) + 16),
+        model_manager=manager,
+    )
+    picked = resumes[:sample]
+    timings = {}
+    for label in ("cold", "warm"):
+        started = time.perf_counter()
+        for text in picked:
+            matcher.compute_similarity(text, job_description)
+        timings[label] = (time.perf_counter() - started) / len(picked) * 1e6
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reverse matching benchmark")
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--dtype", choices=["float32", "float16", "int8"], default="float32")
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--pair-sample", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=17)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    encoder = StubEncoder()
+    resumes = synthetic_resumes(args.count, seed=args.seed)
+    jobs = [synthetic_job(rng)["job_description"] for _ in range(args.queries)]
+
+    def embed(texts):
+        emb = np.asarray(encoder.encode(texts), dtype=np.float32)
+        return emb / np.maximum(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12)
+
+    started = time.perf_counter()
+    vectors = embed([text.strip()[:SemanticMatcher.MAX_CHARS] for text in resumes])
+    queries = embed(jobs)
+    encode_seconds = time.perf_counter() - started
+
+    index = ResumeIndex(":memory:", namespace="stub", dtype=args.dtype, ivf_min_items=0, nprobe=args.nprobe)
+    started = time.perf_counter()
+    for start in range(0, len(vectors), 1000):
+        index.upsert_many((i, vectors[i], resumes[i]) for i in range(start, min(start + 1000, len(vectors))))
+    upsert_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    exact = [index.search(q, args.top_k, exact=True)[0] for q in queries]
+    exact_ms = (time.perf_counter() - started) / len(queries) * 1000.0
+
+    index.ivf_min_items = 1
+    started = time.perf_counter()
+    index.search(queries[0], args.top_k)  # builds the IVF lists
+    ivf_build_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    approx = [index.search(q, args.top_k) for q in queries]
+    ivf_ms = (time.perf_counter() - started) / len(queries) * 1000.0
+    recall = np.mean([
+        len({c for c, _ in e} & {c for c, _ in a[0]}) / max(1, len(e)) for e, a in zip(exact, approx)
+    ])
+
+    # Rebuild the IVF in a background search and time what other callers wait meanwhile.
+    index._ivf = None
+    builder = threading.Thread(target=index.search, args=(queries[0], args.top_k))
+    waits = {"stats": [], "exact_search": []}
+    builder.start()
+    while builder.is_alive():
+        for name, call in (("stats", index.stats), ("exact_search", lambda: index.search(queries[1], args.top_k, exact=True))):
+            started = time.perf_counter()
+            call()
+            waits[name].append((time.perf_counter() - started) * 1000.0)
+        time.sleep(0.005)
+    builder.join()
+
+    pair = per_pair_us(resumes, jobs[0], min(args.pair_sample, len(resumes)))
+    print(json.dumps({
+        "resumes": len(vectors),
+        "queries": len(queries),
+        "top_k": args.top_k,
+        "dtype": args.dtype,
+        "encode_seconds": round(encode_seconds, 2),
+        "index": {**index.stats(), "upsert_seconds": round(upsert_seconds, 3)},
+        "exact": {"ms_per_query": round(exact_ms, 3)},
+        "ivf": {
+            "build_seconds": round(ivf_build_seconds, 3),
+            "ms_per_query": round(ivf_ms, 3),
+            "scored_per_query": int(np.mean([a[2] for a in approx])),
+            "nprobe": args.nprobe,
+            f"recall_at_{args.top_k}": round(float(recall), 4),
+            "during_rebuild_max_ms": {name: round(max(w, default=0.0), 3) for name, w in waits.items()},
+        },
+        "per_pair_compute_similarity": {
+            "cold_us_per_pair": round(pair["cold"], 1),
+            "warm_us_per_pair": round(pair["warm"], 1),
+            "cold_ms_per_query_extrapolated": round(pair["cold"] * len(vectors) / 1000.0, 1),
+            "warm_ms_per_query_extrapolated": round(pair["warm"] * len(vectors) / 1000.0, 1),
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+ATS pipeline benchmark suite.
+
+    python benchmarks/bench_pipeline.py --encoder stub --output bench.json
+    python benchmarks/bench_pipeline.py --encoder stub --check benchmarks/thresholds.json
+    python benchmarks/bench_pipeline.py --encoder minilm    # needs sentence-transformers + model
+
+Runs entirely in-process on synthetic resumes and jobs:
+
+- stages: one /evaluate-resume pipeline at a time, timing each stage (parse,
+  job profile, encode, semantic similarity, skill normalization, skill evidence,
+  signals, scoring, stuffing penalty, filters, explanation); per-request
+  p50/p95/p99 in milliseconds. Stages are timed outermost-only, so nested calls
+  are not double counted and `other` is the untimed remainder.
+- batch: POST /evaluate-batch at each --batch-sizes, per-batch latency and
+  candidates per second.
+- concurrency: POST /evaluate-resume with --concurrency requests in flight
+  through the ASGI app (executor included), latency and requests per second.
+
+`--encoder stub` uses benchmarks/stub_encoder.py (deterministic, no network);
+`--encoder minilm` loads the real model through ModelManager. Embedding caches
+are disabled so every resume is encoded. With --check, results are compared to
+the thresholds file and the exit status is 1 on any regression.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+# Configure the service for an isolated, cache-free, offline run before importing it.
+os.environ.setdefault("ATS_EAGER_MODEL_LOAD", "0")
+os.environ.setdefault("ATS_EMBEDDING_CACHE_ITEMS", "0")
+os.environ.setdefault("ATS_PARSE_CACHE_ITEMS", "0")
+os.environ.setdefault("ATS_FEATURE_DB", ":memory:")
+os.environ.setdefault("ATS_RERANK_CACHE_DB", ":memory:")
+os.environ.setdefault("ATS_RESUME_INDEX_DB", ":memory:")
+os.environ.pop("GEMINI_API_KEY", None)
+
+import numpy as np  # noqa: E402
+
+from benchmarks.stub_encoder import StubEncoder  # noqa: E402
+from benchmarks.synthetic import synthetic_job, synthetic_resume  # noqa: E402
+
+STAGES = [
+    # (attribute owner path, attribute, stage)
+    ("resume_parser", "parse", "parse"),
+    ("", "_job_profile", "job_profile"),
+    ("semantic_matcher", "encode_views", "encode"),
+    ("", "_view_similarity", "semantic_similarity"),
+    ("skill_normalizer", "normalize_skills", "normalize"),
+    ("scoring_engine", "calculate_skill_match", "skill_evidence"),
+    ("", "text_coverage_score", "skill_evidence"),
+    ("", "blend_skill_match", "skill_evidence"),
+    ("", "competitive_signal_score", "signals"),
+    ("scoring_engine", "calculate_experience_score", "scoring"),
+    ("scoring_engine", "calculate_project_score", "scoring"),
+    ("scoring_engine", "calculate_education_match", "scoring"),
+    ("scoring_engine", "compute_final_score", "scoring"),
+    ("scoring_engine", "calculate_keyword_stuffing_penalty", "stuffing"),
+    ("scoring_engine", "apply_rule_based_filters", "filters"),
+    ("", "_explanation", "explanation"),
+]
+
+
+class StageTimer:
+    """Accumulates outermost-stage wall time per request on the calling thread."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def wrap(self, owner, attr: str, stage: str) -> None:
+        fn = getattr(owner, attr)
+        local = self._local
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            current = getattr(local, "current", None)
+            if current is None or getattr(local, "active", False):
+                return fn(*args, **kwargs)
+            local.active = True
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                current[stage] += time.perf_counter() - started
+                local.active = False
+
+        setattr(owner, attr, timed)
+
+    def run(self, fn: Callable, *args):
+        self._local.current = defaultdict(float)
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            total = time.perf_counter() - started
+            current = self._local.current
+            self._local.current = None
+            for stage, seconds in current.items():
+                self.samples[stage].append(seconds)
+            self.samples["other"].append(total - sum(current.values()))
+            self.samples["total"].append(total)
+
+
+def percentiles(seconds: List[float]) -> dict:
+    ms = np.asarray(seconds, dtype=np.float64) * 1000.0
+    if ms.size == 0:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": int(ms.size),
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+    }
+
+
+def candidate(rng: random.Random, index: int) -> dict:
+    return {
+        "candidate_id": index,
+        "resume_text": synthetic_resume(rng),
+        "candidate_cgpa": round(rng.uniform(5.0, 9.8), 2),
+        "candidate_backlogs": rng.choice([0, 0, 0, 1, 2]),
+    }
+
+
+def job_request(rng: random.Random) -> dict:
+    job = synthetic_job(rng)
+    job["min_cgpa"] = 6.0
+    job["allow_backlogs"] = rng.choice([True, False])
+    return job
+
+
+def install_encoder(main, encoder: str):
+    if encoder == "stub":
+        stub = StubEncoder()
+        main.model_manager.use_model(stub)
+        return stub, None
+    started = time.perf_counter()
+    if not main.model_manager.load(warmup=True):
+        raise RuntimeError(f"model failed to load: {main.model_manager.error}")
+    return main.model_manager.get(), time.perf_counter() - started
+
+
+def bench_stages(main, count: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    timer = StageTimer()
+    for owner_name, attr, stage in STAGES:
+        timer.wrap(getattr(main, owner_name) if owner_name else main, attr, stage)
+    jobs = [job_request(rng) for _ in range(4)]
+    for i in range(count):
+        payload = {**rng.choice(jobs), **candidate(rng, i)}
+        request = main.ResumeEvaluationRequest(**payload)
+        timer.run(main._evaluate_resume_sync, request)
+    total = sum(timer.samples["total"])
+    return {
+        "requests": count,
+        "throughput_per_s": round(count / total, 2) if total else None,
+        "stages": {stage: percentiles(samples) for stage, samples in sorted(timer.samples.items())},
+    }
+
+
+async def bench_http(main, count: int, batch_sizes: List[int], concurrency: List[int], seed: int) -> dict:
+    import httpx
+
+    rng = random.Random(seed)
+    transport = httpx.ASGITransport(app=main.app)
+    results = {"batch": {}, "concurrency": {}}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        for size in batch_sizes:
+            batches = max(1, count // size)
+            latencies = []
+            started = time.perf_counter()
+            for _ in range(batches):
+                body = {**job_request(rng), "candidates": [candidate(rng, i) for i in range(size)]}
+                t0 = time.perf_counter()
+                response = await client.post("/evaluate-batch", json=body)
+                latencies.append(time.perf_counter() - t0)
+                response.raise_for_status()
+            wall = time.perf_counter() - started
+            results["batch"][str(size)] = {
+                **percentiles(latencies),
+                "batch_size": size,
+                "candidates_per_second": round(batches * size / wall, 2),
+            }
+
+        for level in concurrency:
+            jobs = [job_request(rng) for _ in range(4)]
+            payloads = [{**rng.choice(jobs), **candidate(rng, i)} for i in range(count)]
+            semaphore = asyncio.Semaphore(level)
+            latencies = []
+            failures = 0
+
+            async def one(payload):
+                nonlocal failures
+                async with semaphore:
+                    t0 = time.perf_counter()
+                    response = await client.post("/evaluate-resume", json=payload)
+                    latencies.append(time.perf_counter() - t0)
+                    if response.status_code != 200:
+                        failures += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(p) for p in payloads))
+            wall = time.perf_counter() - started
+            results["concurrency"][str(level)] = {
+                **percentiles(latencies),
+                "concurrency": level,
+                "failures": failures,
+                "requests_per_second": round(count / wall, 2),
+            }
+    return results
+
+
+def flatten(data, prefix: str = "") -> Dict[str, float]:
+    out = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            out.update(flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            out[path] = float(value)
+    return out
+
+
+def check_thresholds(report: dict, thresholds: dict) -> List[dict]:
+    """Compare dotted result paths against {"max": {...}, "min": {...}}; returns violations."""
+    values = flatten(report)
+    violations = []
+    for kind in ("max", "min"):
+        for path, limit in thresholds.get(kind, {}).items():
+            value = values.get(path)
+            if value is None:
+                violations.append({"metric": path, kind: limit, "value": None, "reason": "missing"})
+            elif (kind == "max" and value > limit) or (kind == "min" and value < limit):
+                violations.append({"metric": path, kind: limit, "value": value})
+    return violations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--encoder", choices=["stub", "minilm"], default="stub")
+    parser.add_argument("--count", type=int, default=200, help="requests per stage/concurrency run")
+    parser.add_argument("--batch-sizes", default="1,8,32")
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--output", help="write the JSON report here as well as stdout")
+    parser.add_argument("--check", metavar="THRESHOLDS", help="thresholds JSON; exit 1 on regression")
+    args = parser.parse_args()
+
+    import main as service
+
+    try:
+        _, load_seconds = install_encoder(service, args.encoder)
+    except Exception as e:
+        print(json.dumps({"encoder": args.encoder, "skipped": f"{type(e).__name__}: {e}"}))
+        return 0 if args.encoder == "minilm" and not args.check else 2
+
+    report = {
+        "meta": {
+            "encoder": args.encoder,
+            "model_load_seconds": load_seconds,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "executor": service.pipeline_executor.stats(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "single": bench_stages(service, args.count, args.seed),
+    }
+    report.update(asyncio.run(bench_http(
+        service,
+        args.count,
+        [int(x) for x in args.batch_sizes.split(",") if x],
+        [int(x) for x in args.concurrency.split(",") if x],
+        args.seed + 1,
+    )))
+    service.pipeline_executor.shutdown()
+
+    status = 0
+    if args.check:
+        with open(args.check, "r", encoding="utf-8") as f:
+            thresholds = json.load(f).get(args.encoder, {})
+        violations = check_thresholds(report, thresholds)
+        report["regressions"] = violations
+        status = 1 if violations else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Benchmark: per-worker memory with and without preload-and-fork (Linux).
+
+    python benchmarks/bench_prefork_memory.py --workers 4
+
+Starts `serve.py` twice, with --no-preload (every worker imports the app and
+loads the encoder itself, like `uvicorn --workers`) and preloaded (the master
+loads once and forks), waits for /ready, sends a few evaluations so the workers
+reach steady state, then reads /proc/<pid>/smaps_rollup of every worker:
+- rss: resident pages, shared ones included (what `top` shows per process);
+- pss: proportional share, shared pages split between the processes using them;
+- uss: pages private to the worker (freed if it exits).
+The sum of pss over master and workers is the service's real footprint.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import synthetic_resumes  # noqa: E402
+
+
+def memory_kb(pid: int) -> dict:
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[0].endswith(":"):
+                fields[parts[0][:-1]] = int(parts[1])
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def children_of(pid: int):
+    out = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Fields after the parenthesized command name: state, ppid, ...
+        if int(stat.rsplit(")", 1)[1].split()[1]) == pid:
+            out.append(int(entry))
+    return out
+
+
+def measure(workers: int, port: int, preload: bool, requests: int, timeout: float) -> dict:
+    env = dict(os.environ)
+    data = tempfile.mkdtemp(prefix="ats-prefork-")
+    env.update({
+        "ATS_FEATURE_DB": os.path.join(data, "features.sqlite3"),
+        "ATS_RESUME_INDEX_DB": os.path.join(data, "resume_index.sqlite3"),
+        "ATS_RERANK_CACHE_DB": os.path.join(data, "rerank.sqlite3"),
+    })
+    cmd = [sys.executable, "serve.py", "--workers", str(workers), "--port", str(port), "--log-level", "warning"]
+    if not preload:
+        cmd.append("--no-preload")
+    master = subprocess.Popen(cmd, cwd=ROOT, env=env)
+    client = httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60.0)
+    started = time.monotonic()
+    try:
+        while True:
+            try:
+                if client.get("/ready").status_code == 200 and len(children_of(master.pid)) >= workers:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() - started > timeout:
+                raise RuntimeError("server did not become ready")
+            time.sleep(0.5)
+        ready_seconds = time.monotonic() - started
+        for text in synthetic_resumes(requests, seed=3):
+            client.post("/evaluate-resume", json={
+                "resume_text": text,
+                "job_title": "Backend Engineer",
+                "job_description": "Python services, SQL and Docker.",
+                "required_skills": ["Python", "SQL", "Docker"],
+            })
+        time.sleep(1.0)
+        per_worker = [memory_kb(pid) for pid in children_of(master.pid)]
+        master_kb = memory_kb(master.pid)
+    finally:
+        client.close()
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=30)
+
+    def mean(key):
+        return round(sum(w[key] for w in per_worker) / len(per_worker) / 1024.0, 1)
+
+    return {
+        "workers": len(per_worker),
+        "ready_seconds": round(ready_seconds, 2),
+        "worker_rss_mb": mean("rss"),
+        "worker_pss_mb": mean("pss"),
+        "worker_uss_mb": mean("uss"),
+        "master_rss_mb": round(master_kb["rss"] / 1024.0, 1),
+        "total_pss_mb": round((sum(w["pss"] for w in per_worker) + master_kb["pss"]) / 1024.0, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Preload-and-fork memory benchmark")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8791)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        print(json.dumps({"skipped": "needs /proc/<pid>/smaps_rollup (Linux)"}))
+        return
+    results = {
+        mode: measure(args.workers, args.port, mode == "preload", args.requests, args.timeout)
+        for mode in ("no_preload", "preload")
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: float32 / float16 / int8 embedding storage.
+
+    python benchmarks/bench_quantized_embeddings.py --count 5000 --queries 50
+    python benchmarks/bench_quantized_embeddings.py --encoder minilm   # needs sentence-transformers
+
+Embeds synthetic resumes and job descriptions, then for each dtype reports:
+- memory: bytes held by a VectorPool against the previous layout (one float32
+  ndarray per vector in an OrderedDict, measured with tracemalloc);
+- ranking agreement with float32 when every job ranks every resume by cosine:
+  top-10 / top-100 overlap, Kendall tau over the full ranking and the largest
+  absolute cosine error;
+- kernel cost: milliseconds per query for a full-pool cosine_many scan.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+from scipy.stats import kendalltau  # noqa: E402
+
+from benchmarks.stub_encoder import StubEncoder  # noqa: E402
+from benchmarks.synthetic import synthetic_job, synthetic_resumes  # noqa: E402
+from services.vector_pool import VectorPool  # noqa: E402
+
+
+def load_encoder(name: str):
+    if name == "stub":
+        return StubEncoder()
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer("all-MiniLM-L6-v2")
+
+
+def normalized(emb: np.ndarray) -> np.ndarray:
+    emb = np.asarray(emb, dtype=np.float32)
+    return emb / np.maximum(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12)
+
+
+def per_object_bytes(vectors: np.ndarray) -> int:
+    """Traced bytes for the previous memory tier: digest -> float32 ndarray per vector."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    memory = OrderedDict()
+    for i, vector in enumerate(vectors):
+        memory[i.to_bytes(16, "little")] = np.array(vector, dtype=np.float32)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del memory
+    return used
+
+
+def overlap(a: np.ndarray, b: np.ndarray, k: int) -> float:
+    return len(set(a[:k].tolist()) & set(b[:k].tolist())) / float(k)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Quantized embedding storage benchmark")
+    parser.add_argument("--encoder", choices=["stub", "minilm"], default="stub")
+    parser.add_argument("--count", type=int, default=5000, help="resumes")
+    parser.add_argument("--queries", type=int, default=50, help="job descriptions ranking every resume")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    try:
+        encoder = load_encoder(args.encoder)
+    except Exception as e:
+        print(json.dumps({"encoder": args.encoder, "skipped": f"{type(e).__name__}: {e}"}))
+        return
+
+    rng = random.Random(args.seed)
+    resumes = synthetic_resumes(args.count, seed=args.seed)
+    jobs = [synthetic_job(rng)["job_description"] for _ in range(args.queries)]
+    started = time.perf_counter()
+    vectors = normalized(encoder.encode(resumes, batch_size=64))
+    queries = normalized(encoder.encode(jobs, batch_size=64))
+    encode_seconds = time.perf_counter() - started
+
+    # Same matrix-vector kernel as the pools, so float32 ties break identically.
+    exact = np.stack([vectors @ q for q in queries])
+    exact_order = np.argsort(-exact, axis=1, kind="stable")
+    baseline_bytes = per_object_bytes(vectors)
+
+    results = {}
+    for dtype in ("float32", "float16", "int8"):
+        # One block holding exactly the vectors, so pool_bytes has no unused tail.
+        pool = VectorPool(vectors.shape[1], dtype, block_rows=len(vectors))
+        pool.add_many(vectors)
+
+        started = time.perf_counter()
+        scores = np.stack([pool.cosine_many(q) for q in queries])
+        scan_ms = (time.perf_counter() - started) / len(queries) * 1000.0
+
+        top10, top100, taus = [], [], []
+        for row in range(len(queries)):
+            order = np.argsort(-scores[row], kind="stable")
+            top10.append(overlap(exact_order[row], order, 10))
+            top100.append(overlap(exact_order[row], order, min(100, args.count)))
+            taus.append(kendalltau(exact[row], scores[row])[0])
+        results[dtype] = {
+            "pool_bytes": pool.nbytes,
+            "bytes_per_vector": round(pool.nbytes / len(vectors), 1),
+            "saved_vs_per_object": round(1.0 - pool.nbytes / baseline_bytes, 4),
+            "top10_overlap": round(float(np.mean(top10)), 4),
+            "top100_overlap": round(float(np.mean(top100)), 4),
+            "kendall_tau": round(float(np.mean(taus)), 6),
+            "max_abs_cosine_error": float(np.max(np.abs(scores - exact))),
+            "scan_ms_per_query": round(scan_ms, 3),
+        }
+
+    print(json.dumps({
+        "encoder": args.encoder,
+        "resumes": len(vectors),
+        "dim": int(vectors.shape[1]),
+        "queries": len(queries),
+        "encode_seconds": round(encode_seconds, 2),
+        "per_object_float32_bytes": baseline_bytes,
+        "per_object_bytes_per_vector": round(baseline_bytes / len(vectors), 1),
+        "dtypes": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: incremental re-evaluation after a job requirements edit.
+
+    python benchmarks/bench_reevaluate.py --candidates 500
+    python benchmarks/bench_reevaluate.py --candidates 500 --check   # exit 1 if results diverge
+
+Evaluates synthetic applicants for one job through /evaluate-batch (features
+stored), then applies a sequence of edits (required skills, CGPA and backlog
+rules, job description) two ways: POST /jobs/{job_key}/reevaluate with only
+the changed fields, and a full /evaluate-batch of every applicant under the
+edited job (the cost of re-running the pipeline from scratch). Reports both
+latencies, the ratio, which inputs were recomputed, and the largest score
+difference between the two; decisions must match exactly. Runs in-process with
+the in-memory embedding cache and the stub encoder, whose encodes are nearly
+free; `--encoder sim` adds a per-call and per-text cost (--call-ms, --text-ms)
+in the range of a CPU transformer.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+os.environ.setdefault("ATS_EAGER_MODEL_LOAD", "0")
+os.environ.setdefault("ATS_FEATURE_DB", ":memory:")
+os.environ.setdefault("ATS_RERANK_CACHE_DB", ":memory:")
+os.environ.setdefault("ATS_RESUME_INDEX_DB", ":memory:")
+os.environ.pop("GEMINI_API_KEY", None)
+
+import httpx  # noqa: E402
+
+from benchmarks.bench_encode_batching import SimulatedEncoder  # noqa: E402
+from benchmarks.stub_encoder import StubEncoder  # noqa: E402
+from benchmarks.synthetic import SKILLS, synthetic_job, synthetic_resumes  # noqa: E402
+
+
+def edits(rng: random.Random, job: dict) -> list:
+    return [
+        ("skills", {"required_skills": rng.sample(SKILLS, len(job["required_skills"]) + 1)}),
+        ("cgpa_backlogs", {"min_cgpa": 7.5, "allow_backlogs": True, "max_backlogs": 1}),
+        ("description", {"job_description": synthetic_job(rng)["job_description"]}),
+    ]
+
+
+async def run(args) -> dict:
+    import main
+
+    if args.encoder == "stub":
+        main.model_manager.use_model(StubEncoder())
+    elif args.encoder == "sim":
+        main.model_manager.use_model(SimulatedEncoder(args.call_ms, args.text_ms))
+    rng = random.Random(args.seed)
+    job = {**synthetic_job(rng), "min_cgpa": 6.5, "allow_backlogs": False}
+    candidates = [
+        {
+            "candidate_id": i,
+            "resume_text": text,
+            "candidate_cgpa": round(rng.uniform(5.5, 9.8), 2),
+            "candidate_backlogs": rng.choice([0, 0, 0, 1, 2]),
+        }
+        for i, text in enumerate(synthetic_resumes(args.candidates, seed=args.seed))
+    ]
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        async def evaluate(job_fields: dict, job_id: str) -> dict:
+            response = await client.post("/evaluate-batch", json={**job_fields, "job_id": job_id, "candidates": candidates})
+            response.raise_for_status()
+            return {item["candidate_id"]: item["result"] for item in response.json()["results"]}
+
+        await evaluate(job, "bench")
+        results = {}
+        for label, change in edits(rng, job):
+            job = {**job, **change}
+            started = time.perf_counter()
+            response = await client.post("/jobs/bench/reevaluate", json=change)
+            incremental_ms = (time.perf_counter() - started) * 1000.0
+            response.raise_for_status()
+            body = response.json()
+
+            started = time.perf_counter()
+            full = await evaluate(job, f"bench-full-{label}")
+            full_ms = (time.perf_counter() - started) * 1000.0
+
+            incremental = {c["candidate_id"]: c for c in body["candidates"]}
+            results[label] = {
+                "changed": body["changed"],
+                "recomputed": body["recomputed"],
+                "incremental_ms": round(incremental_ms, 2),
+                "full_ms": round(full_ms, 2),
+                "cost_ratio": round(incremental_ms / full_ms, 4),
+                "max_score_delta": max(
+                    abs(incremental[i]["final_score"] - full[i]["final_score"]) for i in full
+                ),
+                "decision_mismatches": sum(incremental[i]["decision"] != full[i]["decision"] for i in full),
+                "decisions": body["decisions"],
+            }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Incremental re-evaluation benchmark")
+    parser.add_argument("--candidates", type=int, default=500)
+    parser.add_argument("--encoder", choices=["stub", "sim", "none"], default="stub")
+    parser.add_argument("--call-ms", type=float, default=3.0)
+    parser.add_argument("--text-ms", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--check", action="store_true", help="exit 1 unless incremental and full results agree")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(json.dumps({"candidates": args.candidates, "encoder": args.encoder, "edits": results}, indent=2))
+    if args.check and any(r["decision_mismatches"] or r["max_score_delta"] > 1e-9 for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: parsed-resume cache and response projection / serialization.
+
+    python benchmarks/bench_response_projection.py --count 200
+
+Evaluates synthetic resumes once (stub encoder) and then reports:
+- parse: ResumeParser.parse per resume uncached, and as a cache hit (the same
+  CV evaluated for another job);
+- serialize: microseconds and bytes per /evaluate-resume response for the full
+  body through FastAPI's default response_model path (dump, re-validate,
+  jsonable dump, json.dumps), the same body through model_dump_json as the
+  endpoints now return it, `compact` (score, decision, explanation headline)
+  and a `fields` projection. The full body must be identical both ways.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+os.environ.setdefault("ATS_EAGER_MODEL_LOAD", "0")
+os.environ.setdefault("ATS_FEATURE_DB", ":memory:")
+os.environ.setdefault("ATS_RERANK_CACHE_DB", ":memory:")
+os.environ.setdefault("ATS_RESUME_INDEX_DB", ":memory:")
+os.environ.pop("GEMINI_API_KEY", None)
+
+from benchmarks.stub_encoder import StubEncoder  # noqa: E402
+from benchmarks.synthetic import synthetic_resumes  # noqa: E402
+from services.resume_parser import ResumeParser  # noqa: E402
+
+
+def per_item_us(fn, items, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    return round((time.perf_counter() - started) / (repeat * len(items)) * 1e6, 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parse cache and response projection benchmark")
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    import main as service
+    from pydantic import TypeAdapter
+
+    service.model_manager.use_model(StubEncoder())
+    resumes = synthetic_resumes(args.count, seed=23)
+
+    uncached = ResumeParser()
+    cached = ResumeParser(cache_items=args.count)
+    for text in resumes:
+        cached.parse(text)
+    parse = {
+        "uncached_us": per_item_us(uncached.parse, resumes, args.repeat),
+        "cache_hit_us": per_item_us(cached.parse, resumes, args.repeat),
+    }
+
+    job = {
+        "job_title": "Backend Engineer",
+        "job_description": "Build Python services with SQL, Docker and AWS. 2+ years of experience.",
+        "required_skills": ["Python", "SQL", "Docker", "AWS"],
+        "min_experience_years": 2.0,
+    }
+    responses = [
+        service._evaluate_resume_sync(service.ResumeEvaluationRequest(resume_text=text, **job))[0]
+        for text in resumes
+    ]
+    adapter = TypeAdapter(service.ResumeEvaluationResponse)
+
+    def fastapi_default(response) -> bytes:
+        value = adapter.validate_python(response.model_dump())
+        data = adapter.dump_python(value, mode="json")
+        return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+    def projected(fields, compact):
+        request = service.ResumeEvaluationRequest(resume_text="", fields=fields, compact=compact, **job)
+        include = service._response_projection(request)
+
+        def render(response) -> bytes:
+            if compact:
+                response = response.model_copy()
+                service._headline(response)
+            return service._json_response(response, include).body
+        return render
+
+    modes = {
+        "full_fastapi_default": fastapi_default,
+        "full_model_dump_json": projected(None, False),
+        "compact": projected(None, True),
+        "fields": projected(["final_score", "decision", "feature_scores", "matched_skills"], False),
+    }
+    serialize = {
+        name: {
+            "us": per_item_us(render, responses, args.repeat),
+            "bytes": round(sum(len(render(r)) for r in responses) / len(responses)),
+        }
+        for name, render in modes.items()
+    }
+    identical = all(
+        json.loads(fastapi_default(r)) == json.loads(modes["full_model_dump_json"](r)) for r in responses
+    )
+    print(json.dumps({
+        "count": args.count,
+        "parse": parse,
+        "serialize": serialize,
+        "full_bodies_identical": identical,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: chunk-level incremental resume embedding.
+
+    python benchmarks/bench_resume_chunking.py --count 500
+    python benchmarks/bench_resume_chunking.py --encoder minilm   # needs sentence-transformers
+
+Embeds synthetic resumes through SemanticMatcher.embed_resumes twice: once as
+section/paragraph chunks pooled into a document vector (ATS_RESUME_CHUNK_CHARS)
+and once as the single truncated resume view. For each mode it reports the
+first upload, a re-upload of every resume with one edited line (same embedding
+cache), and the coverage of long resumes: the share of characters that reach
+the encoder, before the model's own token window truncates them further.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from benchmarks.stub_encoder import StubEncoder  # noqa: E402
+from benchmarks.synthetic import synthetic_resume, synthetic_resumes  # noqa: E402
+from services.embedding_store import EmbeddingStore  # noqa: E402
+from services.model_manager import ModelManager  # noqa: E402
+from services.resume_parser import ResumeParser  # noqa: E402
+from services.semantic_matcher import SemanticMatcher  # noqa: E402
+
+
+class CountingEncoder:
+    """Wraps an encoder and counts the texts and characters it is asked to encode."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.texts = 0
+        self.chars = 0
+
+    def encode(self, texts, **kwargs):
+        self.texts += len(texts)
+        self.chars += sum(len(t) for t in texts)
+        return self.inner.encode(texts, **kwargs)
+
+
+def load_encoder(name: str):
+    if name == "stub":
+        return StubEncoder()
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer("all-MiniLM-L6-v2")
+
+
+def edited(rng: random.Random, text: str) -> str:
+    """The same resume with one non-empty line changed, as in a small re-upload."""
+    lines = text.split("\n")
+    candidates = [i for i, line in enumerate(lines) if line.strip()]
+    i = rng.choice(candidates)
+    lines[i] = lines[i] + " and Docker"
+    return "\n".join(lines)
+
+
+def long_resume(rng: random.Random, target_chars: int) -> str:
+    parts = []
+    while sum(len(p) for p in parts) < target_chars:
+        parts.append(synthetic_resume(rng, sections=4))
+    return "\n".join(parts)
+
+
+def run(encoder, chunk_chars: int, resumes, edits, long_resumes) -> dict:
+    counting = CountingEncoder(encoder)
+    manager = ModelManager("bench")
+    manager.use_model(counting)
+    parser = ResumeParser()
+    matcher = SemanticMatcher(
+        embedding_store=EmbeddingStore("bench", memory_items=200000),
+        model_manager=manager,
+        chunker=(lambda text: parser.section_chunks(text, chunk_chars)) if chunk_chars > 0 else None,
+    )
+    out = {}
+    for label, texts in (("first_upload", resumes), ("edited_reupload", edits)):
+        counting.texts = counting.chars = 0
+        started = time.perf_counter()
+        for start in range(0, len(texts), 32):
+            matcher.embed_resumes(texts[start:start + 32])
+        out[label] = {
+            "ms_per_resume": round((time.perf_counter() - started) / len(texts) * 1000.0, 3),
+            "texts_encoded_per_resume": round(counting.texts / len(texts), 2),
+            "chars_encoded_per_resume": round(counting.chars / len(texts), 1),
+        }
+    covered = [
+        min(sum(len(c) for c in matcher.resume_chunks(text)), len(text)) / len(text) for text in long_resumes
+    ]
+    out["long_resume_coverage"] = round(float(np.mean(covered)), 4)
+    out["vectors"] = matcher.embed_resumes(long_resumes)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Chunked resume embedding benchmark")
+    parser.add_argument("--encoder", choices=["stub", "minilm"], default="stub")
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--chunk-chars", type=int, default=1000)
+    parser.add_argument("--long-chars", type=int, default=12000, help="length of the long resumes")
+    parser.add_argument("--seed", type=int, default=23)
+    args = parser.parse_args()
+
+    try:
+        encoder = load_encoder(args.encoder)
+    except Exception as e:
+        print(json.dumps({"encoder": args.encoder, "skipped": f"{type(e).__name__}: {e}"}))
+        return
+
+    rng = random.Random(args.seed)
+    resumes = synthetic_resumes(args.count, seed=args.seed)
+    edits = [edited(rng, text) for text in resumes]
+    long_resumes = [long_resume(rng, args.long_chars) for _ in range(20)]
+
+    chunked = run(encoder, args.chunk_chars, resumes, edits, long_resumes)
+    whole = run(encoder, 0, resumes, edits, long_resumes)
+    agreement = np.sum(chunked.pop("vectors") * whole.pop("vectors"), axis=1)
+    print(json.dumps({
+        "encoder": args.encoder,
+        "resumes": len(resumes),
+        "mean_resume_chars": round(float(np.mean([len(t) for t in resumes])), 1),
+        "long_resume_chars": round(float(np.mean([len(t) for t in long_resumes])), 1),
+        "chunked": {"chunk_chars": args.chunk_chars, **chunked},
+        "whole_view": {"max_chars": SemanticMatcher.MAX_CHARS, **whole},
+        "long_resume_cosine_chunked_vs_whole": round(float(np.mean(agreement)), 4),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Micro-benchmark: ResumeParser throughput on synthetic resumes.
+
+    python benchmarks/bench_resume_parser.py --count 10000
+    python benchmarks/bench_resume_parser.py --check   # exit 1 if a pinned extraction changes
+
+Reports the best of --repeat runs for the full parse and for section
+tokenization alone, as microseconds per resume and resumes per second.
+--check also parses a few pinned resumes (aliases that contain a vocabulary
+term must still yield that term) and fails on any difference.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import synthetic_resumes  # noqa: E402
+from services.resume_parser import ResumeParser  # noqa: E402
+
+
+# Resume text -> skills the parser must extract, in order.
+PINNED_SKILLS = {
+    "Skills: scikit learn, go lang": ["scikit", "go"],
+    "Skills:\nscikit learn, go lang\nExperience:\n2 years": ["scikit", "go"],
+    "Skills: Spring Boot, C++, node.js": ["spring boot", "c++", "node.js"],
+}
+
+
+def _best_seconds(fn, texts, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ResumeParser micro-benchmark")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--check", action="store_true", help="exit 1 unless pinned resumes extract the expected skills")
+    args = parser.parse_args()
+
+    texts = synthetic_resumes(args.count, seed=args.seed)
+    resume_parser = ResumeParser()
+    resume_parser.parse(texts[0])  # build the skill scanner outside the timing
+
+    def sections_only(text: str):
+        return resume_parser._section_spans(resume_parser._normalize_text(text).lower())
+
+    results = {}
+    for name, fn in (("parse", resume_parser.parse), ("sections", sections_only)):
+        seconds = _best_seconds(fn, texts, args.repeat)
+        results[name] = {
+            "us_per_resume": round(seconds / len(texts) * 1e6, 2),
+            "resumes_per_second": round(len(texts) / seconds),
+        }
+    mismatches = {
+        text: {"expected": expected, "got": got}
+        for text, expected in PINNED_SKILLS.items()
+        if (got := resume_parser.parse(text)["skills"]) != expected
+    }
+    print(json.dumps({
+        "resumes": len(texts),
+        "avg_chars": round(sum(map(len, texts)) / len(texts)),
+        "repeat": args.repeat,
+        "results": results,
+        "pinned_mismatches": mismatches,
+    }, indent=2))
+    if args.check and mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Check: the embedding store's disk tier stays within ATS_EMBEDDING_STORE_MAX_MB.
+
+    python benchmarks/check_embedding_store_bound.py --max-mb 1 --vectors 5000
+
+Two EmbeddingStore instances (as two workers would) share one directory with
+--max-mb as the cap and put --vectors random vectors between them. Exits 1
+unless vectors.f32 plus index.bin stay within the cap, both stores report the
+tier full, every vector written to disk reads back exactly from both, and
+vectors put after the cap are still served from the memory tier. An uncapped
+run over the same vectors must grow past the cap, so the bound is what holds
+the size down.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.embedding_store import EmbeddingStore  # noqa: E402
+
+
+def disk_bytes(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in ("vectors.f32", "index.bin"))
+
+
+def run(directory: str, texts: list, vectors: np.ndarray, max_bytes: int) -> dict:
+    stores = [
+        EmbeddingStore("check", directory=directory, memory_items=len(texts), max_disk_bytes=max_bytes)
+        for _ in range(2)
+    ]
+    for i, (text, vector) in enumerate(zip(texts, vectors)):
+        stores[i % 2].put_many([text], vector[None, :])
+
+    # Fresh readers see only the disk tier.
+    readers = [EmbeddingStore("check", directory=directory, memory_items=0) for _ in range(2)]
+    on_disk = [reader.get_many(texts) for reader in readers]
+    stored = [i for i, vector in enumerate(on_disk[0]) if vector is not None]
+    exact = all(
+        np.array_equal(found[i], vectors[i]) for found in on_disk for i in stored
+    ) and [v is not None for v in on_disk[0]] == [v is not None for v in on_disk[1]]
+    # The writers still serve every vector they put, the ones past the cap from memory.
+    served = all(
+        np.array_equal(found, vectors[i])
+        for w, store in enumerate(stores)
+        for i, found in zip(range(w, len(texts), 2), store.get_many(texts[w::2]))
+    )
+    return {
+        "disk_bytes": disk_bytes(directory),
+        "disk_items": len(stored),
+        "full": [store.stats()["disk_full"] for store in stores],
+        "skipped": sum(store.stats()["disk_skipped"] for store in stores),
+        "reads_exact": exact,
+        "writers_serve_all": served,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Embedding store disk tier size bound")
+    parser.add_argument("--max-mb", type=float, default=1.0)
+    parser.add_argument("--vectors", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(3)
+    vectors = rng.standard_normal((args.vectors, args.dim)).astype(np.float32)
+    texts = [f"text {i}" for i in range(args.vectors)]
+    max_bytes = int(args.max_mb * 1024 * 1024)
+
+    root = tempfile.mkdtemp(prefix="ats-store-bound-")
+    try:
+        bounded = run(os.path.join(root, "bounded"), texts, vectors, max_bytes)
+        unbounded = run(os.path.join(root, "unbounded"), texts, vectors, 0)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    ok = (
+        bounded["disk_bytes"] <= max_bytes
+        and all(bounded["full"])
+        and bounded["disk_items"] > 0
+        and bounded["reads_exact"]
+        and bounded["writers_serve_all"]
+        and unbounded["disk_bytes"] > max_bytes
+        and unbounded["disk_items"] == args.vectors
+        and unbounded["reads_exact"]
+        and unbounded["writers_serve_all"]
+    )
+    print(json.dumps({"max_bytes": max_bytes, "bounded": bounded, "unbounded": unbounded, "ok": ok}, indent=2))
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Check: stored-feature endpoints under both executor kinds and feature DB kinds.
+
+    python benchmarks/check_process_executor.py --candidates 40
+
+Runs the same scenario in a fresh interpreter for ATS_EXECUTOR thread and
+process, each with ATS_FEATURE_DB as a file and as :memory: (stub encoder):
+/evaluate-batch stores features for a job, then /jobs/{job_key}/rescore with a
+new threshold and /jobs/{job_key}/reevaluate with a skills edit. Exits 1 unless
+every run returns every candidate and all four agree with thread + :memory:.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+
+async def scenario(candidates: int) -> dict:
+    import httpx
+
+    import main
+    from benchmarks.stub_encoder import StubEncoder
+    from benchmarks.synthetic import synthetic_resumes
+
+    # Set before the pool starts, so forked workers inherit the stub.
+    main.model_manager.use_model(StubEncoder())
+    job = {
+        "job_id": "check",
+        "job_title": "Backend Engineer",
+        "job_description": "Python services with SQL and Docker.",
+        "required_skills": ["Python", "SQL", "Docker"],
+        "min_cgpa": 6.5,
+    }
+    body = {
+        **job,
+        "candidates": [
+            {"candidate_id": i, "resume_text": text, "candidate_cgpa": 6.0 + (i % 40) / 10.0}
+            for i, text in enumerate(synthetic_resumes(candidates, seed=13))
+        ],
+    }
+
+    def ranked(response: httpx.Response) -> list:
+        response.raise_for_status()
+        return [[c["candidate_id"], round(c["final_score"], 9), c["decision"]] for c in response.json()["candidates"]]
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=300) as client:
+        (await client.post("/evaluate-batch", json=body)).raise_for_status()
+        rescore = ranked(await client.post("/jobs/check/rescore", json={"shortlist_min": 0.6}))
+        reevaluate = ranked(await client.post("/jobs/check/reevaluate", json={"required_skills": ["Python", "AWS"]}))
+    main.pipeline_executor.shutdown()
+    return {"executor": main.pipeline_executor.kind, "rescore": rescore, "reevaluate": reevaluate}
+
+
+def run(executor: str, feature_db: str, candidates: int) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "ATS_EXECUTOR": executor,
+        "ATS_WORKERS": "2",
+        "ATS_FEATURE_DB": feature_db,
+        "ATS_EAGER_MODEL_LOAD": "0",
+        "ATS_RERANK_CACHE_DB": ":memory:",
+        "ATS_RESUME_INDEX_DB": ":memory:",
+    })
+    env.pop("GEMINI_API_KEY", None)
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--scenario", "--candidates", str(candidates)],
+        cwd=SERVICE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if out.returncode != 0:
+        return {"error": out.stderr.strip().splitlines()[-1:] or [f"exit {out.returncode}"]}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Executor kind x feature DB check")
+    parser.add_argument("--candidates", type=int, default=40)
+    parser.add_argument("--scenario", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.scenario:
+        print(json.dumps(asyncio.run(scenario(args.candidates))))
+        return
+
+    data = tempfile.mkdtemp(prefix="ats-executor-check-")
+    runs = {}
+    for executor in ("thread", "process"):
+        for db in (":memory:", "file"):
+            path = ":memory:" if db == ":memory:" else os.path.join(data, f"features-{executor}.sqlite3")
+            runs[f"{executor}/{db}"] = run(executor, path, args.candidates)
+
+    reference = runs["thread/:memory:"]
+    report = {}
+    ok = True
+    for name, outcome in runs.items():
+        if "error" in outcome:
+            report[name] = outcome
+            ok = False
+            continue
+        row = {
+            "executor": outcome["executor"],
+            "rescored": len(outcome["rescore"]),
+            "reevaluated": len(outcome["reevaluate"]),
+            "matches_thread_memory": (
+                outcome["rescore"] == reference.get("rescore") and outcome["reevaluate"] == reference.get("reevaluate")
+            ),
+        }
+        report[name] = row
+        ok = ok and row["rescored"] == row["reevaluated"] == args.candidates and row["matches_thread_memory"]
+    print(json.dumps({"candidates": args.candidates, "runs": report, "ok": ok}, indent=2))
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
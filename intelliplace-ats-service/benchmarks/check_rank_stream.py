@@ -0,0 +1,185 @@
+"""
+Check: /rank-stream with a slowly sent NDJSON upload against a real server.
+
+    python benchmarks/check_rank_stream.py --candidates 20 --delay-ms 20
+    python benchmarks/check_rank_stream.py --candidates 60 --delay-ms 0 --rerank-top-k 2
+
+Starts uvicorn on main:app in a subprocess and uploads a chunked NDJSON body
+(job line, then one candidate line every --delay-ms), so the body arrives as
+many ASGI messages while the response is already streaming, which the
+in-process ASGITransport never exercises. Exits 1 unless every candidate comes
+back as a result line and the summary counts them all.
+
+--rerank-top-k K also starts scripts/gemini_stub.py and streams with
+rerank_mode "cascade" (band --rerank-band, default 0), then sends the same
+candidates to /evaluate-batch. Exits 1 unless the stream sent as many
+candidates to Gemini as the batch did (exactly K with band 0) and its summary
+(top-K, decision counts) matches the batch.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import synthetic_resumes  # noqa: E402
+
+
+JOB = {
+    "job_title": "Backend Engineer",
+    "job_description": "Python services, SQL and Docker.",
+    "required_skills": ["Python", "SQL", "Docker"],
+}
+
+
+def cascade_fields(rerank_top_k: int, band: float) -> dict:
+    if rerank_top_k < 0:
+        return {}
+    return {"use_gemini_rerank": True, "rerank_mode": "cascade", "rerank_top_k": rerank_top_k, "rerank_band": band}
+
+
+async def upload(port: int, candidates: int, delay: float, rerank_top_k: int = -1, band: float = 0.0) -> dict:
+    job = {**JOB, **cascade_fields(rerank_top_k, band), "top_k": candidates}
+    resumes = synthetic_resumes(candidates, seed=9)
+
+    async def body():
+        yield (json.dumps(job) + "\n").encode("utf-8")
+        for i, text in enumerate(resumes):
+            await asyncio.sleep(delay)
+            yield (json.dumps({"candidate_id": i, "resume_text": text}) + "\n").encode("utf-8")
+
+    lines = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120) as client:
+        async with client.stream(
+            "POST", "/rank-stream", content=body(), headers={"Content-Type": "application/x-ndjson"}
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.strip():
+                    lines.append(json.loads(line))
+    results = [line for line in lines if line.get("type") == "result"]
+    summary = next((line for line in lines if line.get("type") == "summary"), {})
+    outcome = {"results": len(results), "processed": summary.get("processed"), "lines": len(lines)}
+    if rerank_top_k >= 0:
+        outcome["summary"] = summary
+    return outcome
+
+
+async def batch_ranking(port: int, candidates: int, rerank_top_k: int, band: float) -> dict:
+    """The same candidates through /evaluate-batch: scores best first, decision counts, rerank block."""
+    body = {
+        **JOB,
+        **cascade_fields(rerank_top_k, band),
+        "candidates": [{"candidate_id": i, "resume_text": text} for i, text in enumerate(synthetic_resumes(candidates, seed=9))],
+    }
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=300) as client:
+        response = await client.post("/evaluate-batch", json=body)
+        response.raise_for_status()
+        data = response.json()
+    results = [item["result"] for item in data["results"] if item.get("result")]
+    decisions = {"SHORTLISTED": 0, "REVIEW": 0, "REJECTED": 0}
+    for result in results:
+        decisions[result["decision"]] += 1
+    return {
+        "scores": sorted((round(r["final_score"], 9) for r in results), reverse=True),
+        "decisions": decisions,
+        "rerank": data.get("rerank"),
+    }
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float) -> None:
+    started = time.monotonic()
+    while True:
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        if process.poll() is not None or time.monotonic() - started > timeout:
+            sys.exit(f"{url} did not come up")
+        time.sleep(0.3)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Real-server /rank-stream upload check")
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--delay-ms", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=8793)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--rerank-top-k", type=int, default=-1, help="stream in cascade mode against the Gemini stub")
+    parser.add_argument("--rerank-band", type=float, default=0.0)
+    args = parser.parse_args()
+
+    data = tempfile.mkdtemp(prefix="ats-stream-check-")
+    env = dict(os.environ)
+    env.update({
+        "ATS_EAGER_MODEL_LOAD": "0",
+        "ATS_FEATURE_DB": os.path.join(data, "features.sqlite3"),
+        "ATS_RESUME_INDEX_DB": os.path.join(data, "resume_index.sqlite3"),
+        "ATS_RERANK_CACHE_DB": os.path.join(data, "rerank.sqlite3"),
+        "ATS_STREAM_CHUNK_SIZE": "4",
+    })
+    env.pop("GEMINI_API_KEY", None)
+    processes = []
+    if args.rerank_top_k >= 0:
+        stub_port = args.port + 1
+        env.update({"GEMINI_API_KEY": "stub", "GEMINI_BASE_URL": f"http://127.0.0.1:{stub_port}/v1beta"})
+        processes.append(subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "scripts", "gemini_stub.py"), "--port", str(stub_port)],
+            cwd=ROOT,
+        ))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+    )
+    processes.append(server)
+    try:
+        if args.rerank_top_k >= 0:
+            wait_until_up(f"http://127.0.0.1:{args.port + 1}/stats", processes[0], args.timeout)
+        wait_until_up(f"http://127.0.0.1:{args.port}/", server, args.timeout)
+        delay = args.delay_ms / 1000.0
+        outcome = asyncio.run(upload(args.port, args.candidates, delay, args.rerank_top_k, args.rerank_band))
+        batch = None
+        if args.rerank_top_k >= 0:
+            batch = asyncio.run(batch_ranking(args.port, args.candidates, args.rerank_top_k, args.rerank_band))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=30)
+
+    ok = outcome["results"] == args.candidates and outcome["processed"] == args.candidates
+    report = {"candidates": args.candidates, **outcome}
+    if batch is not None:
+        summary = outcome.pop("summary")
+        report.pop("summary")
+        stream_scores = [round(entry["final_score"], 9) for entry in summary["top_k"]]
+        cascade = {
+            "sent": summary["rerank"]["sent"],
+            "batch_sent": batch["rerank"]["sent"],
+            "reranked_results": len(summary.get("reranked_results", [])),
+            "top_k_matches_batch": stream_scores == batch["scores"][:len(stream_scores)],
+            "decisions_match_batch": summary["decisions"] == batch["decisions"],
+        }
+        report["cascade"] = cascade
+        ok = ok and cascade["sent"] == cascade["batch_sent"]
+        ok = ok and (args.rerank_band > 0 or cascade["sent"] == args.rerank_top_k)
+        ok = ok and cascade["top_k_matches_batch"] and cascade["decisions_match_batch"]
+    report["ok"] = ok
+    print(json.dumps(report, indent=2))
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
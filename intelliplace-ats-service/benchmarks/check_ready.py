@@ -0,0 +1,102 @@
+"""
+Check: /ready under both executor kinds, with eager model loading on and off.
+
+    python benchmarks/check_ready.py --timeout 120
+
+Starts uvicorn on main:app for each ATS_EXECUTOR (thread, process) and
+ATS_EAGER_MODEL_LOAD (1, 0), so the startup hook runs as in production. Eager
+runs must turn ready (200; `degraded` when the encoder cannot load on this
+machine) within --timeout. Lazy runs must answer 200 on the first probe and
+stay ready after an /evaluate-resume call. Exits 1 otherwise.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EVALUATION = {
+    "resume_text": "Python developer. Skills: Python, SQL, Docker. Experience: 3 years building APIs.",
+    "job_title": "Backend Engineer",
+    "job_description": "Python services with SQL and Docker.",
+    "required_skills": ["Python", "SQL"],
+}
+
+
+def probe(executor: str, eager: bool, port: int, timeout: float) -> dict:
+    data = tempfile.mkdtemp(prefix="ats-ready-check-")
+    env = dict(os.environ)
+    env.update({
+        "ATS_EXECUTOR": executor,
+        "ATS_WORKERS": "1",
+        "ATS_EAGER_MODEL_LOAD": "1" if eager else "0",
+        "ATS_FEATURE_DB": os.path.join(data, "features.sqlite3"),
+        "ATS_RESUME_INDEX_DB": os.path.join(data, "resume_index.sqlite3"),
+        "ATS_RERANK_CACHE_DB": os.path.join(data, "rerank.sqlite3"),
+    })
+    env.pop("GEMINI_API_KEY", None)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    outcome = {"executor": executor, "eager": eager, "first_status": None, "ready_after_s": None}
+    try:
+        started = time.monotonic()
+        while time.monotonic() - started < timeout and server.poll() is None:
+            try:
+                response = httpx.get(f"{base}/ready", timeout=5)
+            except httpx.HTTPError:
+                time.sleep(0.3)
+                continue
+            if outcome["first_status"] is None:
+                outcome["first_status"] = response.status_code
+            if response.status_code == 200:
+                outcome["ready_after_s"] = round(time.monotonic() - started, 2)
+                outcome["body"] = response.json()
+                break
+            time.sleep(0.3)
+        if outcome["ready_after_s"] is not None and not eager:
+            evaluated = httpx.post(f"{base}/evaluate-resume", json=EVALUATION, timeout=timeout)
+            outcome["evaluate_status"] = evaluated.status_code
+            outcome["ready_after_request"] = httpx.get(f"{base}/ready", timeout=5).status_code
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    ok = outcome["ready_after_s"] is not None
+    if not eager:
+        ok = ok and outcome["first_status"] == 200 and outcome.get("ready_after_request") == 200
+        ok = ok and outcome.get("evaluate_status") == 200
+    outcome["ok"] = ok
+    return outcome
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="/ready check across executor kinds and model loading modes")
+    parser.add_argument("--port", type=int, default=8795)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    runs = []
+    for i, (executor, eager) in enumerate(
+        [("thread", True), ("thread", False), ("process", True), ("process", False)]
+    ):
+        runs.append(probe(executor, eager, args.port + i, args.timeout))
+    ok = all(run["ok"] for run in runs)
+    print(json.dumps({"runs": runs, "ok": ok}, indent=2))
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Check: text_coverage_score against the original per-skill substring implementation.
+
+    python benchmarks/check_skill_coverage.py --count 2000
+
+Scores pinned (required skill, resume text) cases and synthetic resumes against
+--jobs synthetic jobs with both the compiled scanner and the original loop kept
+below. Pinned cases list the coverage each must get; only the short-alias
+cases (two-letter aliases and compact forms inside longer words) may differ
+from the original. On synthetic input every score must match unless the
+original's hit came from a two-letter variant inside a longer word. Exits 1 on
+any other difference.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import synthetic_job, synthetic_resumes  # noqa: E402
+from services.skill_evidence import text_coverage_score  # noqa: E402
+from services.skill_normalizer import SkillNormalizer  # noqa: E402
+
+
+# (required skill, resume text) -> (original coverage, expected coverage now).
+PINNED = {
+    ("sql", "mysql, postgresql"): (1.0, 1.0),
+    ("java", "java8, spring"): (1.0, 1.0),
+    ("spring", "spring boot microservices"): (1.0, 1.0),
+    ("unit test", "unit testing with pytest"): (1.0, 1.0),
+    ("learning", "deep learning research"): (1.0, 1.0),
+    ("vision", "computer vision pipelines"): (1.0, 1.0),
+    ("machine learning", "ml engineer"): (1.0, 1.0),
+    ("go", "golang services"): (1.0, 1.0),
+    ("go", "interned at google"): (1.0, 0.0),
+    ("typescript", "built several projects"): (1.0, 0.0),
+    ("javascript", "parsed json payloads"): (1.0, 0.0),
+    ("machine learning", "html and css"): (1.0, 0.0),
+}
+
+
+def original_coverage(resume_lower: str, required_skills: list, normalizer: SkillNormalizer) -> float:
+    """text_coverage_score as it was before the compiled scanner."""
+    if not required_skills:
+        return 1.0
+    req_norm = normalizer.normalize_skills(required_skills)
+    if not req_norm:
+        return 1.0
+    hits = 0
+    for skill in req_norm:
+        variants = {skill, skill.replace(" ", ""), skill.replace(" ", "_")}
+        for alias, canon in normalizer.SKILL_MAP.items():
+            if canon == skill:
+                variants.add(alias)
+                variants.add(alias.replace(" ", ""))
+        if any(len(v) > 1 and v in resume_lower for v in variants):
+            hits += 1
+            continue
+        parts = skill.split()
+        if len(parts) > 1 and all(len(p) > 2 and p in resume_lower for p in parts):
+            hits += 1
+            continue
+        if len(parts) == 2 and len(parts[0]) > 2 and len(parts[1]) > 2:
+            compact = (parts[0][0] + parts[1][0]).lower()
+            if len(compact) == 2 and compact in resume_lower.replace(" ", ""):
+                hits += 1
+    return min(1.0, hits / len(req_norm))
+
+
+def short_alias_only(resume_lower: str, required_skills: list, normalizer: SkillNormalizer) -> bool:
+    """True when the original scores higher only because of two-letter variants inside longer words."""
+    padded = "".join(ch if ch.isalnum() or ch in "+#." else " " for ch in resume_lower)
+    tokens = set(padded.split())
+    for skill in normalizer.normalize_skills(required_skills):
+        if original_coverage(resume_lower, [skill], normalizer) == text_coverage_score(resume_lower, [skill], normalizer):
+            continue
+        short = {a for a, c in normalizer.SKILL_MAP.items() if c == skill and len(a.replace(" ", "")) == 2}
+        parts = skill.split()
+        if len(parts) == 2:
+            short.add(parts[0][0] + parts[1][0])
+        if not short or short & tokens:
+            return False
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Skill coverage old/new comparison")
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    normalizer = SkillNormalizer()
+    pinned = []
+    for (skill, text), (old_expected, new_expected) in PINNED.items():
+        old = original_coverage(text, [skill], normalizer)
+        new = text_coverage_score(text, [skill], normalizer)
+        if (old, new) != (old_expected, new_expected):
+            pinned.append({"skill": skill, "text": text, "original": old, "now": new, "expected": new_expected})
+
+    rng = random.Random(args.seed)
+    resumes = [text.lower() for text in synthetic_resumes(args.count, seed=args.seed)]
+    job_skills = [synthetic_job(rng)["required_skills"] for _ in range(args.jobs)]
+    jobs = [job_skills[i % args.jobs] for i in range(len(resumes))]
+    timings = {}
+    scores = {}
+    for name, fn in (("original", original_coverage), ("scanner", text_coverage_score)):
+        started = time.perf_counter()
+        scores[name] = [fn(text, skills, normalizer) for text, skills in zip(resumes, jobs)]
+        timings[name + "_us"] = round((time.perf_counter() - started) / len(resumes) * 1e6, 2)
+    differing = [i for i, (a, b) in enumerate(zip(scores["original"], scores["scanner"])) if a != b]
+    unexplained = [i for i in differing if not short_alias_only(resumes[i], jobs[i], normalizer)]
+
+    print(json.dumps({
+        "count": args.count,
+        **timings,
+        "pinned_mismatches": pinned,
+        "synthetic_differing": len(differing),
+        "synthetic_unexplained": len(unexplained),
+    }, indent=2))
+    if pinned or unexplained:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
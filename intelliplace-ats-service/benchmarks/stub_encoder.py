@@ -0,0 +1,41 @@
+"""
+Deterministic offline stand-in for the sentence encoder.
+
+Hashes words and word bigrams into a fixed-size signed vector, so texts sharing
+vocabulary get high cosine similarity. Same dimensionality as all-MiniLM-L6-v2
+and the same `encode` signature SemanticMatcher uses; needs no model download.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Sequence
+
+import numpy as np
+
+_WORD = re.compile(r"[a-z0-9+#.]+")
+
+
+class StubEncoder:
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.calls = 0
+        self.texts_encoded = 0
+        self.batch_sizes = []
+
+    def _bucket(self, feature: str):
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        return h % self.dim, 1.0 if (h >> 63) else -1.0
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        self.calls += 1
+        self.texts_encoded += len(texts)
+        self.batch_sizes.append(len(texts))
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD.findall((text or "").lower())
+            for feature in words + [a + " " + b for a, b in zip(words, words[1:])]:
+                index, sign = self._bucket(feature)
+                out[row, index] += sign
+            out[row, 0] += 0.5  # keep empty texts off the zero vector
+        return out
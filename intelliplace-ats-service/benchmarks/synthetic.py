@@ -0,0 +1,78 @@
+"""
+Deterministic synthetic resumes and jobs for benchmarks.
+"""
+from __future__ import annotations
+
+import random
+from typing import List, Optional
+
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Go", "SQL", "MySQL", "PostgreSQL",
+    "MongoDB", "Redis", "React", "Angular", "Node.js", "Django", "Flask", "Spring Boot", "AWS",
+    "Azure", "GCP", "Docker", "Kubernetes", "Git", "Linux", "Machine Learning", "Deep Learning",
+    "TensorFlow", "PyTorch", "Pandas", "NumPy", "REST APIs", "GraphQL", "HTML", "CSS", "Tailwind",
+]
+VERBS = ["Built", "Developed", "Implemented", "Designed", "Led", "Optimized", "Maintained", "Shipped"]
+NOUNS = [
+    "a payment service", "an analytics dashboard", "a recommendation engine", "CI/CD pipelines",
+    "a chat application", "an inventory system", "REST endpoints", "a data ingestion job",
+    "an e-commerce frontend", "a fraud detection model", "a caching layer", "unit test suites",
+]
+DEGREES = ["B.Tech in Computer Science", "M.Tech in Data Science", "BCA", "MCA", "B.E. Electronics", "PhD Physics", "Diploma in IT"]
+HEADERS = {
+    "skills": ["Skills", "Technical Skills", "Tech Stack:"],
+    "experience": ["Experience", "Work Experience", "Professional Experience:"],
+    "projects": ["Projects", "Project Experience"],
+    "education": ["Education", "Academic", "Qualifications"],
+}
+JOB_TITLES = ["Backend Engineer", "Frontend Developer", "Data Scientist", "Full Stack Developer", "ML Engineer"]
+
+
+def synthetic_resume(rng: random.Random, sections: Optional[int] = None) -> str:
+    """One resume with 0-4 headed sections, bullets, experience years and a degree."""
+    name = f"Candidate {rng.randint(1, 10**6)}"
+    lines: List[str] = [name, f"candidate{rng.randint(1, 10**6)}@example.com", ""]
+    order = list(HEADERS)
+    rng.shuffle(order)
+    count = rng.randint(0, 4) if sections is None else sections
+    if count == 0:
+        # Unstructured resume: everything in one paragraph.
+        lines.append(
+            f"{rng.choice(VERBS)} {rng.choice(NOUNS)} using {', '.join(rng.sample(SKILLS, 5))}. "
+            f"{rng.randint(0, 8)} years of experience. {rng.choice(DEGREES)}."
+        )
+    for section in order[:count]:
+        lines.append(rng.choice(HEADERS[section]))
+        if section == "skills":
+            lines.append(", ".join(rng.sample(SKILLS, rng.randint(4, 14))))
+        elif section == "experience":
+            for _ in range(rng.randint(1, 3)):
+                role = rng.choice(["Software Engineer", "Intern", "Software Engineering Internship", "Developer"])
+                lines.append(f"{role} at Company{rng.randint(1, 500)} ({rng.randint(1, 6)} years)")
+                for _ in range(rng.randint(1, 3)):
+                    lines.append(f"- {rng.choice(VERBS)} {rng.choice(NOUNS)} with {rng.choice(SKILLS)}")
+        elif section == "projects":
+            for i in range(rng.randint(1, 5)):
+                lines.append(f"{i + 1}. {rng.choice(VERBS)} {rng.choice(NOUNS)} using {', '.join(rng.sample(SKILLS, 3))}")
+        elif section == "education":
+            lines.append(f"{rng.choice(DEGREES)}, University {rng.randint(1, 90)}, CGPA {rng.uniform(5, 10):.2f}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def synthetic_resumes(n: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return [synthetic_resume(rng) for _ in range(n)]
+
+
+def synthetic_job(rng: random.Random) -> dict:
+    skills = rng.sample(SKILLS, rng.randint(3, 7))
+    return {
+        "job_title": rng.choice(JOB_TITLES),
+        "job_description": (
+            f"We are hiring to work on {rng.choice(NOUNS)} and {rng.choice(NOUNS)}. "
+            f"Required: {', '.join(skills)}. {rng.randint(0, 5)}+ years of experience."
+        ),
+        "required_skills": skills,
+        "min_experience_years": float(rng.randint(0, 4)),
+    }
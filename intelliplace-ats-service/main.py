@@ -3,13 +3,20 @@ Production-grade ATS (Applicant Tracking System) Microservice
 Uses spaCy, Sentence-BERT, and scikit-learn for resume evaluation
 """
 
+import asyncio
 import os
 os.environ['TRANSFORMERS_NO_TF'] = '1'
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from typing import AsyncIterator, Dict, List, Literal, Optional, Sequence, Tuple, Union
+from functools import partial
+import heapq
+import json
+import time
+import numpy as np
 import uvicorn
 from services.resume_parser import ResumeParser
 from services.semantic_matcher import SemanticMatcher
@@ -17,6 +24,16 @@ from services.scoring_engine import ScoringEngine
 from services.explanation_generator import ExplanationGenerator
 from services.skill_normalizer import SkillNormalizer
 from services.gemini_reranker import GeminiReranker
+from services.rerank_cache import RerankCache
+from services.job_profile import JobProfile, JobProfileRegistry
+from services.embedding_store import EmbeddingStore
+from services.executor import BoundedExecutor, ExecutorSaturated
+from services.model_manager import ModelManager
+from services.encode_batcher import EncodeBatcher
+from services.lexical_index import LexicalIndex
+from services.feature_store import FeatureMatrix, FeatureRecord, FeatureStore, resume_key
+from services.resume_index import ResumeIndex
+from services.metrics import SIZE_BUCKETS, MetricsRegistry, Timings, collect, hit_ratio, stage
 from services.skill_evidence import (
     blend_skill_match,
     semantic_skill_alignment,
@@ -44,6 +61,71 @@ def _env_float(name: str, default: float) -> float:
 
 SHORTLIST_SCORE_MIN = _env_float("ATS_SHORTLIST_MIN", 0.52)
 REVIEW_SCORE_MIN = _env_float("ATS_REVIEW_MIN", 0.30)
+# Score cap for candidates failing hard filters, and Gemini blend weights (higher inside the review band).
+FILTER_REJECT_SCORE_CAP = 0.55
+GEMINI_BLEND_WEIGHT = 0.35
+GEMINI_BAND_BLEND_WEIGHT = 0.42
+GEMINI_BAND_MAX = 0.82
+# Cascade reranking: only candidates within this margin of a decision threshold (and/or the local
+# top-K) are sent to Gemini. Optionally several resumes share one prompt.
+CASCADE_BAND = _env_float("ATS_CASCADE_BAND", 0.08)
+CASCADE_TOP_K = int(_env_float("ATS_CASCADE_TOP_K", 0))
+RERANK_GROUP_SIZE = int(_env_float("ATS_RERANK_GROUP_SIZE", 1))
+# Memory budget for cached job profiles (job embeddings + normalized skills).
+JOB_PROFILE_CACHE_MB = _env_float("ATS_JOB_PROFILE_CACHE_MB", 64.0)
+# Sentence encoder: optional local model directory (offline boxes), eager startup load,
+# and seconds before retrying a failed load (0 = never; serve the lexical fallback).
+MODEL_PATH = os.getenv("ATS_MODEL_PATH", "").strip() or None
+EAGER_MODEL_LOAD = os.getenv("ATS_EAGER_MODEL_LOAD", "1").strip().lower() not in ("0", "false", "no")
+MODEL_RETRY_SECONDS = _env_float("ATS_MODEL_RETRY_SECONDS", 0.0)
+# Encoder backend: "torch" (reference), "onnx" or "onnx-int8" (ONNX Runtime, exported on first
+# load into ATS_ONNX_DIR), and ONNX Runtime intra-op threads (0 = its default).
+ENCODER_BACKEND = os.getenv("ATS_ENCODER_BACKEND", "torch").strip().lower() or "torch"
+ONNX_EXPORT_DIR = os.getenv("ATS_ONNX_DIR", "").strip() or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "onnx"
+)
+ONNX_THREADS = int(_env_float("ATS_ONNX_THREADS", 0))
+# Lexical fallback: optional corpus (one document per line) to fit IDF weights at startup.
+LEXICAL_CORPUS_PATH = os.getenv("ATS_LEXICAL_CORPUS", "").strip() or None
+# SQLite file persisting per-job candidate features for re-scoring (":memory:" to keep in-process).
+FEATURE_DB_PATH = os.getenv("ATS_FEATURE_DB", "").strip() or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "ats_features.sqlite3"
+)
+# Reverse matching index: SQLite file with indexed resume embeddings (":memory:" to keep in-process),
+# pool size from which search uses the approximate IVF index (0 = always exact) and lists probed.
+RESUME_INDEX_PATH = os.getenv("ATS_RESUME_INDEX_DB", "").strip() or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "resume_index.sqlite3"
+)
+MATCH_IVF_MIN_ITEMS = int(_env_float("ATS_MATCH_IVF_MIN_ITEMS", 100000))
+MATCH_IVF_PROBE = int(_env_float("ATS_MATCH_IVF_PROBE", 16))
+# Gemini rerank result cache: SQLite file (":memory:" to keep in-process), TTL and in-process LRU size.
+RERANK_CACHE_PATH = os.getenv("ATS_RERANK_CACHE_DB", "").strip() or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "gemini_rerank_cache.sqlite3"
+)
+RERANK_CACHE_TTL_HOURS = _env_float("ATS_RERANK_CACHE_TTL_HOURS", 168.0)
+RERANK_CACHE_ITEMS = int(_env_float("ATS_RERANK_CACHE_ITEMS", 10000))
+# Content-addressed embedding cache: in-memory LRU size and optional on-disk (mmap) directory.
+EMBEDDING_CACHE_ITEMS = int(_env_float("ATS_EMBEDDING_CACHE_ITEMS", 20000))
+EMBEDDING_STORE_DIR = os.getenv("ATS_EMBEDDING_STORE_DIR", "").strip() or None
+# Disk tier cap in MB (vector file plus index); once reached it stops appending. 0 is unbounded.
+EMBEDDING_STORE_MAX_MB = _env_float("ATS_EMBEDDING_STORE_MAX_MB", 512.0)
+# Resume embedding chunk size in characters: section/paragraph chunks are embedded (cached by
+# content) and pooled; 0 embeds the first SemanticMatcher.MAX_CHARS characters as one text.
+RESUME_CHUNK_CHARS = int(_env_float("ATS_RESUME_CHUNK_CHARS", 1000))
+# Parsed resumes cached by text hash (the same CV is evaluated for many jobs); 0 disables.
+PARSE_CACHE_ITEMS = int(_env_float("ATS_PARSE_CACHE_ITEMS", 5000))
+# In-memory embedding precision: float32 (exact), float16 or int8 (per-vector scale).
+EMBEDDING_CACHE_DTYPE = os.getenv("ATS_EMBEDDING_DTYPE", "float32").strip().lower() or "float32"
+# Pipeline executor: "thread" or "process", worker count and max queued requests beyond workers.
+EXECUTOR_KIND = os.getenv("ATS_EXECUTOR", "thread")
+EXECUTOR_WORKERS = int(_env_float("ATS_WORKERS", float(os.cpu_count() or 4)))
+EXECUTOR_MAX_QUEUE = int(_env_float("ATS_MAX_QUEUE", 32))
+# Cross-request encode batching (thread executor): max texts per merged model.encode call
+# (0 = off, each request encodes on its own) and ms to wait for more requests when idle.
+ENCODE_BATCH_MAX = int(_env_float("ATS_ENCODE_BATCH_MAX", 128))
+ENCODE_BATCH_WAIT_MS = _env_float("ATS_ENCODE_BATCH_WAIT_MS", 2.0)
+# Candidates scored per executor job by the streaming ranker.
+STREAM_CHUNK_SIZE = max(1, int(_env_float("ATS_STREAM_CHUNK_SIZE", 16)))
 
 
 class ResumeEvaluationRequest(BaseModel):
@@ -60,6 +142,11 @@ class ResumeEvaluationRequest(BaseModel):
     allow_backlogs: Optional[bool] = Field(default=None, description="Whether backlogs are allowed")
     max_backlogs: Optional[int] = Field(default=None, description="Maximum allowed backlogs when allowed")
     use_gemini_rerank: Optional[bool] = Field(default=False, description="Enable optional Gemini reranking")
+    job_id: Optional[Union[int, str]] = Field(default=None, description="Caller-side job identifier for stored features (defaults to the job profile id)")
+    candidate_id: Optional[Union[int, str]] = Field(default=None, description="Caller-side candidate identifier; when set, features are stored for re-scoring")
+    include_timings: bool = Field(default=False, description="Debug: return per-stage timings (ms) in the response")
+    fields: Optional[List[str]] = Field(default=None, description="Response fields to return, e.g. ['final_score', 'decision', 'parsed_resume.skills'] (default: all)")
+    compact: bool = Field(default=False, description="Return final_score, decision and the first explanation line only (unless `fields` is given)")
 
 
 class FeatureScores(BaseModel):
@@ -86,15 +173,394 @@ class ResumeEvaluationResponse(BaseModel):
     parsed_resume: dict = Field(..., description="Structured resume data extracted by NLP")
     matched_skills: List[str] = Field(default=[], description="Normalized skills matched to requirements")
     gemini_rerank: Optional[dict] = Field(default=None, description="Optional Gemini rerank result")
+    timings: Optional[Dict[str, float]] = Field(default=None, description="Per-stage milliseconds, when include_timings was set")
+
+
+class BatchCandidate(BaseModel):
+    candidate_id: Union[int, str] = Field(..., description="Caller-side identifier echoed back in the result")
+    resume_text: str = Field(..., description="Full text content of the resume")
+    candidate_cgpa: Optional[float] = Field(default=None, description="Candidate CGPA")
+    candidate_backlogs: Optional[int] = Field(default=None, description="Active backlogs count")
+
+
+class BatchEvaluationRequest(BaseModel):
+    job_title: str = Field(..., description="Job title/role")
+    job_description: str = Field(..., description="Complete job description text")
+    job_description_pdf_text: Optional[str] = Field(default=None, description="Text extracted from job description PDF file (if available)")
+    required_skills: List[str] = Field(default=[], description="List of required technical skills")
+    min_experience_years: Optional[float] = Field(default=0.0, description="Minimum years of experience required")
+    education_requirement: Optional[str] = Field(default=None, description="Required education degree")
+    min_cgpa: Optional[float] = Field(default=None, description="Minimum CGPA cutoff")
+    allow_backlogs: Optional[bool] = Field(default=None, description="Whether backlogs are allowed")
+    max_backlogs: Optional[int] = Field(default=None, description="Maximum allowed backlogs when allowed")
+    use_gemini_rerank: Optional[bool] = Field(default=False, description="Enable optional Gemini reranking")
+    job_id: Optional[Union[int, str]] = Field(default=None, description="Caller-side job identifier for stored features (defaults to the job profile id)")
+    rerank_mode: Literal["all", "cascade"] = Field(default="all", description="'all' reranks every candidate; 'cascade' only the local top-K and the uncertainty band")
+    rerank_top_k: Optional[int] = Field(default=None, ge=0, description="Cascade: rerank the K best local scores (default ATS_CASCADE_TOP_K)")
+    rerank_band: Optional[float] = Field(default=None, ge=0.0, le=1.0, description="Cascade: rerank scores within this margin of a decision threshold (default ATS_CASCADE_BAND)")
+    rerank_group_size: Optional[int] = Field(default=None, ge=1, le=10, description="Resumes per Gemini prompt (default ATS_RERANK_GROUP_SIZE)")
+    include_timings: bool = Field(default=False, description="Debug: return per-stage timings (ms) for the whole batch")
+    fields: Optional[List[str]] = Field(default=None, description="Fields of each result to return, as in /evaluate-resume (default: all)")
+    compact: bool = Field(default=False, description="Return final_score, decision and the first explanation line of each result only")
+    candidates: List[BatchCandidate] = Field(..., description="Resumes to evaluate against this job")
+
+    def candidate_request(self, candidate: BatchCandidate) -> ResumeEvaluationRequest:
+        job_fields = self.model_dump(exclude={"candidates", "include_timings"})
+        return ResumeEvaluationRequest(
+            **job_fields,
+            candidate_id=candidate.candidate_id,
+            resume_text=candidate.resume_text,
+            candidate_cgpa=candidate.candidate_cgpa,
+            candidate_backlogs=candidate.candidate_backlogs,
+        )
+
+
+class RankStreamRequest(BatchEvaluationRequest):
+    candidates: List[BatchCandidate] = Field(default=[], description="Resumes to rank (omit when streaming NDJSON)")
+    top_k: int = Field(default=10, ge=1, le=1000, description="Size of the ranked summary")
+
+    def chunk_request(self, candidates: List[BatchCandidate]) -> BatchEvaluationRequest:
+        return BatchEvaluationRequest(
+            **self.model_dump(exclude={"candidates", "top_k"}),
+            candidates=candidates,
+        )
+
+
+class BatchEvaluationItem(BaseModel):
+    candidate_id: Union[int, str]
+    result: Optional[ResumeEvaluationResponse] = None
+    error: Optional[str] = None
+
+
+class BatchEvaluationResponse(BaseModel):
+    results: List[BatchEvaluationItem]
+    rerank: Optional[Dict[str, Union[int, str]]] = Field(default=None, description="Rerank summary: mode, candidates scored, sent to Gemini, reranked")
+    timings: Optional[Dict[str, float]] = Field(default=None, description="Per-stage milliseconds for the batch, when include_timings was set")
+
+
+class RescoreRequest(BaseModel):
+    weights: Optional[Dict[str, float]] = Field(default=None, description="Overrides for ScoringEngine.WEIGHTS")
+    fresher_weights: Optional[Dict[str, float]] = Field(default=None, description="Overrides for ScoringEngine.FRESHER_WEIGHTS")
+    shortlist_min: Optional[float] = Field(default=None, ge=0.0, le=1.0, description="Shortlist threshold (default ATS_SHORTLIST_MIN)")
+    review_min: Optional[float] = Field(default=None, ge=0.0, le=1.0, description="Review threshold (default ATS_REVIEW_MIN)")
+    include_candidates: bool = Field(default=True, description="Return per-candidate scores, best first")
+
+
+class RescoredCandidate(BaseModel):
+    candidate_id: Union[int, str]
+    final_score: float
+    decision: str
+
+
+class RescoreResponse(BaseModel):
+    job_key: str
+    candidates_scored: int
+    decisions: Dict[str, int]
+    candidates: List[RescoredCandidate] = []
+    elapsed_ms: float
+
+
+class JobRequirements(BaseModel):
+    """Job fields a job's stored features were scored under."""
+    job_title: str
+    job_description: str
+    job_description_pdf_text: Optional[str] = None
+    required_skills: List[str] = []
+    min_experience_years: Optional[float] = 0.0
+    education_requirement: Optional[str] = None
+    min_cgpa: Optional[float] = None
+    allow_backlogs: Optional[bool] = None
+    max_backlogs: Optional[int] = None
+
+    @classmethod
+    def of(cls, request) -> "JobRequirements":
+        return cls(**request.model_dump(include=set(cls.model_fields)))
+
+
+class ReevaluateRequest(BaseModel):
+    job_title: Optional[str] = Field(default=None, description="New job title")
+    job_description: Optional[str] = Field(default=None, description="New job description text")
+    job_description_pdf_text: Optional[str] = Field(default=None, description="New text extracted from the job description PDF")
+    required_skills: Optional[List[str]] = Field(default=None, description="New list of required technical skills")
+    min_experience_years: Optional[float] = Field(default=None, description="New minimum years of experience")
+    education_requirement: Optional[str] = Field(default=None, description="New required education degree")
+    min_cgpa: Optional[float] = Field(default=None, description="New minimum CGPA cutoff")
+    allow_backlogs: Optional[bool] = Field(default=None, description="Whether backlogs are allowed")
+    max_backlogs: Optional[int] = Field(default=None, description="New maximum allowed backlogs")
+    include_candidates: bool = Field(default=True, description="Return per-candidate scores, best first")
+
+    def changes(self) -> dict:
+        """Requirement fields present in the request (an explicit null clears an optional field)."""
+        return self.model_dump(include=set(JobRequirements.model_fields) & self.model_fields_set)
+
+
+class ReevaluateResponse(RescoreResponse):
+    changed: List[str] = Field(..., description="Requirement fields that differ from the stored ones")
+    recomputed: List[str] = Field(..., description="Per-candidate inputs recomputed for the change")
+    skipped: List[Union[int, str]] = Field(default=[], description="Candidates stored without re-evaluation inputs; scored as before")
+
+
+class JobProfileRequest(BaseModel):
+    job_title: str = Field(..., description="Job title/role")
+    job_description: str = Field(..., description="Complete job description text")
+    job_description_pdf_text: Optional[str] = Field(default=None, description="Text extracted from job description PDF file (if available)")
+    required_skills: List[str] = Field(default=[], description="List of required technical skills")
+
+
+class JobProfileResponse(BaseModel):
+    job_profile_id: str = Field(..., description="Content hash identifying the cached job profile")
+    normalized_required_skills: List[str]
+    embedded: bool = Field(..., description="Whether job embeddings are cached (False when the model is unavailable)")
+
+
+class IndexedResume(BaseModel):
+    candidate_id: Union[int, str] = Field(..., description="Caller-side candidate identifier")
+    resume_text: str = Field(..., description="Full text content of the resume")
+
+
+class CandidateIndexRequest(BaseModel):
+    candidates: List[IndexedResume] = Field(..., description="Resumes to add to (or replace in) the matching index")
+
+
+class CandidateIndexResponse(BaseModel):
+    indexed: int
+    total: int = Field(..., description="Candidates in the index after this request")
+
+
+class MatchCandidatesRequest(JobProfileRequest):
+    min_experience_years: Optional[float] = Field(default=0.0, description="Minimum years of experience required (rescoring)")
+    education_requirement: Optional[str] = Field(default=None, description="Required education degree (rescoring)")
+    top_k: int = Field(default=20, ge=1, le=1000, description="Candidates to return")
+    exclude_candidate_ids: List[Union[int, str]] = Field(default=[], description="Candidates to leave out, e.g. those who already applied")
+    exact: bool = Field(default=False, description="Always scan the whole index, even when the IVF index is active")
+    rescore: bool = Field(default=False, description="Run the top-K through the full evaluation pipeline and order by final score")
+
+
+class MatchedCandidate(BaseModel):
+    candidate_id: Union[int, str]
+    similarity: float = Field(..., description="Resume/job embedding similarity (0-1)")
+    final_score: Optional[float] = None
+    decision: Optional[str] = None
+    feature_scores: Optional[FeatureScores] = None
+
+
+class MatchCandidatesResponse(BaseModel):
+    job_profile_id: str
+    method: str = Field(..., description="'exact' scan or approximate 'ivf' search")
+    searched: int = Field(..., description="Resume vectors scored")
+    indexed: int = Field(..., description="Candidates in the index")
+    candidates: List[MatchedCandidate]
+    elapsed_ms: float
 
 
 # Initialize services (singleton pattern)
-resume_parser = ResumeParser()
-semantic_matcher = SemanticMatcher()
+resume_parser = ResumeParser(cache_items=PARSE_CACHE_ITEMS)
+model_manager = ModelManager(
+    SemanticMatcher.MODEL_NAME,
+    model_path=MODEL_PATH,
+    retry_seconds=MODEL_RETRY_SECONDS,
+    backend=ENCODER_BACKEND,
+    export_root=ONNX_EXPORT_DIR,
+    threads=ONNX_THREADS,
+)
+embedding_store = EmbeddingStore(
+    namespace=model_manager.model_id,
+    directory=EMBEDDING_STORE_DIR,
+    memory_items=EMBEDDING_CACHE_ITEMS,
+    dtype=EMBEDDING_CACHE_DTYPE,
+    max_disk_bytes=int(EMBEDDING_STORE_MAX_MB * 1024 * 1024),
+)
+lexical_index = LexicalIndex(max_cached=EMBEDDING_CACHE_ITEMS)
+if LEXICAL_CORPUS_PATH:
+    lexical_index.fit_file(LEXICAL_CORPUS_PATH)
+# Process workers each run their own pipeline, so merging encodes only pays off across threads.
+encode_batcher = (
+    EncodeBatcher(model_manager.get, max_batch=ENCODE_BATCH_MAX, max_wait_ms=ENCODE_BATCH_WAIT_MS)
+    if ENCODE_BATCH_MAX > 0 and EXECUTOR_KIND.strip().lower() != "process" else None
+)
+semantic_matcher = SemanticMatcher(
+    embedding_store=embedding_store,
+    model_manager=model_manager,
+    lexical_index=lexical_index,
+    chunker=partial(resume_parser.section_chunks, max_chars=RESUME_CHUNK_CHARS) if RESUME_CHUNK_CHARS > 0 else None,
+    batcher=encode_batcher,
+)
 scoring_engine = ScoringEngine()
 explanation_generator = ExplanationGenerator()
 skill_normalizer = SkillNormalizer()
-gemini_reranker = GeminiReranker()
+gemini_reranker = GeminiReranker(
+    cache=RerankCache(
+        RERANK_CACHE_PATH,
+        ttl_seconds=RERANK_CACHE_TTL_HOURS * 3600.0,
+        memory_items=RERANK_CACHE_ITEMS,
+    ),
+)
+
+
+def _load_model() -> dict:
+    model_manager.load(warmup=True)
+    return model_manager.status()
+
+
+pipeline_executor = BoundedExecutor(
+    kind=EXECUTOR_KIND,
+    workers=EXECUTOR_WORKERS,
+    max_queue=EXECUTOR_MAX_QUEUE,
+    initializer=_load_model if EAGER_MODEL_LOAD else None,
+)
+# Last model status reported by a pool worker (process mode has no model in this process).
+_worker_model_status: Optional[dict] = None
+feature_store = FeatureStore(FEATURE_DB_PATH)
+resume_index = ResumeIndex(
+    RESUME_INDEX_PATH,
+    namespace=model_manager.model_id,
+    dtype=EMBEDDING_CACHE_DTYPE,
+    ivf_min_items=MATCH_IVF_MIN_ITEMS,
+    nprobe=MATCH_IVF_PROBE,
+)
+job_profiles = JobProfileRegistry(
+    semantic_matcher,
+    skill_normalizer,
+    max_bytes=int(JOB_PROFILE_CACHE_MB * 1024 * 1024),
+)
+
+# Prometheus metrics served at /metrics. Stage timings are collected per request (also in
+# process-mode workers) and observed here; cache and model gauges describe this process.
+metrics = MetricsRegistry()
+STAGE_SECONDS = metrics.histogram("ats_stage_seconds", "Exclusive wall time per pipeline stage.", ("stage",))
+REQUEST_SECONDS = metrics.histogram("ats_request_seconds", "Handler latency per endpoint.", ("endpoint",))
+ENCODE_BATCH_SIZE = metrics.histogram("ats_encode_batch_size", "Texts per encode call from one request (cache misses only).", buckets=SIZE_BUCKETS)
+BATCH_CANDIDATES = metrics.histogram("ats_batch_candidates", "Candidates per batch request or stream chunk.", ("endpoint",), buckets=SIZE_BUCKETS)
+SAMPLE_HISTOGRAMS = {"encode_batch_size": ENCODE_BATCH_SIZE}
+metrics.register(gemini_reranker.request_seconds)
+if encode_batcher is not None:
+    metrics.register(encode_batcher.batch_texts)
+    metrics.register(encode_batcher.batch_requests)
+    metrics.register(encode_batcher.wait_seconds)
+
+
+def _cache_counts() -> Dict[str, Tuple[int, int]]:
+    embedding = embedding_store.stats()
+    rerank = gemini_reranker.cache.stats()
+    profiles = job_profiles.stats()
+    parse = resume_parser.cache_stats()
+    return {
+        "resume_parse": (parse["hits"], parse["misses"]),
+        "embedding": (embedding["memory_hits"] + embedding["disk_hits"], embedding["misses"]),
+        "job_profile": (profiles["hits"], profiles["misses"]),
+        "gemini_rerank": (rerank["memory_hits"] + rerank["disk_hits"], rerank["misses"]),
+    }
+
+
+metrics.gauge_callback(
+    "ats_cache_hit_ratio", "Hits over lookups per cache.",
+    lambda: {(name,): hit_ratio(*counts) for name, counts in _cache_counts().items()},
+    ("cache",),
+)
+metrics.counter_callback(
+    "ats_cache_lookups_total", "Cache lookups by result.",
+    lambda: {
+        (name, result): count
+        for name, counts in _cache_counts().items()
+        for result, count in zip(("hit", "miss"), counts)
+    },
+    ("cache", "result"),
+)
+metrics.gauge_callback(
+    "ats_model_load_seconds", "Seconds the sentence encoder took to load and warm up.",
+    lambda: {(): _model_status().get("load_seconds")},
+)
+metrics.gauge_callback(
+    "ats_model_ready", "1 when the sentence encoder is loaded.",
+    lambda: {(): 1.0 if _model_status().get("state") == ModelManager.READY else 0.0},
+)
+metrics.gauge_callback(
+    "ats_executor_jobs", "Pipeline executor jobs in flight and queued beyond the workers.",
+    lambda: {("in_flight",): pipeline_executor.in_flight, ("queued",): pipeline_executor.queue_depth},
+    ("state",),
+)
+metrics.counter_callback(
+    "ats_executor_jobs_total", "Pipeline executor jobs completed or rejected as saturated.",
+    lambda: {("completed",): pipeline_executor.completed, ("rejected",): pipeline_executor.rejected},
+    ("result",),
+)
+metrics.gauge_callback(
+    "ats_resume_index_candidates", "Resumes in the reverse-matching index.",
+    lambda: {(): len(resume_index)},
+)
+metrics.counter_callback(
+    "ats_gemini_calls_total", "Gemini calls, failures, retries and breaker skips.",
+    lambda: {
+        (event,): gemini_reranker.stats()[event]
+        for event in ("calls", "failures", "retries", "skipped")
+    },
+    ("event",),
+)
+
+
+def _finish_request(endpoint: str, started: float, timings: Timings, batch_size: Optional[int] = None) -> None:
+    """Observe a finished request's stage timings and samples, and add its total to `timings`."""
+    for name, seconds in timings.stages.items():
+        STAGE_SECONDS.observe(seconds, name)
+    for name, value in timings.samples:
+        histogram = SAMPLE_HISTOGRAMS.get(name)
+        if histogram is not None:
+            histogram.observe(value)
+    if batch_size is not None:
+        BATCH_CANDIDATES.observe(batch_size, endpoint)
+    total = time.perf_counter() - started
+    REQUEST_SECONDS.observe(total, endpoint)
+    timings.stages["total"] = total
+
+
+# Fields a compact response keeps; its explanation is cut to the headline (first) line.
+COMPACT_FIELDS = ("final_score", "decision", "explanation")
+
+
+def _response_projection(request) -> Optional[dict]:
+    """
+    pydantic `include` for the result fields a request asked for (`fields`, or
+    COMPACT_FIELDS with `compact`); None for the full response. Dotted names pick
+    keys of parsed_resume or feature_scores, e.g. "parsed_resume.skills".
+    """
+    fields = request.fields
+    if fields is None:
+        if not request.compact:
+            return None
+        fields = COMPACT_FIELDS
+    include: Dict[str, object] = {}
+    unknown = []
+    for name in fields:
+        top, _, sub = name.partition(".")
+        if top not in ResumeEvaluationResponse.model_fields:
+            unknown.append(name)
+        elif not sub:
+            include[top] = True
+        elif top == "parsed_resume" or (top == "feature_scores" and sub in FeatureScores.model_fields):
+            if include.get(top) is not True:
+                include.setdefault(top, set()).add(sub)
+        else:
+            unknown.append(name)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown response fields: {sorted(unknown)}")
+    if request.include_timings:
+        include["timings"] = True
+    return include
+
+
+def _json_response(model: BaseModel, include: Optional[dict] = None) -> Response:
+    """
+    Serialize a response model straight to JSON bytes with pydantic's encoder.
+    Returning a Response skips FastAPI's re-validation of the response_model and
+    its jsonable_encoder pass, which dominate for large payloads; the declared
+    response_model still documents the endpoint.
+    """
+    return Response(content=model.model_dump_json(include=include), media_type="application/json")
+
+
+def _headline(result: ResumeEvaluationResponse) -> None:
+    """Cut a result's explanation to its first line (compact responses)."""
+    result.explanation = result.explanation.split("\n", 1)[0]
 
 
 @app.get("/")
@@ -108,108 +574,324 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "executor": pipeline_executor.stats(),
+        "gemini": gemini_reranker.stats(),
+        # stats() syncs with SQLite under the index lock; keep that off the event loop.
+        "resume_index": await asyncio.to_thread(resume_index.stats),
+        "encode_batcher": encode_batcher.stats() if encode_batcher is not None else None,
+    }
 
 
-@app.post("/evaluate-resume", response_model=ResumeEvaluationResponse)
-async def evaluate_resume(request: ResumeEvaluationRequest):
+def _model_status() -> dict:
+    if pipeline_executor.kind == "process":
+        # Workers load the model; without eager loading none reports back until a request needs it.
+        state = ModelManager.LOADING if EAGER_MODEL_LOAD else ModelManager.NOT_LOADED
+        return _worker_model_status or {"state": state, "model": model_manager.model_id}
+    return model_manager.status()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus text exposition: stage and request histograms, cache, model, executor and Gemini metrics."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/ready")
+async def readiness_check():
     """
-    Main endpoint for resume evaluation.
-    
-    Pipeline:
-    1. Parse resume using spaCy (extract skills, experience, education, projects)
-    2. Compute semantic similarity between resume and job description
-    3. Calculate feature scores (normalized to 0-1)
-    4. Apply weighted scoring model
-    5. Generate decision and explanation
+    Readiness, separate from liveness: 503 until the encoder has loaded.
+    A failed load still serves (lexical fallback) and is reported as degraded.
+    With ATS_EAGER_MODEL_LOAD=0 nothing loads until a request needs the model,
+    so the service is ready from the start and that request pays for the load.
     """
-    try:
-        # STEP 1: Resume Parsing
-        parsed_resume = resume_parser.parse(request.resume_text)
-        
-        # STEP 2: Semantic Matching
-        semantic_score = semantic_matcher.compute_similarity(
-            request.resume_text,
-            request.job_description,
-            request.job_description_pdf_text
-        )
-        role_similarity = semantic_matcher.compute_role_similarity(
-            request.resume_text,
-            request.job_title
-        )
-        # Light title blend — JD similarity stays primary.
-        semantic_score = min(1.0, max(0.0, (0.92 * semantic_score) + (0.08 * role_similarity)))
+    status = _model_status()
+    state = status.get("state")
+    ready = state in (ModelManager.READY, ModelManager.FAILED) or not EAGER_MODEL_LOAD
+    body = {"ready": ready, "degraded": state == ModelManager.FAILED, "lazy": not EAGER_MODEL_LOAD, "model": status}
+    return JSONResponse(status_code=200 if ready else 503, content=body)
 
-        min_exp = request.min_experience_years
-        if min_exp is None:
-            min_exp = 0.0
-        is_fresher_role = min_exp <= 0.0
 
-        # STEP 3: Feature Engineering
-        normalized_resume_skills = skill_normalizer.normalize_skills(parsed_resume.get('skills', []))
-        normalized_required_skills = skill_normalizer.normalize_skills(request.required_skills)
+def _job_key(request, profile: JobProfile) -> str:
+    """Key for stored features: the caller's job_id, else the job profile hash."""
+    return str(request.job_id) if request.job_id is not None else profile.key
 
-        resume_lower = (request.resume_text or "").lower()
-        list_skill_ratio = scoring_engine.calculate_skill_match(
-            normalized_resume_skills, normalized_required_skills
-        )
-        text_cov = text_coverage_score(
-            resume_lower, request.required_skills or [], skill_normalizer
-        )
-        sem_skill_align = semantic_skill_alignment(
-            semantic_matcher,
-            request.resume_text,
-            request.required_skills or [],
-            skill_normalizer,
-        )
-        required_nonempty = bool(normalized_required_skills)
-        skill_match_ratio = blend_skill_match(
-            list_skill_ratio,
-            text_cov,
-            sem_skill_align,
-            required_nonempty,
-            fresher_role=is_fresher_role,
-        )
 
-        # Fresher CVs are short vs long JDs — cosine similarity undershoots even when keywords align.
-        skill_evidence = max(list_skill_ratio, text_cov, sem_skill_align)
-        semantic_scored = float(semantic_score)
-        if is_fresher_role:
-            semantic_scored = min(1.0, 0.38 * semantic_score + 0.62 * skill_evidence)
+def _job_profile(request, embed: bool = True) -> JobProfile:
+    return job_profiles.get_or_create(
+        request.job_title,
+        request.job_description,
+        request.job_description_pdf_text,
+        request.required_skills,
+        embed=embed,
+    )
 
-        experience_score = scoring_engine.calculate_experience_score(
-            parsed_resume.get('experience_years', 0),
-            min_exp
-        )
 
-        jd_for_projects = (request.job_description or "").strip()
-        if request.job_description_pdf_text:
-            jd_for_projects = (jd_for_projects + " " + (request.job_description_pdf_text or "")).strip()
-        project_relevance = semantic_matcher.compute_pair_similarity(
-            parsed_resume.get("project_text") or request.resume_text,
-            jd_for_projects or request.job_description or "role",
+def _resume_view_texts(request: ResumeEvaluationRequest, parsed_resume: dict) -> Dict[str, Union[str, Tuple[str, ...]]]:
+    """Resume-side view texts (the resume view as pooled chunks); empty views are left to the per-pair fallback."""
+    texts = {
+        "resume": semantic_matcher.resume_chunks(request.resume_text),
+        "role": semantic_matcher.role_resume_view(request.resume_text),
+        "project": semantic_matcher.resume_view(parsed_resume.get("project_text") or request.resume_text),
+    }
+    return {name: text for name, text in texts.items() if text}
+
+
+def _embed_candidates(
+    profile: JobProfile,
+    eval_requests: List[ResumeEvaluationRequest],
+    parsed: List[dict],
+) -> List[Optional[Dict[str, np.ndarray]]]:
+    """
+    Encode every view the candidates need in one batched pass: resume views
+    plus the job views when the profile has not been embedded yet.
+    Returns one view dict per candidate, or Nones when no model is loaded.
+    """
+    job_views = profile.views
+    named: Dict[str, str] = {}
+    if job_views is None:
+        named.update((f"job:{name}", text) for name, text in profile.texts.items())
+    per_candidate = [_resume_view_texts(req, p) for req, p in zip(eval_requests, parsed)]
+    for i, texts in enumerate(per_candidate):
+        named.update((f"{i}:{name}", text) for name, text in texts.items())
+    embedded = semantic_matcher.encode_views(named)
+    if embedded is None:
+        # No encoder: vectorize every text for the lexical fallback in one call
+        # (the fallback compares the truncated resume view, not its chunks).
+        texts = [text for text in named.values() if isinstance(text, str)]
+        texts.extend(semantic_matcher.resume_view(req.resume_text) for req in eval_requests)
+        lexical_index.transform(texts + list(profile.texts.values()))
+        return [None] * len(eval_requests)
+    if job_views is None:
+        job_views = profile.adopt_views({name: embedded[f"job:{name}"] for name in profile.texts})
+    out = []
+    for i, texts in enumerate(per_candidate):
+        views = dict(job_views)
+        views.update((name, embedded[f"{i}:{name}"]) for name in texts)
+        out.append(views)
+    return out
+
+
+def _view_similarity(views, a: str, b: str, fallback) -> float:
+    """Cosine lookup over the request's view embeddings, else the per-pair fallback."""
+    if views is not None and a in views and b in views:
+        return semantic_matcher.vector_similarity(views[a], views[b])
+    return fallback()
+
+
+# Per-candidate raw inputs (stored with each FeatureRecord) that each requirement
+# field feeds. The rest of scoring (blends, weights, filters) is cheap arithmetic
+# over the stored inputs and re-runs as-is.
+REQUIREMENT_INPUTS: Dict[str, Tuple[str, ...]] = {
+    "job_title": ("role_similarity",),
+    "job_description": ("jd_similarity", "project_relevance"),
+    "job_description_pdf_text": ("jd_similarity", "project_relevance"),
+    "required_skills": ("list_skill", "text_coverage", "skill_alignment"),
+    "min_experience_years": (),
+    "education_requirement": (),
+    "min_cgpa": (),
+    "allow_backlogs": (),
+    "max_backlogs": (),
+}
+# Fields read only by apply_rule_based_filters: a change re-runs the filters, not the features.
+FILTER_ONLY_FIELDS = frozenset({"min_cgpa", "allow_backlogs", "max_backlogs"})
+# Job text the Gemini rerank judged against; a change drops stored rerank scores.
+RERANK_FIELDS = frozenset({"job_title", "job_description", "job_description_pdf_text", "required_skills"})
+
+
+def _jd_similarity(resume_text: str, job, views) -> float:
+    return float(_view_similarity(
+        views, "resume", "job",
+        lambda: semantic_matcher.compute_similarity(
+            resume_text,
+            job.job_description,
+            job.job_description_pdf_text
+        ),
+    ))
+
+
+def _role_similarity(resume_text: str, job, views) -> float:
+    return float(_view_similarity(
+        views, "role", "title",
+        lambda: semantic_matcher.compute_role_similarity(
+            resume_text,
+            job.job_title
+        ),
+    ))
+
+
+def _skill_inputs(
+    resume_text: str,
+    normalized_resume_skills: List[str],
+    required_skills: List[str],
+    normalized_required_skills: List[str],
+    views,
+) -> Tuple[float, float, float]:
+    """(skill list match, text coverage, semantic skill alignment) of a resume."""
+    list_skill_ratio = scoring_engine.calculate_skill_match(
+        normalized_resume_skills, normalized_required_skills
+    )
+    text_cov = text_coverage_score(
+        (resume_text or "").lower(), required_skills or [], skill_normalizer
+    )
+    if required_skills:
+        sem_skill_align = _view_similarity(
+            views, "resume", "skills",
+            lambda: semantic_skill_alignment(
+                semantic_matcher,
+                resume_text,
+                required_skills or [],
+                skill_normalizer,
+            ),
         )
-        signal_score = competitive_signal_score(resume_lower)
-
-        project_score = scoring_engine.calculate_project_score(
-            parsed_resume.get('project_count', 0),
-            parsed_resume.get('internship_count', 0),
-            project_relevance=project_relevance,
-            signal_score=signal_score,
-            is_fresher=is_fresher_role,
+    else:
+        sem_skill_align = 1.0
+    return float(list_skill_ratio), float(text_cov), float(sem_skill_align)
+
+
+def _project_relevance(project_text: str, profile: JobProfile, views) -> float:
+    return float(_view_similarity(
+        views, "project", "project_jd",
+        lambda: semantic_matcher.compute_pair_similarity(project_text, profile.project_jd_text),
+    ))
+
+
+def _compose_features(
+    job,
+    normalized_required_skills: List[str],
+    inputs: dict,
+) -> Tuple[InternalFeatureScores, bool]:
+    """STEP 3: feature scores from a candidate's raw inputs; returns (scores, is_fresher_role)."""
+    # Light title blend — JD similarity stays primary.
+    semantic_score = min(1.0, max(0.0, (0.92 * inputs["jd_similarity"]) + (0.08 * inputs["role_similarity"])))
+
+    min_exp = job.min_experience_years
+    if min_exp is None:
+        min_exp = 0.0
+    is_fresher_role = min_exp <= 0.0
+
+    list_skill_ratio = inputs["list_skill"]
+    text_cov = inputs["text_coverage"]
+    sem_skill_align = inputs["skill_alignment"]
+    skill_match_ratio = blend_skill_match(
+        list_skill_ratio,
+        text_cov,
+        sem_skill_align,
+        bool(normalized_required_skills),
+        fresher_role=is_fresher_role,
+    )
+
+    # Fresher CVs are short vs long JDs — cosine similarity undershoots even when keywords align.
+    skill_evidence = max(list_skill_ratio, text_cov, sem_skill_align)
+    semantic_scored = float(semantic_score)
+    if is_fresher_role:
+        semantic_scored = min(1.0, 0.38 * semantic_score + 0.62 * skill_evidence)
+
+    experience_score = scoring_engine.calculate_experience_score(
+        inputs["experience_years"],
+        min_exp
+    )
+    project_score = scoring_engine.calculate_project_score(
+        inputs["project_count"],
+        inputs["internship_count"],
+        project_relevance=inputs["project_relevance"],
+        signal_score=inputs["signal"],
+        is_fresher=is_fresher_role,
+    )
+    education_score = scoring_engine.calculate_education_match(
+        inputs["degree"],
+        job.education_requirement
+    )
+    scores = InternalFeatureScores(
+        semantic_score=semantic_scored,
+        skill_match_ratio=skill_match_ratio,
+        experience_score=experience_score,
+        project_score=project_score,
+        education_score=education_score
+    )
+    return scores, is_fresher_role
+
+
+def _apply_filters(job, inputs: dict) -> Tuple[bool, List[str]]:
+    """STEP 4.5: rule-based hard filters for a candidate's stored inputs."""
+    return scoring_engine.apply_rule_based_filters(
+        candidate_cgpa=inputs["cgpa"],
+        min_cgpa=job.min_cgpa,
+        candidate_backlogs=inputs["backlogs"],
+        allow_backlogs=job.allow_backlogs,
+        max_backlogs=job.max_backlogs,
+        resume_degree=inputs["degree"],
+        required_degree=job.education_requirement,
+    )
+
+
+def _evaluate(
+    request: ResumeEvaluationRequest,
+    profile: JobProfile,
+    parsed_resume: dict,
+    views: Optional[Dict[str, np.ndarray]],
+) -> Tuple[ResumeEvaluationResponse, FeatureRecord]:
+    """
+    Full evaluation pipeline for one parsed resume.
+    Returns the response and the scoring inputs kept for re-scoring.
+
+    `views` carries embeddings keyed by view name (resume, role, project, job,
+    title, project_jd, skills); any missing view is computed per pair through
+    SemanticMatcher.
+    """
+    # STEP 2: Semantic Matching
+    with stage("semantic"):
+        jd_similarity = _jd_similarity(request.resume_text, request, views)
+        role_similarity = _role_similarity(request.resume_text, request, views)
+
+    # STEP 3: Feature Engineering
+    with stage("skills"):
+        normalized_resume_skills = skill_normalizer.normalize_skills(parsed_resume.get('skills', []))
+        normalized_required_skills = profile.normalized_required_skills
+        list_skill_ratio, text_cov, sem_skill_align = _skill_inputs(
+            request.resume_text,
+            normalized_resume_skills,
+            request.required_skills,
+            normalized_required_skills,
+            views,
         )
-        
-        education_score = scoring_engine.calculate_education_match(
-            parsed_resume.get('education_degree', ''),
-            request.education_requirement
+
+    with stage("features"):
+        project_relevance = _project_relevance(
+            parsed_resume.get("project_text") or request.resume_text, profile, views
         )
+        signal_score = competitive_signal_score((request.resume_text or "").lower())
 
-        # Keyword stuffing penalty
+    # Keyword stuffing penalty
+    with stage("stuffing"):
         stuffing_penalty = scoring_engine.calculate_keyword_stuffing_penalty(
             request.resume_text,
             normalized_resume_skills
         )
 
+    # Everything below reads only these inputs and the job requirements, which is
+    # what lets /jobs/{job_key}/reevaluate recompute just the part a change touches.
+    inputs = {
+        "jd_similarity": jd_similarity,
+        "role_similarity": role_similarity,
+        "list_skill": list_skill_ratio,
+        "text_coverage": text_cov,
+        "skill_alignment": sem_skill_align,
+        "project_relevance": project_relevance,
+        "signal": float(signal_score),
+        "skills": normalized_resume_skills,
+        "experience_years": parsed_resume.get('experience_years', 0),
+        "project_count": parsed_resume.get('project_count', 0),
+        "internship_count": parsed_resume.get('internship_count', 0),
+        "degree": parsed_resume.get('education_degree', ''),
+        "cgpa": request.candidate_cgpa,
+        "backlogs": request.candidate_backlogs,
+        "resume": resume_key(request.resume_text),
+    }
+
+    with stage("scoring"):
+        internal_scores, is_fresher_role = _compose_features(request, normalized_required_skills, inputs)
         matched_skills = []
         req_set = set(normalized_required_skills)
         res_set = set(normalized_resume_skills)
@@ -218,14 +900,6 @@ async def evaluate_resume(request: ResumeEvaluationRequest):
                 matched_skills.append(rs)
 
         # STEP 4: Weighted Scoring
-        internal_scores = InternalFeatureScores(
-            semantic_score=semantic_scored,
-            skill_match_ratio=skill_match_ratio,
-            experience_score=experience_score,
-            project_score=project_score,
-            education_score=education_score
-        )
-        
         weight_profile = (
             scoring_engine.FRESHER_WEIGHTS if is_fresher_role else scoring_engine.WEIGHTS
         )
@@ -235,88 +909,1075 @@ async def evaluate_resume(request: ResumeEvaluationRequest):
             weights=weight_profile,
         )
 
-        # STEP 4.5: Rule-based hard filters
-        passes_filters, filter_reasons = scoring_engine.apply_rule_based_filters(
-            candidate_cgpa=request.candidate_cgpa,
-            min_cgpa=request.min_cgpa,
-            candidate_backlogs=request.candidate_backlogs,
-            allow_backlogs=request.allow_backlogs,
-            max_backlogs=request.max_backlogs,
-            resume_degree=parsed_resume.get('education_degree', ''),
-            required_degree=request.education_requirement,
+    # STEP 4.5: Rule-based hard filters
+    with stage("filters"):
+        passes_filters, filter_reasons = _apply_filters(request, inputs)
+    
+    # STEP 5: Decision Logic
+    if not passes_filters:
+        decision = "REJECTED"
+        final_score = min(final_score, FILTER_REJECT_SCORE_CAP)
+    elif final_score >= SHORTLIST_SCORE_MIN:
+        decision = "SHORTLISTED"
+    elif final_score >= REVIEW_SCORE_MIN:
+        decision = "REVIEW"
+    else:
+        decision = "REJECTED"
+
+    external_scores = FeatureScores(
+        semantic=internal_scores.semantic_score,
+        skills=internal_scores.skill_match_ratio,
+        experience=internal_scores.experience_score,
+        projects=internal_scores.project_score,
+        education=internal_scores.education_score,
+    )
+
+    record = FeatureRecord(
+        features=internal_scores.model_dump(),
+        stuffing_penalty=stuffing_penalty,
+        passes_filters=passes_filters,
+        is_fresher=is_fresher_role,
+        detail={"filter_reasons": filter_reasons, "inputs": inputs},
+        resume_text=request.resume_text,
+    )
+    response = ResumeEvaluationResponse(
+        final_score=final_score,
+        decision=decision,
+        feature_scores=external_scores,
+        explanation=_explanation(final_score, decision, parsed_resume, record),
+        parsed_resume=parsed_resume,
+        matched_skills=matched_skills,
+    )
+    return response, record
+
+
+def _explanation(final_score: float, decision: str, parsed_resume: dict, record: FeatureRecord) -> str:
+    with stage("explanation"):
+        explanation = explanation_generator.generate(
+            final_score=final_score,
+            feature_scores=InternalFeatureScores(**record.features),
+            decision=decision,
+            parsed_resume=parsed_resume
         )
-        
-        # STEP 5: Decision Logic
-        if not passes_filters:
-            decision = "REJECTED"
-            final_score = min(final_score, 0.55)
-        elif final_score >= SHORTLIST_SCORE_MIN:
+        filter_reasons = record.detail.get("filter_reasons") or []
+        if filter_reasons:
+            explanation += "\n\nRule-based filters:\n- " + "\n- ".join(filter_reasons)
+        if record.stuffing_penalty > 0:
+            explanation += f"\n\nKeyword stuffing penalty applied: -{record.stuffing_penalty * 100:.1f}%"
+    return explanation
+
+
+def _apply_rerank(
+    response: ResumeEvaluationResponse,
+    record: FeatureRecord,
+    reranked: Tuple[float, str],
+) -> None:
+    """STEP 6: blend a Gemini refined score into an evaluated candidate, in place."""
+    refined_10, feedback = reranked
+    refined_score = refined_10 / 10.0
+    final_score = response.final_score
+    decision = response.decision
+    gemini_weight = GEMINI_BLEND_WEIGHT
+    if REVIEW_SCORE_MIN <= final_score <= GEMINI_BAND_MAX:
+        gemini_weight = GEMINI_BAND_BLEND_WEIGHT
+    final_score = min(
+        1.0,
+        max(0.0, (1.0 - gemini_weight) * final_score + gemini_weight * refined_score),
+    )
+    if record.passes_filters:
+        if final_score >= SHORTLIST_SCORE_MIN:
             decision = "SHORTLISTED"
         elif final_score >= REVIEW_SCORE_MIN:
             decision = "REVIEW"
         else:
             decision = "REJECTED"
 
-        gemini_data = None
-        if request.use_gemini_rerank:
-            reranked = gemini_reranker.rerank(
-                resume_text=request.resume_text,
-                job_description=request.job_description
+    record.gemini_score = refined_score
+    response.final_score = final_score
+    response.decision = decision
+    response.gemini_rerank = {"refined_score_10": refined_10, "feedback": feedback}
+    response.explanation = _explanation(final_score, decision, response.parsed_resume, record)
+
+
+async def _rerank_all(
+    job_description: str,
+    evaluated: List[Tuple[str, ResumeEvaluationResponse, FeatureRecord]],
+    group_size: int = 1,
+) -> int:
+    """
+    Rerank (resume_text, response, record) triples concurrently; failures keep
+    the local score. Returns how many candidates were reranked.
+    """
+    if not evaluated or not gemini_reranker.is_enabled():
+        return 0
+    reranked = await gemini_reranker.rerank_many(
+        resume_texts=[resume_text for resume_text, _, _ in evaluated],
+        job_description=job_description,
+        group_size=group_size,
+    )
+    applied = 0
+    for (_, response, record), result in zip(evaluated, reranked):
+        if result:
+            _apply_rerank(response, record, result)
+            applied += 1
+    return applied
+
+
+def _cascade_selection(
+    scores: Sequence[float],
+    passes_filters: Sequence[bool],
+    top_k: int,
+    band: float,
+) -> List[int]:
+    """
+    Indices worth a Gemini call: the top_k local scores plus every score within
+    `band` of SHORTLIST_SCORE_MIN or REVIEW_SCORE_MIN. Candidates failing hard
+    filters stay REJECTED whatever Gemini says, so they are never sent.
+    """
+    eligible = [i for i, passed in enumerate(passes_filters) if passed]
+    selected = set()
+    if top_k > 0:
+        selected.update(sorted(eligible, key=lambda i: -scores[i])[:top_k])
+    if band > 0:
+        selected.update(
+            i for i in eligible
+            if abs(scores[i] - SHORTLIST_SCORE_MIN) <= band or abs(scores[i] - REVIEW_SCORE_MIN) <= band
+        )
+    return sorted(selected)
+
+
+class _StreamCascade:
+    """
+    Cascade top-K for /rank-stream, taken over the whole stream rather than per
+    chunk: a heap of the `top_k` best local scores among candidates passing
+    filters. Chunks still rerank their uncertainty band as they are scored; the
+    heap's candidates not sent with their band are reranked after the last chunk.
+    """
+
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+        self.heap: List[tuple] = []
+        # Results scored before the current chunk, so entries carry their stream order.
+        self.offset = 0
+        self.job_key: Optional[str] = None
+
+    def offer(self, index: int, score: float, scored: tuple, sent: bool) -> None:
+        """Consider the chunk's `index`-th scored (candidate, item, record) at its local score."""
+        if self.top_k <= 0:
+            return
+        entry = (score, -(self.offset + index + 1), sent, scored)
+        if len(self.heap) < self.top_k:
+            heapq.heappush(self.heap, entry)
+        elif entry[:2] > self.heap[0][:2]:
+            heapq.heapreplace(self.heap, entry)
+
+    def pending(self) -> List[Tuple[int, tuple]]:
+        """(stream order, scored) of the top-K not reranked with their chunk's band."""
+        return [(-neg_order, scored) for _, neg_order, sent, scored in sorted(self.heap, reverse=True) if not sent]
+
+
+def _rescore(
+    matrix: FeatureMatrix,
+    weights: Dict[str, float],
+    fresher_weights: Dict[str, float],
+    shortlist_min: float,
+    review_min: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized STEP 4-5 of _evaluate over stored features: weighted score,
+    filter cap, Gemini blend and decision bands. Returns (scores, decisions).
+    """
+    regular = scoring_engine.compute_final_scores(matrix.features, matrix.stuffing_penalty, weights)
+    fresher = scoring_engine.compute_final_scores(matrix.features, matrix.stuffing_penalty, fresher_weights)
+    scores = np.where(matrix.is_fresher, fresher, regular)
+    scores = np.where(matrix.passes_filters, scores, np.minimum(scores, FILTER_REJECT_SCORE_CAP))
+
+    reranked = ~np.isnan(matrix.gemini_score)
+    blend = np.where(
+        (scores >= review_min) & (scores <= GEMINI_BAND_MAX),
+        GEMINI_BAND_BLEND_WEIGHT,
+        GEMINI_BLEND_WEIGHT,
+    )
+    blended = np.clip((1.0 - blend) * scores + blend * np.nan_to_num(matrix.gemini_score), 0.0, 1.0)
+    scores = np.where(reranked, blended, scores)
+
+    decisions = np.select(
+        [~matrix.passes_filters, scores >= shortlist_min, scores >= review_min],
+        ["REJECTED", "SHORTLISTED", "REVIEW"],
+        default="REJECTED",
+    )
+    return scores, decisions
+
+
+def _evaluate_resume_sync(request: ResumeEvaluationRequest) -> Tuple[ResumeEvaluationResponse, FeatureRecord, str]:
+    """Local pipeline (steps 1-5) for one resume; returns (response, record, job_key)."""
+    # STEP 1: Resume Parsing
+    with stage("parse"):
+        parsed_resume = resume_parser.parse(request.resume_text)
+    # Job views are embedded alongside the resume views when not cached yet.
+    with stage("job_profile"):
+        profile = _job_profile(request, embed=False)
+    with stage("embed"):
+        views = _embed_candidates(profile, [request], [parsed_resume])[0]
+    response, record = _evaluate(request, profile, parsed_resume, views)
+    return response, record, _job_key(request, profile)
+
+
+def _evaluate_batch_sync(
+    batch: BatchEvaluationRequest,
+) -> Tuple[BatchEvaluationResponse, List[Optional[FeatureRecord]], str]:
+    """Local pipeline for a batch; records align with results (None where a candidate failed)."""
+    eval_requests = [batch.candidate_request(c) for c in batch.candidates]
+    with stage("parse"):
+        parsed = [resume_parser.parse(req.resume_text) for req in eval_requests]
+    with stage("job_profile"):
+        profile = _job_profile(batch, embed=False)
+    with stage("embed"):
+        views = _embed_candidates(profile, eval_requests, parsed)
+
+    results = []
+    records: List[Optional[FeatureRecord]] = []
+    for candidate, req, parsed_resume, cand_views in zip(batch.candidates, eval_requests, parsed, views):
+        try:
+            result, record = _evaluate(req, profile, parsed_resume, cand_views)
+            results.append(BatchEvaluationItem(candidate_id=candidate.candidate_id, result=result))
+            records.append(record)
+        except Exception as e:
+            results.append(BatchEvaluationItem(candidate_id=candidate.candidate_id, error=str(e)))
+            records.append(None)
+    return BatchEvaluationResponse(results=results), records, _job_key(batch, profile)
+
+
+async def _store_features(
+    job_key: str,
+    records: List[Tuple[Union[int, str], FeatureRecord]],
+    timings: Timings,
+    job=None,
+) -> None:
+    """Persist records, with the requirements of `job` (the request) they were scored under."""
+    if records:
+        started = time.perf_counter()
+        requirements = JobRequirements.of(job).model_dump() if job is not None else None
+        await asyncio.to_thread(feature_store.upsert_many, job_key, records, requirements)
+        timings.add("store_features", time.perf_counter() - started)
+
+
+async def _complete_batch(
+    batch: BatchEvaluationRequest,
+    evaluated: Tuple[BatchEvaluationResponse, List[Optional[FeatureRecord]], str],
+    timings: Timings,
+    cascade: Optional[_StreamCascade] = None,
+) -> BatchEvaluationResponse:
+    """
+    Rerank the locally scored batch on the event loop (when requested), then store
+    features. With `cascade` (a /rank-stream chunk) only the band is reranked here
+    and the top-K candidates are offered to the stream-wide heap instead.
+    """
+    response, records, job_key = evaluated
+    scored = [
+        (candidate, item, record)
+        for candidate, item, record in zip(batch.candidates, response.results, records)
+        if record is not None
+    ]
+    if batch.use_gemini_rerank:
+        if batch.rerank_mode == "cascade":
+            top_k = CASCADE_TOP_K if batch.rerank_top_k is None else batch.rerank_top_k
+            band = CASCADE_BAND if batch.rerank_band is None else batch.rerank_band
+            scores = [item.result.final_score for _, item, _ in scored]
+            chosen = _cascade_selection(
+                scores,
+                [record.passes_filters for _, _, record in scored],
+                0 if cascade is not None else top_k,
+                band,
+            )
+            if cascade is not None:
+                cascade.job_key = job_key
+                sent = set(chosen)
+                for i, entry in enumerate(scored):
+                    if entry[2].passes_filters:
+                        cascade.offer(i, scores[i], entry, i in sent)
+            to_rerank = [scored[i] for i in chosen]
+        else:
+            to_rerank = scored
+        group_size = RERANK_GROUP_SIZE if batch.rerank_group_size is None else batch.rerank_group_size
+        started = time.perf_counter()
+        reranked = await _rerank_all(
+            batch.job_description,
+            [(candidate.resume_text, item.result, record) for candidate, item, record in to_rerank],
+            group_size=group_size,
+        )
+        timings.add("rerank", time.perf_counter() - started)
+        response.rerank = {
+            "mode": batch.rerank_mode,
+            "scored": len(scored),
+            "sent": len(to_rerank),
+            "reranked": reranked,
+        }
+    await _store_features(job_key, [(item.candidate_id, record) for _, item, record in scored], timings, batch)
+    return response
+
+
+def _rescore_sync(job_key: str, request: RescoreRequest, matrix: FeatureMatrix) -> RescoreResponse:
+    """Rescore a job's stored features; the matrix is read in the server process (see rescore_job)."""
+    started = time.perf_counter()
+    weights = {**scoring_engine.WEIGHTS, **(request.weights or {})}
+    fresher_weights = {**scoring_engine.FRESHER_WEIGHTS, **(request.fresher_weights or {})}
+    shortlist_min = SHORTLIST_SCORE_MIN if request.shortlist_min is None else request.shortlist_min
+    review_min = REVIEW_SCORE_MIN if request.review_min is None else request.review_min
+    with stage("rescore"):
+        scores, decisions = _rescore(matrix, weights, fresher_weights, shortlist_min, review_min)
+    return RescoreResponse(
+        job_key=job_key,
+        **_decision_summary(matrix, scores, decisions, request.include_candidates),
+        elapsed_ms=(time.perf_counter() - started) * 1000.0,
+    )
+
+
+def _decision_summary(matrix: FeatureMatrix, scores: np.ndarray, decisions: np.ndarray, include_candidates: bool) -> dict:
+    """Decision counts and (optionally) the candidates best first, as RescoreResponse fields."""
+    labels, counts = np.unique(decisions, return_counts=True)
+    decision_counts = {"SHORTLISTED": 0, "REVIEW": 0, "REJECTED": 0}
+    decision_counts.update({str(label): int(count) for label, count in zip(labels, counts)})
+    candidates = []
+    if include_candidates:
+        order = np.argsort(-scores, kind="stable")
+        candidates = [
+            RescoredCandidate(
+                candidate_id=matrix.candidate_ids[i],
+                final_score=float(scores[i]),
+                decision=str(decisions[i]),
             )
-            if reranked:
-                refined_10, feedback = reranked
-                refined_score = refined_10 / 10.0
-                gemini_weight = 0.35
-                if REVIEW_SCORE_MIN <= final_score <= 0.82:
-                    gemini_weight = 0.42
-                final_score = min(
-                    1.0,
-                    max(0.0, (1.0 - gemini_weight) * final_score + gemini_weight * refined_score),
+            for i in order
+        ]
+    return {"candidates_scored": len(matrix), "decisions": decision_counts, "candidates": candidates}
+
+
+def _recompute_inputs(
+    job: JobRequirements,
+    profile: JobProfile,
+    names: Sequence[str],
+    inputs: List[dict],
+    texts: List[str],
+) -> None:
+    """
+    Recompute the named raw inputs for candidates (in place) from their stored
+    resume texts. Resume views come from the embedding cache when present and
+    are encoded in one batched pass otherwise; the resume is only re-parsed
+    when project relevance is needed.
+    """
+    names = set(names)
+    needed = set()
+    if names & {"jd_similarity", "skill_alignment"}:
+        needed.add("resume")
+    if "role_similarity" in names:
+        needed.add("role")
+    if "project_relevance" in names:
+        needed.add("project")
+    parsed = None
+    if "project" in needed:
+        with stage("parse"):
+            parsed = [resume_parser.parse(text) for text in texts]
+
+    per_candidate = [None] * len(texts)
+    if profile.views is not None and needed:
+        with stage("embed"):
+            named = {}
+            for i, text in enumerate(texts):
+                views = {
+                    "resume": semantic_matcher.resume_chunks(text) if "resume" in needed else None,
+                    "role": semantic_matcher.role_resume_view(text) if "role" in needed else None,
+                    "project": semantic_matcher.resume_view(parsed[i].get("project_text") or text) if parsed else None,
+                }
+                named.update((f"{i}:{name}", view) for name, view in views.items() if view)
+            embedded = semantic_matcher.encode_views(named)
+        if embedded is not None:
+            per_candidate = []
+            for i in range(len(texts)):
+                views = dict(profile.views)
+                views.update((name, embedded[f"{i}:{name}"]) for name in needed if f"{i}:{name}" in embedded)
+                per_candidate.append(views)
+
+    for i, (text, candidate) in enumerate(zip(texts, inputs)):
+        views = per_candidate[i]
+        if names & {"jd_similarity", "role_similarity"}:
+            with stage("semantic"):
+                if "jd_similarity" in names:
+                    candidate["jd_similarity"] = _jd_similarity(text, job, views)
+                if "role_similarity" in names:
+                    candidate["role_similarity"] = _role_similarity(text, job, views)
+        if names & {"list_skill", "text_coverage", "skill_alignment"}:
+            with stage("skills"):
+                candidate["list_skill"], candidate["text_coverage"], candidate["skill_alignment"] = _skill_inputs(
+                    text, candidate["skills"], job.required_skills, profile.normalized_required_skills, views
+                )
+        if "project_relevance" in names:
+            with stage("features"):
+                candidate["project_relevance"] = _project_relevance(
+                    parsed[i].get("project_text") or text, profile, views
                 )
-                gemini_data = {"refined_score_10": refined_10, "feedback": feedback}
-                if passes_filters:
-                    if final_score >= SHORTLIST_SCORE_MIN:
-                        decision = "SHORTLISTED"
-                    elif final_score >= REVIEW_SCORE_MIN:
-                        decision = "REVIEW"
-                    else:
-                        decision = "REJECTED"
-
-        external_scores = FeatureScores(
-            semantic=semantic_scored,
-            skills=skill_match_ratio,
-            experience=experience_score,
-            projects=project_score,
-            education=education_score,
+
+
+def _requirements_edit(previous: dict, request: ReevaluateRequest) -> Tuple[JobRequirements, List[str], List[str]]:
+    """(edited requirements, changed fields, raw inputs to recompute) for an edit of `previous`."""
+    job = JobRequirements(**{**previous, **request.changes()})
+    current = job.model_dump()
+    changed = [name for name in JobRequirements.model_fields if current[name] != previous.get(name)]
+    return job, changed, sorted({name for field in changed for name in REQUIREMENT_INPUTS[field]})
+
+
+def _load_reevaluation(
+    job_key: str, request: ReevaluateRequest
+) -> Tuple[List[Tuple[Union[int, str], FeatureRecord]], dict, Dict[str, str]]:
+    """
+    Stored records, requirements and (when inputs are recomputed) resume texts
+    of a job. Read in the server process: pool workers never touch SQLite.
+    """
+    stored = feature_store.records(job_key)
+    previous = feature_store.requirements(job_key)
+    if not stored or previous is None:
+        raise KeyError(job_key)
+    texts: Dict[str, str] = {}
+    if _requirements_edit(previous, request)[2]:
+        texts = feature_store.resume_texts(
+            record.detail["inputs"]["resume"] for _, record in stored if "inputs" in record.detail
         )
+    return stored, previous, texts
 
-        # Generate explanation
-        explanation = explanation_generator.generate(
-            final_score=final_score,
-            feature_scores=internal_scores,
-            decision=decision,
-            parsed_resume=parsed_resume
+
+def _reevaluate_sync(
+    job_key: str,
+    request: ReevaluateRequest,
+    stored: List[Tuple[Union[int, str], FeatureRecord]],
+    previous: dict,
+    texts: Dict[str, str],
+) -> Tuple[ReevaluateResponse, List[Tuple[Union[int, str], FeatureRecord]], JobRequirements]:
+    """
+    Apply a requirements edit to every stored candidate of a job, recomputing
+    only the inputs the changed fields feed (REQUIREMENT_INPUTS) and re-running
+    the feature composition and filters over the stored rest. Works on what
+    _load_reevaluation read; returns the response, the updated records and the
+    requirements to store them under.
+    """
+    started = time.perf_counter()
+    job, changed, recompute = _requirements_edit(previous, request)
+
+    usable = [(i, record) for i, (_, record) in enumerate(stored) if "inputs" in record.detail]
+    skipped = [stored[i][0] for i in range(len(stored)) if "inputs" not in stored[i][1].detail]
+    inputs = [record.detail["inputs"] for _, record in usable]
+    profile = _job_profile(job, embed=bool(recompute))
+    if recompute:
+        missing = {candidate["resume"] for candidate in inputs} - set(texts)
+        if missing:
+            raise RuntimeError(f"{len(missing)} stored resume texts are missing")
+        _recompute_inputs(job, profile, recompute, inputs, [texts[candidate["resume"]] for candidate in inputs])
+
+    rescore_features = bool(set(changed) - FILTER_ONLY_FIELDS)
+    refilter = bool(set(changed) & (FILTER_ONLY_FIELDS | {"education_requirement"}))
+    drop_rerank = bool(set(changed) & RERANK_FIELDS)
+    with stage("scoring"):
+        for (_, record), candidate in zip(usable, inputs):
+            if rescore_features:
+                scores, record.is_fresher = _compose_features(job, profile.normalized_required_skills, candidate)
+                record.features = scores.model_dump()
+            if refilter:
+                record.passes_filters, record.detail["filter_reasons"] = _apply_filters(job, candidate)
+            if drop_rerank:
+                record.gemini_score = None
+    updated = [(stored[i][0], record) for i, record in usable]
+
+    matrix = FeatureMatrix(
+        [candidate_id for candidate_id, _ in stored],
+        [
+            (
+                *(record.features[name] for name in scoring_engine.FEATURE_NAMES),
+                record.stuffing_penalty,
+                record.passes_filters,
+                record.is_fresher,
+                record.gemini_score,
+            )
+            for _, record in stored
+        ],
+    )
+    with stage("rescore"):
+        scores, decisions = _rescore(
+            matrix, scoring_engine.WEIGHTS, scoring_engine.FRESHER_WEIGHTS, SHORTLIST_SCORE_MIN, REVIEW_SCORE_MIN
         )
-        if filter_reasons:
-            explanation += "\n\nRule-based filters:\n- " + "\n- ".join(filter_reasons)
-        if stuffing_penalty > 0:
-            explanation += f"\n\nKeyword stuffing penalty applied: -{stuffing_penalty * 100:.1f}%"
-        
-        return ResumeEvaluationResponse(
-            final_score=final_score,
-            decision=decision,
-            feature_scores=external_scores,
-            explanation=explanation,
-            parsed_resume=parsed_resume,
-            matched_skills=matched_skills,
-            gemini_rerank=gemini_data
+    response = ReevaluateResponse(
+        job_key=job_key,
+        **_decision_summary(matrix, scores, decisions, request.include_candidates),
+        changed=changed,
+        recomputed=recompute,
+        skipped=skipped,
+        elapsed_ms=(time.perf_counter() - started) * 1000.0,
+    )
+    return response, updated, job
+
+
+def _register_job_profile_sync(request: JobProfileRequest) -> JobProfileResponse:
+    profile = _job_profile(request)
+    return JobProfileResponse(
+        job_profile_id=profile.key,
+        normalized_required_skills=profile.normalized_required_skills,
+        embedded=profile.views is not None,
+    )
+
+
+def _embed_resumes_sync(request: CandidateIndexRequest) -> Optional[np.ndarray]:
+    """Resume document vectors (as used for semantic scoring) for indexing; None without a model."""
+    with stage("embed"):
+        return semantic_matcher.embed_resumes([c.resume_text for c in request.candidates])
+
+
+def _job_vector_sync(request: MatchCandidatesRequest) -> Tuple[str, Optional[np.ndarray]]:
+    """Job profile id and its JD embedding (embedded once and cached with the profile)."""
+    with stage("job_profile"):
+        profile = _job_profile(request)
+    return profile.key, (profile.views or {}).get("job")
+
+
+async def _run_timed(fn, *args) -> Tuple[object, Timings]:
+    """
+    Run fn on the bounded executor under a stage collector. Worker-side stages
+    come back with the result; the remainder of the wall time (queueing and
+    dispatch) is recorded as the "queue" stage.
+    """
+    started = time.perf_counter()
+    result, timings = await pipeline_executor.run(collect, fn, *args)
+    timings.add("queue", max(0.0, time.perf_counter() - started - sum(timings.stages.values())))
+    return result, timings
+
+
+async def _run_pipeline(fn, payload, error_prefix: str) -> Tuple[object, Timings]:
+    """Run a blocking pipeline function on the bounded executor; returns (result, timings)."""
+    try:
+        return await _run_timed(fn, payload)
+    except ExecutorSaturated as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"{error_prefix}: {str(e)}"
         )
-        
+
+
+@app.post("/evaluate-resume", response_model=ResumeEvaluationResponse)
+async def evaluate_resume(request: ResumeEvaluationRequest):
+    """
+    Main endpoint for resume evaluation.
+    
+    Pipeline:
+    1. Parse resume using spaCy (extract skills, experience, education, projects)
+    2. Compute semantic similarity between resume and job description
+    3. Calculate feature scores (normalized to 0-1)
+    4. Apply weighted scoring model
+    5. Generate decision and explanation
+    """
+    include = _response_projection(request)
+    started = time.perf_counter()
+    (response, record, job_key), timings = await _run_pipeline(_evaluate_resume_sync, request, "Error evaluating resume")
+    try:
+        # STEP 6: optional Gemini rerank, awaited here so executor workers never wait on the network.
+        if request.use_gemini_rerank:
+            rerank_started = time.perf_counter()
+            await _rerank_all(request.job_description, [(request.resume_text, response, record)])
+            timings.add("rerank", time.perf_counter() - rerank_started)
+        if request.candidate_id is not None:
+            await _store_features(job_key, [(request.candidate_id, record)], timings, request)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error evaluating resume: {str(e)}"
         )
+    _finish_request("evaluate_resume", started, timings)
+    if request.include_timings:
+        response.timings = timings.milliseconds()
+    if request.compact:
+        _headline(response)
+    return _json_response(response, include)
+
+
+@app.post("/evaluate-batch", response_model=BatchEvaluationResponse)
+async def evaluate_batch(batch: BatchEvaluationRequest):
+    """
+    Evaluate many resumes against one job.
+
+    The job description, title and skills are embedded once and all resume
+    views are encoded in batched calls; each candidate then runs the same
+    pipeline as /evaluate-resume. Per-candidate failures are reported in
+    that candidate's `error` instead of failing the whole batch.
+    """
+    include = _response_projection(batch)
+    if not batch.candidates:
+        return BatchEvaluationResponse(results=[])
+    started = time.perf_counter()
+    evaluated, timings = await _run_pipeline(_evaluate_batch_sync, batch, "Error evaluating batch")
+    try:
+        response = await _complete_batch(batch, evaluated, timings)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error evaluating batch: {str(e)}"
+        )
+    _finish_request("evaluate_batch", started, timings, batch_size=len(batch.candidates))
+    if batch.include_timings:
+        response.timings = timings.milliseconds()
+    if batch.compact:
+        for item in response.results:
+            if item.result is not None:
+                _headline(item.result)
+    if include is not None:
+        # Timings are reported once for the batch, not per result.
+        include.pop("timings", None)
+        include = {
+            "results": {"__all__": {"candidate_id": True, "result": include, "error": True}},
+            "rerank": True,
+            "timings": True,
+        }
+    return _json_response(response, include)
+
+
+async def _ndjson_lines(request: Request, consumed: Optional[asyncio.Event] = None) -> AsyncIterator[bytes]:
+    """
+    Non-empty lines of a streamed request body, without buffering the whole body.
+    Sets `consumed` once the body has been read to the end (or the read failed).
+    """
+    pending = b""
+    try:
+        async for chunk in request.stream():
+            parts = (pending + chunk).split(b"\n")
+            pending = parts.pop()
+            for line in parts:
+                if line.strip():
+                    yield line
+    finally:
+        if consumed is not None:
+            consumed.set()
+    if pending.strip():
+        yield pending
+
+
+class _UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose content is produced while the request body is still
+    being read. Starlette's disconnect watcher also calls receive(), so it would
+    take body messages meant for request.stream(); here it only starts once the
+    upload has been consumed (a disconnect before that ends request.stream()).
+    """
+
+    def __init__(self, content, body_consumed: asyncio.Event, **kwargs):
+        super().__init__(content, **kwargs)
+        self.body_consumed = body_consumed
+
+    async def listen_for_disconnect(self, receive) -> None:
+        await self.body_consumed.wait()
+        await super().listen_for_disconnect(receive)
+
+
+async def _ndjson_candidates(lines: AsyncIterator[bytes]) -> AsyncIterator[Tuple[Optional[BatchCandidate], Optional[str]]]:
+    async for line in lines:
+        try:
+            yield BatchCandidate.model_validate_json(line), None
+        except ValidationError as e:
+            yield None, f"Invalid candidate line: {e.errors()[0].get('msg', 'validation error')}"
+
+
+async def _list_candidates(candidates: List[BatchCandidate]) -> AsyncIterator[Tuple[Optional[BatchCandidate], Optional[str]]]:
+    for candidate in candidates:
+        yield candidate, None
+
+
+async def _score_chunk(
+    job: RankStreamRequest,
+    chunk: List[BatchCandidate],
+    cascade: Optional[_StreamCascade] = None,
+) -> BatchEvaluationResponse:
+    """Score one chunk on the executor, waiting (not failing the stream) while it is saturated."""
+    batch = job.chunk_request(chunk)
+    started = time.perf_counter()
+    while True:
+        try:
+            evaluated, timings = await _run_timed(_evaluate_batch_sync, batch)
+            break
+        except ExecutorSaturated:
+            await asyncio.sleep(0.05)
+    response = await _complete_batch(batch, evaluated, timings, cascade)
+    _finish_request("rank_stream_chunk", started, timings, batch_size=len(chunk))
+    return response
+
+
+async def _rerank_stream_top(job: RankStreamRequest, cascade: _StreamCascade) -> Tuple[int, List[Tuple[int, BatchEvaluationItem, str]]]:
+    """
+    Rerank the stream-wide cascade top-K once every chunk is scored and store their
+    updated features. Returns (sent, [(stream order, item, previous decision)]) for
+    the candidates whose rerank was applied.
+    """
+    pending = cascade.pending()
+    if not pending:
+        return 0, []
+    started = time.perf_counter()
+    timings = Timings()
+    previous = [item.result.decision for _, (_, item, _) in pending]
+    group_size = RERANK_GROUP_SIZE if job.rerank_group_size is None else job.rerank_group_size
+    rerank_started = time.perf_counter()
+    await _rerank_all(
+        job.job_description,
+        [(candidate.resume_text, item.result, record) for _, (candidate, item, record) in pending],
+        group_size=group_size,
+    )
+    timings.add("rerank", time.perf_counter() - rerank_started)
+    updated = [
+        (order, item, decision)
+        for (order, (_, item, record)), decision in zip(pending, previous)
+        if record.gemini_score is not None
+    ]
+    if updated:
+        records = [(item.candidate_id, record) for _, (_, item, record) in pending if record.gemini_score is not None]
+        await _store_features(cascade.job_key, records, timings, job)
+    _finish_request("rank_stream_rerank", started, timings, batch_size=len(pending))
+    return len(pending), updated
+
+
+def _ndjson(payload: dict) -> bytes:
+    return (json.dumps(payload, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _result_line(item: BatchEvaluationItem) -> dict:
+    result = item.result
+    return {
+        "type": "result",
+        "candidate_id": item.candidate_id,
+        "final_score": result.final_score,
+        "decision": result.decision,
+        "feature_scores": result.feature_scores.model_dump(),
+        "matched_skills": result.matched_skills,
+    }
+
+
+async def _rank_stream(
+    job: RankStreamRequest,
+    candidates: AsyncIterator[Tuple[Optional[BatchCandidate], Optional[str]]],
+) -> AsyncIterator[bytes]:
+    """
+    Emit one NDJSON line per candidate as each chunk finishes, then a summary
+    with the top-K. Only the current chunk and the K-sized heaps are held.
+
+    In cascade mode the rerank top-K is chosen over the whole stream: result
+    lines carry local (or band-reranked) scores, and candidates reranked after
+    the last chunk are listed with their updated scores in the summary's
+    `reranked_results`.
+    """
+    cascade = None
+    if job.use_gemini_rerank and job.rerank_mode == "cascade" and gemini_reranker.is_enabled():
+        cascade = _StreamCascade(CASCADE_TOP_K if job.rerank_top_k is None else job.rerank_top_k)
+    # (score, -order, candidate_id, result). Holding the cascade's K extra entries keeps
+    # the summary exact after up to that many scores change in the final rerank.
+    top: List[Tuple[float, int, Union[int, str], ResumeEvaluationResponse]] = []
+    held = job.top_k + (cascade.top_k if cascade is not None else 0)
+    decisions = {"SHORTLISTED": 0, "REVIEW": 0, "REJECTED": 0}
+    processed = 0
+    errors = 0
+    rerank = {"sent": 0, "reranked": 0}
+
+    async def flush(chunk: List[BatchCandidate]):
+        nonlocal processed, errors
+        if cascade is not None:
+            cascade.offset = processed
+        try:
+            response = await _score_chunk(job, chunk, cascade)
+            items = response.results
+            if response.rerank:
+                rerank["sent"] += int(response.rerank["sent"])
+                rerank["reranked"] += int(response.rerank["reranked"])
+        except Exception as e:
+            items = [BatchEvaluationItem(candidate_id=c.candidate_id, error=str(e)) for c in chunk]
+        for item in items:
+            if item.result is None:
+                errors += 1
+                yield _ndjson({"type": "error", "candidate_id": item.candidate_id, "error": item.error})
+                continue
+            result = item.result
+            processed += 1
+            decisions[result.decision] = decisions.get(result.decision, 0) + 1
+            entry = (result.final_score, -processed, item.candidate_id, result)
+            if len(top) < held:
+                heapq.heappush(top, entry)
+            elif entry[:2] > top[0][:2]:
+                heapq.heapreplace(top, entry)
+            yield _ndjson(_result_line(item))
+
+    chunk: List[BatchCandidate] = []
+    async for candidate, error in candidates:
+        if error is not None:
+            errors += 1
+            yield _ndjson({"type": "error", "candidate_id": None, "error": error})
+            continue
+        chunk.append(candidate)
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            async for line in flush(chunk):
+                yield line
+            chunk = []
+    if chunk:
+        async for line in flush(chunk):
+            yield line
+
+    updated: List[Tuple[int, BatchEvaluationItem, str]] = []
+    if cascade is not None:
+        try:
+            sent, updated = await _rerank_stream_top(job, cascade)
+        except Exception as e:
+            sent = 0
+            yield _ndjson({"type": "error", "candidate_id": None, "error": f"Cascade rerank failed: {e}"})
+        rerank["sent"] += sent
+        rerank["reranked"] += len(updated)
+
+    # Re-rank with current scores: results reranked after the last chunk were updated in place.
+    entries = {-neg_order: (cid, result) for _, neg_order, cid, result in top}
+    for order, item, decision in updated:
+        entries[order] = (item.candidate_id, item.result)
+        decisions[decision] -= 1
+        decisions[item.result.decision] = decisions.get(item.result.decision, 0) + 1
+    ranked = sorted(
+        ((result.final_score, -order, cid, result.decision) for order, (cid, result) in entries.items()),
+        reverse=True,
+    )[:job.top_k]
+    summary = {
+        "type": "summary",
+        "processed": processed,
+        "errors": errors,
+        "decisions": decisions,
+        "top_k": [
+            {"rank": i + 1, "candidate_id": cid, "final_score": score, "decision": decision}
+            for i, (score, _, cid, decision) in enumerate(ranked)
+        ],
+    }
+    if job.use_gemini_rerank:
+        summary["rerank"] = {"mode": job.rerank_mode, **rerank}
+    if cascade is not None:
+        summary["reranked_results"] = [_result_line(item) for _, item, _ in sorted(updated, key=lambda u: u[0])]
+    yield _ndjson(summary)
+
+
+@app.post("/rank-stream")
+async def rank_stream(request: Request):
+    """
+    Rank resumes for one job, streaming newline-delimited JSON as candidates finish.
+
+    Body is either a JSON RankStreamRequest (job fields, `candidates`, `top_k`)
+    or, with Content-Type application/x-ndjson, a first line holding the job
+    fields and `top_k` followed by one BatchCandidate per line. Emits
+    {"type": "result" | "error", ...} lines and a final {"type": "summary"}
+    line with the ranked top-K.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    body_consumed = asyncio.Event()
+    try:
+        if content_type in ("application/x-ndjson", "application/jsonl"):
+            lines = _ndjson_lines(request, body_consumed)
+            first = await lines.__anext__()
+            job = RankStreamRequest.model_validate_json(first)
+            candidates = _ndjson_candidates(lines)
+        else:
+            job = RankStreamRequest.model_validate_json(await request.body())
+            candidates = _list_candidates(job.candidates)
+            body_consumed.set()
+    except StopAsyncIteration:
+        raise HTTPException(status_code=422, detail="Empty request body")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    return _UploadStreamingResponse(_rank_stream(job, candidates), body_consumed, media_type="application/x-ndjson")
+
+
+@app.post("/jobs/{job_key}/rescore", response_model=RescoreResponse)
+async def rescore_job(job_key: str, request: RescoreRequest):
+    """
+    Re-apply weights and decision thresholds to every stored candidate of a job
+    without re-running parsing or embedding. `job_key` is the `job_id` sent
+    with the evaluations, or the job profile id when none was sent.
+    """
+    unknown = set(request.weights or {}) | set(request.fresher_weights or {})
+    unknown -= set(scoring_engine.FEATURE_NAMES)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown weight names: {sorted(unknown)}")
+    started = time.perf_counter()
+    # Stores are read here, not in the pool: process workers must not use SQLite
+    # connections inherited over fork, and cannot see an in-memory database.
+    matrix = await asyncio.to_thread(feature_store.matrix, job_key)
+    if matrix is None:
+        raise HTTPException(status_code=404, detail=f"No stored features for job {job_key}")
+    load_seconds = time.perf_counter() - started
+    try:
+        response, timings = await _run_timed(_rescore_sync, job_key, request, matrix)
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    timings.add("load_features", load_seconds)
+    _finish_request("rescore", started, timings)
+    return response
+
+
+@app.post("/jobs/{job_key}/reevaluate", response_model=ReevaluateResponse)
+async def reevaluate_job(job_key: str, request: ReevaluateRequest):
+    """
+    Apply edited job requirements to every stored candidate of a job. Send only
+    the fields that change. Each feature keeps the raw inputs it was composed
+    from, so a skills edit recomputes only the skill match, text coverage and
+    skill alignment (stored resume texts, cached embeddings), a CGPA or backlog
+    rule only re-runs the filters, and nothing is re-parsed unless the job
+    description changes. Returns the updated decisions for the whole job.
+    """
+    started = time.perf_counter()
+    try:
+        # Stored features are read and written here; the pool only computes (see rescore_job).
+        loaded = await asyncio.to_thread(_load_reevaluation, job_key, request)
+        load_seconds = time.perf_counter() - started
+        (response, updated, job), timings = await _run_timed(_reevaluate_sync, job_key, request, *loaded)
+        timings.add("load_features", load_seconds)
+        await _store_features(job_key, updated, timings, job)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No stored requirements and features for job {job_key}")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error re-evaluating job: {str(e)}")
+    _finish_request("reevaluate", started, timings)
+    return response
+
+
+@app.post("/candidates/index", response_model=CandidateIndexResponse)
+async def index_candidates(request: CandidateIndexRequest):
+    """
+    Add or replace resumes in the reverse-matching index used by
+    /jobs/match-candidates. Embeddings go through the embedding cache, so
+    resumes already evaluated are not re-encoded.
+    """
+    if not request.candidates:
+        return CandidateIndexResponse(indexed=0, total=len(resume_index))
+    started = time.perf_counter()
+    vectors, timings = await _run_pipeline(_embed_resumes_sync, request, "Error indexing candidates")
+    if vectors is None:
+        raise HTTPException(status_code=503, detail="Sentence encoder unavailable; resumes cannot be indexed")
+    write_started = time.perf_counter()
+    indexed = await asyncio.to_thread(
+        resume_index.upsert_many,
+        [(c.candidate_id, vector, c.resume_text) for c, vector in zip(request.candidates, vectors)],
+    )
+    timings.add("index_write", time.perf_counter() - write_started)
+    _finish_request("index_candidates", started, timings, batch_size=len(request.candidates))
+    return CandidateIndexResponse(indexed=indexed, total=len(resume_index))
+
+
+@app.delete("/candidates/{candidate_id}")
+async def remove_candidate(candidate_id: str):
+    """Drop a candidate from the matching index (numeric ids match integer candidate_ids too)."""
+    removed = await asyncio.to_thread(resume_index.remove, candidate_id)
+    if not removed and candidate_id.isdigit():
+        removed = await asyncio.to_thread(resume_index.remove, int(candidate_id))
+    if not removed:
+        raise HTTPException(status_code=404, detail=f"Candidate {candidate_id} is not indexed")
+    return {"removed": candidate_id, "total": len(resume_index)}
+
+
+@app.post("/jobs/match-candidates", response_model=MatchCandidatesResponse)
+async def match_candidates(request: MatchCandidatesRequest):
+    """
+    Suggest the indexed candidates closest to a job: the JD is embedded once
+    and compared with every indexed resume vector in one blockwise scan (or an
+    IVF search on large indexes). With `rescore`, the top-K run through the
+    full evaluation pipeline and are ordered by final score.
+    """
+    started = time.perf_counter()
+    (profile_key, query), timings = await _run_pipeline(_job_vector_sync, request, "Error matching candidates")
+    if query is None:
+        raise HTTPException(status_code=503, detail="Sentence encoder unavailable; job cannot be embedded")
+    search_started = time.perf_counter()
+    hits, method, searched = await asyncio.to_thread(
+        resume_index.search, query, request.top_k, request.exclude_candidate_ids, request.exact
+    )
+    timings.add("search", time.perf_counter() - search_started)
+    matched = [
+        MatchedCandidate(candidate_id=candidate_id, similarity=SemanticMatcher.similarity_score(cosine))
+        for candidate_id, cosine in hits
+    ]
+
+    if request.rescore and matched:
+        texts = await asyncio.to_thread(resume_index.resume_texts, [m.candidate_id for m in matched])
+        batch = BatchEvaluationRequest(
+            **request.model_dump(include=set(JobProfileRequest.model_fields) | {"min_experience_years", "education_requirement"}),
+            candidates=[
+                BatchCandidate(candidate_id=m.candidate_id, resume_text=texts[m.candidate_id])
+                for m in matched if m.candidate_id in texts
+            ],
+        )
+        (evaluated, _, _), rescore_timings = await _run_pipeline(_evaluate_batch_sync, batch, "Error matching candidates")
+        for name, seconds in rescore_timings.stages.items():
+            timings.add(name, seconds)
+        results = {item.candidate_id: item.result for item in evaluated.results if item.result is not None}
+        for m in matched:
+            result = results.get(m.candidate_id)
+            if result is not None:
+                m.final_score = result.final_score
+                m.decision = result.decision
+                m.feature_scores = result.feature_scores
+        matched.sort(key=lambda m: -1.0 if m.final_score is None else m.final_score, reverse=True)
+
+    _finish_request("match_candidates", started, timings)
+    return MatchCandidatesResponse(
+        job_profile_id=profile_key,
+        method=method,
+        searched=searched,
+        indexed=len(resume_index),
+        candidates=matched,
+        elapsed_ms=(time.perf_counter() - started) * 1000.0,
+    )
+
+
+@app.post("/jobs/profiles", response_model=JobProfileResponse)
+async def register_job_profile(request: JobProfileRequest):
+    """
+    Precompute and cache the job-side inputs (embeddings, normalized skills).
+    Optional: evaluation endpoints create the profile on first use as well.
+    """
+    started = time.perf_counter()
+    response, timings = await _run_pipeline(_register_job_profile_sync, request, "Error registering job profile")
+    _finish_request("job_profile", started, timings)
+    return response
+
+
+@app.on_event("startup")
+async def warm_model():
+    """Load and warm up the encoder in the background so the first request does not pay for it."""
+    if not EAGER_MODEL_LOAD:
+        return
+
+    async def _warm():
+        global _worker_model_status
+        try:
+            _worker_model_status = await pipeline_executor.run(_load_model)
+        except Exception as e:
+            _worker_model_status = {"state": ModelManager.FAILED, "model": model_manager.model_id, "error": str(e)}
+
+    asyncio.get_running_loop().create_task(_warm())
+
+
+def reopen_after_fork() -> None:
+    """In a worker forked by serve.py: own SQLite connections; the preloaded model and caches stay shared."""
+    feature_store.reopen()
+    resume_index.reopen()
+    gemini_reranker.cache.reopen()
+
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    pipeline_executor.shutdown()
+    if encode_batcher is not None:
+        encode_batcher.close()
+    await gemini_reranker.aclose()
+    resume_index.close()
 
 
 if __name__ == "__main__":
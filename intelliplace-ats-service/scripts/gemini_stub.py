@@ -0,0 +1,94 @@
+"""
+Local stand-in for the Gemini generateContent API.
+
+Run it, then point the ATS service at it:
+
+    python scripts/gemini_stub.py --port 8090 --latency 0.2 --fail-rate 0.3
+    GEMINI_BASE_URL=http://127.0.0.1:8090/v1beta GEMINI_API_KEY=stub python main.py
+
+Scores are derived from word overlap between the job description and the
+resume in the prompt, so results are deterministic. `--fail-rate` answers
+that share of calls with `--fail-status`, and `--down` fails every call,
+for exercising retries and the circuit breaker. GET /stats shows counters.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import re
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+_WORD = re.compile(r"[a-z][a-z0-9+#.]+")
+_RESUME_HEADER = re.compile(r"\n\nResume(?: (\d+))?:\n")
+
+
+def _score(job_words: set, resume: str) -> float:
+    if not job_words:
+        return 5.0
+    resume_words = set(_WORD.findall(resume.lower()))
+    return round(10.0 * len(job_words & resume_words) / len(job_words), 2)
+
+
+def _answer(prompt: str) -> str:
+    """JSON object for single-resume prompts, JSON array for grouped ("Resume N:") prompts."""
+    parts = _RESUME_HEADER.split(prompt)
+    job_words = set(_WORD.findall(parts[0].split("Job Description:\n", 1)[-1].lower()))
+    resumes = list(zip(parts[1::2], parts[2::2]))
+    answers = []
+    for number, resume in resumes:
+        score = _score(job_words, resume)
+        answer = {"refined_score_10": score, "feedback": f"Stub overlap score {score}/10."}
+        if number is None:
+            return json.dumps(answer)
+        answers.append({"id": int(number), **answer})
+    return json.dumps(answers)
+
+
+def build_app(latency: float, fail_rate: float, fail_status: int, down: bool) -> FastAPI:
+    app = FastAPI(title="Gemini stub")
+    stats = {"requests": 0, "failed": 0, "in_flight": 0, "max_in_flight": 0}
+
+    @app.post("/v1beta/models/{model_action}")
+    async def generate_content(model_action: str, request: Request):
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            if latency:
+                await asyncio.sleep(latency)
+            if down or random.random() < fail_rate:
+                stats["failed"] += 1
+                return JSONResponse({"error": {"code": fail_status, "message": "stub failure"}}, status_code=fail_status)
+            body = await request.json()
+            text = _answer(body["contents"][0]["parts"][0]["text"])
+            return {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+        finally:
+            stats["in_flight"] -= 1
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before answering")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of calls answered with --fail-status")
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--down", action="store_true", help="fail every call")
+    args = parser.parse_args()
+    app = build_app(args.latency, args.fail_rate, args.fail_status, args.down)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Multi-worker server for the ATS service: load once, then fork.
+
+    python serve.py --workers 4 --port 8000
+    python serve.py --workers 4 --no-preload    # every worker imports and loads on its own
+
+The master process imports the application (FastAPI, NumPy/SciPy, the sentence
+encoder and its weights) and binds the listening socket, then forks the
+workers, which share those pages copy-on-write instead of each holding a copy.
+Cached embeddings go to a memory-mapped store in /dev/shm that every worker
+reads and appends to (ATS_EMBEDDING_STORE_DIR overrides it), so a text embedded
+by one worker, including a job profile's views, is a cache hit in the others.
+The master restarts workers that exit. Needs os.fork (Linux, macOS); use
+`python main.py` elsewhere.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import shutil
+import signal
+import socket
+import sys
+import time
+import traceback
+
+
+def _shared_cache_dir(port: int):
+    """Default shared embedding store: a per-port directory in /dev/shm (None when there is none)."""
+    if os.getenv("ATS_EMBEDDING_STORE_DIR", "").strip() or not os.path.isdir("/dev/shm"):
+        return None
+    return os.path.join("/dev/shm", f"intelliplace-ats-{port}")
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _preload():
+    """Import the application and prepare the encoder in the master, before any fork."""
+    import main
+
+    main.model_manager.preload()
+    # Keep the imported objects out of later collections so the GC does not write to shared pages.
+    gc.collect()
+    gc.freeze()
+    return main
+
+
+def _serve_worker(sock: socket.socket, app_module, threads: int, log_level: str) -> None:
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if app_module is None:
+        import main as app_module
+    else:
+        app_module.reopen_after_fork()
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads)
+    ready = app_module.model_manager.state == app_module.ModelManager.READY
+    model = app_module.model_manager.get() if ready else None
+    if model is not None:
+        # First forward pass in the worker: thread pools start here, after the fork.
+        model.encode(["warmup"])
+    config = uvicorn.Config(app_module.app, log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Preload-and-fork ATS server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("ATS_SERVE_WORKERS", "0")) or (os.cpu_count() or 1))
+    parser.add_argument("--no-preload", action="store_true", help="import and load the model in each worker instead")
+    parser.add_argument("--threads-per-worker", type=int, default=0, help="torch / ONNX Runtime threads (default: cores / workers)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        sys.exit("serve.py needs os.fork; run `python main.py` on this platform")
+    workers = max(1, args.workers)
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+    os.environ.setdefault("ATS_ONNX_THREADS", str(threads))
+    shared_dir = _shared_cache_dir(args.port)
+    if shared_dir:
+        os.environ["ATS_EMBEDDING_STORE_DIR"] = shared_dir
+
+    sock = _bind(args.host, args.port)
+    app_module = None if args.no_preload else _preload()
+    children = {}
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _serve_worker(sock, app_module, threads, args.log_level)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for _ in range(workers):
+        spawn()
+    print(f"ATS master {os.getpid()}: {workers} workers on {args.host}:{args.port} "
+          f"({'no preload' if args.no_preload else 'preloaded'}, {threads} threads each)", flush=True)
+
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        # Back off a worker that keeps dying right after start.
+        if time.monotonic() - started < 1.0:
+            time.sleep(1.0)
+        spawn()
+
+    sock.close()
+    if shared_dir:
+        shutil.rmtree(shared_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Content-addressed embedding store.
+Vectors are keyed by a hash of (model namespace, text): an in-memory LRU tier sits in front
+of an optional disk tier backed by a memory-mapped float32 array, so cached vectors survive
+restarts and are shared by worker processes through the page cache. The memory tier keeps
+vectors in a VectorPool (float32, float16 or int8 blocks) rather than one array per entry.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .vector_pool import VectorPool
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process disk tier
+    fcntl = None
+
+
+class _DiskTier:
+    """
+    Append-only vector file plus an index log of (digest, row) records.
+    Writers serialize on a lock file; readers pick up other processes' rows
+    by reading the index log tail on a miss. With max_bytes set, the tier stops
+    appending once both files would outgrow it; existing rows stay readable.
+    """
+
+    RECORD = struct.Struct("<16sI")
+    INITIAL_ROWS = 4096
+
+    def __init__(self, directory: str, dim: int, max_bytes: int = 0):
+        os.makedirs(directory, exist_ok=True)
+        self.dim = dim
+        # Rows that fit in max_bytes (vector row plus index record); None is unbounded.
+        self.max_rows = max(0, int(max_bytes)) // (dim * 4 + self.RECORD.size) if max_bytes else None
+        self.skipped = 0
+        self.vec_path = os.path.join(directory, "vectors.f32")
+        self.index_path = os.path.join(directory, "index.bin")
+        self.lock_path = os.path.join(directory, ".lock")
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if int(meta.get("dim", dim)) != dim:
+                raise ValueError(f"embedding store at {directory} has dim {meta.get('dim')}, expected {dim}")
+        else:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"dim": dim, "dtype": "float32"}, f)
+        for path in (self.vec_path, self.index_path):
+            if not os.path.exists(path):
+                open(path, "ab").close()
+
+        self._index: Dict[bytes, int] = {}
+        self._index_offset = 0
+        self._rows = 0
+        self._mm: Optional[np.memmap] = None
+        self._mapped_rows = 0
+        self._lock = threading.Lock()
+        self._refresh()
+
+    @staticmethod
+    def read_dim(directory: str) -> Optional[int]:
+        meta_path = os.path.join(directory, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return int(json.load(f)["dim"])
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        size = os.path.getsize(self.index_path)
+        if size <= self._index_offset:
+            return
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_offset)
+            data = f.read(size - self._index_offset)
+        usable = len(data) - len(data) % self.RECORD.size
+        for digest, row in self.RECORD.iter_unpack(data[:usable]):
+            self._index[digest] = row
+            self._rows = max(self._rows, row + 1)
+        self._index_offset += usable
+
+    def _map(self, min_rows: int) -> None:
+        row_bytes = self.dim * 4
+        file_rows = os.path.getsize(self.vec_path) // row_bytes
+        if file_rows < min_rows:
+            file_rows = max(min_rows, self.INITIAL_ROWS, 2 * file_rows)
+            if self.max_rows is not None:
+                file_rows = max(min_rows, min(file_rows, self.max_rows))
+            with open(self.vec_path, "r+b") as f:
+                f.truncate(file_rows * row_bytes)
+        if file_rows != self._mapped_rows:
+            self._mm = np.memmap(self.vec_path, dtype=np.float32, mode="r+", shape=(file_rows, self.dim))
+            self._mapped_rows = file_rows
+
+    def get(self, digest: bytes) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._index.get(digest)
+            if row is None:
+                self._refresh()
+                row = self._index.get(digest)
+                if row is None:
+                    return None
+            if row >= self._mapped_rows:
+                self._map(row + 1)
+            return self._mm[row]
+
+    @property
+    def full(self) -> bool:
+        return self.max_rows is not None and self._rows >= self.max_rows
+
+    def put(self, digest: bytes, vector: np.ndarray) -> None:
+        # Rows only grow, so a full tier skips the file lock entirely.
+        if self.full:
+            self.skipped += 1
+            return
+        with self._lock, self._file_lock():
+            self._refresh()
+            if digest in self._index:
+                return
+            if self.full:
+                self.skipped += 1
+                return
+            row = self._rows
+            if row >= self._mapped_rows:
+                self._map(row + 1)
+            self._mm[row] = vector
+            with open(self.index_path, "ab") as f:
+                f.write(self.RECORD.pack(digest, row))
+            self._index[digest] = row
+            self._rows = row + 1
+            self._index_offset += self.RECORD.size
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class EmbeddingStore:
+    """Two-tier (memory LRU, optional mmap disk) cache of normalized embeddings."""
+
+    def __init__(
+        self,
+        namespace: str,
+        directory: Optional[str] = None,
+        memory_items: int = 20000,
+        dtype: str = "float32",
+        max_disk_bytes: int = 0,
+    ):
+        self.namespace = namespace
+        self.directory = directory
+        self.max_disk_bytes = max(0, int(max_disk_bytes))
+        self.memory_items = max(0, int(memory_items))
+        self.dtype = dtype
+        # Digest -> slot in the pool, in LRU order; the pool is sized on the first vector.
+        self._memory: "OrderedDict[bytes, int]" = OrderedDict()
+        self._pool: Optional[VectorPool] = None
+        self._disk: Optional[_DiskTier] = None
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory:
+            dim = _DiskTier.read_dim(directory)
+            if dim is not None:
+                self._disk = _DiskTier(directory, dim, self.max_disk_bytes)
+
+    def digest(self, text: str) -> bytes:
+        return hashlib.blake2b(
+            (self.namespace + "\0" + text).encode("utf-8"), digest_size=16
+        ).digest()
+
+    def _remember(self, digest: bytes, vector: np.ndarray) -> None:
+        if not self.memory_items:
+            return
+        if digest in self._memory:
+            self._memory.move_to_end(digest)
+            return
+        if self._pool is None:
+            self._pool = VectorPool(len(vector), self.dtype, block_rows=min(VectorPool.BLOCK_ROWS, self.memory_items))
+        self._memory[digest] = self._pool.add(vector)
+        while len(self._memory) > self.memory_items:
+            _, slot = self._memory.popitem(last=False)
+            self._pool.free(slot)
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        out: List[Optional[np.ndarray]] = []
+        for text in texts:
+            digest = self.digest(text)
+            with self._lock:
+                slot = self._memory.get(digest)
+                if slot is not None:
+                    self._memory.move_to_end(digest)
+                    self.memory_hits += 1
+                    out.append(self._pool.get(slot))
+                    continue
+            vector = self._disk.get(digest) if self._disk is not None else None
+            with self._lock:
+                if vector is not None:
+                    self.disk_hits += 1
+                    self._remember(digest, vector)
+                else:
+                    self.misses += 1
+            out.append(vector)
+        return out
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray) -> None:
+        if self.directory and self._disk is None and len(texts):
+            with self._lock:
+                if self._disk is None:
+                    self._disk = _DiskTier(self.directory, int(vectors.shape[1]), self.max_disk_bytes)
+        for text, vector in zip(texts, vectors):
+            digest = self.digest(text)
+            vector = np.asarray(vector, dtype=np.float32)
+            if self._disk is not None:
+                self._disk.put(digest, vector)
+            with self._lock:
+                self._remember(digest, vector)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_items": len(self._memory),
+                "memory_bytes": self._pool.nbytes if self._pool is not None else 0,
+                "dtype": self.dtype,
+                "disk_items": len(self._disk) if self._disk is not None else 0,
+                "disk_max_bytes": self.max_disk_bytes,
+                "disk_full": self._disk.full if self._disk is not None else False,
+                "disk_skipped": self._disk.skipped if self._disk is not None else 0,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,153 @@
+"""
+Cross-request micro-batching for the sentence encoder.
+
+Pipeline threads hand their cache-missing texts to one shared queue instead of
+calling model.encode themselves. A single encoder thread takes the oldest
+request, keeps collecting until max_batch texts are queued or max_wait_ms has
+passed since that request arrived, runs one encode over the merged (deduplicated)
+texts and resolves each caller's future with its rows. Requests that queued while
+the previous batch ran are already past their wait, so under load batches form
+without added delay; and the wait is skipped while batches hold a single request,
+so serial traffic is not slowed down.
+"""
+from __future__ import annotations
+
+import collections
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Deque, List, Optional, Sequence
+
+import numpy as np
+
+from .metrics import LATENCY_BUCKETS, SIZE_BUCKETS, Histogram
+
+
+class _Pending:
+    __slots__ = ("texts", "future", "enqueued")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class EncodeBatcher:
+    """Drop-in `.encode(texts, batch_size=...)` that merges concurrent callers into one model call."""
+
+    def __init__(
+        self,
+        model_getter: Callable[[], object],
+        max_batch: int = 128,
+        max_wait_ms: float = 2.0,
+    ):
+        self.model_getter = model_getter
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue: Deque[_Pending] = collections.deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # Requests in the last batch; waiting for company only pays off once callers overlap.
+        self._last_requests = 0
+        self.batches = 0
+        self.requests = 0
+        self.batch_texts = Histogram(
+            "ats_encode_merged_batch_texts", "Texts per merged model.encode call.", buckets=SIZE_BUCKETS
+        )
+        self.batch_requests = Histogram(
+            "ats_encode_merged_batch_requests", "Caller requests merged into one model.encode call.", buckets=SIZE_BUCKETS
+        )
+        self.wait_seconds = Histogram(
+            "ats_encode_queue_wait_seconds", "Time a request waited in the encode queue before its batch ran.",
+            buckets=LATENCY_BUCKETS,
+        )
+
+    def _ensure_thread(self) -> None:
+        # Started lazily (and again after a fork, which does not copy threads).
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="ats-encode-batcher", daemon=True)
+            self._thread.start()
+
+    def encode(self, texts: Sequence[str], batch_size: Optional[int] = None, **kwargs) -> np.ndarray:
+        """Block until the texts' batch has run; returns one embedding row per text."""
+        pending = _Pending(list(texts))
+        if not pending.texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Encode batcher is closed")
+            self._ensure_thread()
+            self._queue.append(pending)
+            self._cond.notify()
+        return pending.future.result()
+
+    def _take(self) -> Optional[List[_Pending]]:
+        """Next batch: the oldest request plus whatever fits before max_batch or its wait deadline."""
+        with self._cond:
+            while not self._queue:
+                if self._closed:
+                    return None
+                self._cond.wait()
+            first = self._queue.popleft()
+            batch = [first]
+            total = len(first.texts)
+            deadline = first.enqueued + (self.max_wait if self._last_requests > 1 else 0.0)
+            while total < self.max_batch:
+                if self._queue:
+                    if total + len(self._queue[0].texts) > self.max_batch:
+                        break
+                    pending = self._queue.popleft()
+                    batch.append(pending)
+                    total += len(pending.texts)
+                    continue
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or self._closed:
+                    break
+                self._cond.wait(remaining)
+            self._last_requests = len(batch)
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take()
+            if batch is None:
+                return
+            self._encode(batch)
+
+    def _encode(self, batch: List[_Pending]) -> None:
+        started = time.perf_counter()
+        for pending in batch:
+            self.wait_seconds.observe(started - pending.enqueued)
+        unique = list(dict.fromkeys(text for pending in batch for text in pending.texts))
+        try:
+            model = self.model_getter()
+            if model is None:
+                raise RuntimeError("Sentence encoder is not available")
+            emb = np.asarray(model.encode(unique, batch_size=min(len(unique), self.max_batch)), dtype=np.float32)
+        except Exception as e:
+            for pending in batch:
+                pending.future.set_exception(e)
+            return
+        self.batches += 1
+        self.requests += len(batch)
+        self.batch_texts.observe(len(unique))
+        self.batch_requests.observe(len(batch))
+        rows = {text: i for i, text in enumerate(unique)}
+        for pending in batch:
+            pending.future.set_result(emb[[rows[text] for text in pending.texts]])
+
+    def stats(self) -> dict:
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "requests": self.requests,
+            "queued": len(self._queue),
+        }
+
+    def close(self) -> None:
+        """Stop the encoder thread once the queue drains; later encode calls raise."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
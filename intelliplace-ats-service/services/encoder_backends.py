@@ -0,0 +1,200 @@
+"""
+Sentence encoder backends.
+
+"torch" is the reference: SentenceTransformer in PyTorch eager mode. "onnx"
+exports the same transformer once to an ONNX graph (kept on disk) and runs it
+with ONNX Runtime; "onnx-int8" also quantizes the graph's weights to int8
+(dynamic quantization). The ONNX encoders reproduce the model's tokenization,
+pooling and normalization, so every backend is a drop-in
+`.encode(texts, batch_size=...)`. Exporting needs torch and
+sentence-transformers; serving an exported graph only needs onnxruntime and
+tokenizers.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+GRAPH_FILE = "model.onnx"
+INT8_GRAPH_FILE = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+META_FILE = "encoder.json"
+
+
+def export_directory(root: str, model_name_or_path: str) -> str:
+    """Per-model directory under `root` holding the exported graphs and tokenizer."""
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", model_name_or_path.strip("/\\")) or "model"
+    return os.path.join(root, slug)
+
+
+def export_onnx(model_name_or_path: str, directory: str) -> dict:
+    """
+    Export the SentenceTransformer's transformer to `directory` (graph returning
+    last_hidden_state, fast tokenizer and pooling metadata); returns the metadata.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st = SentenceTransformer(model_name_or_path, device="cpu")
+    transformer = st[0]
+    modules = [type(module).__name__ for module in st]
+    pooling = next((module for module in st if type(module).__name__ == "Pooling"), None)
+    tokenizer = transformer.tokenizer
+    input_names = list(tokenizer.model_input_names)
+    meta = {
+        "model": model_name_or_path,
+        "input_names": input_names,
+        "max_seq_length": int(st.max_seq_length),
+        "pooling": "cls" if pooling is not None and pooling.pooling_mode_cls_token else "mean",
+        "normalize": "Normalize" in modules,
+        "do_lower_case": bool(getattr(transformer, "do_lower_case", False)),
+        "dim": int(st.get_sentence_embedding_dimension()),
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": int(tokenizer.pad_token_id),
+    }
+
+    class _Graph(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    os.makedirs(directory, exist_ok=True)
+    sample = tokenizer(["export sample text", "a second, longer export sample text"], padding=True, return_tensors="pt")
+    axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    graph = os.path.join(directory, GRAPH_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            _Graph(transformer.auto_model.eval()),
+            tuple(sample[name] for name in input_names),
+            graph + ".tmp",
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=axes,
+            opset_version=14,
+        )
+    os.replace(graph + ".tmp", graph)
+    tokenizer.backend_tokenizer.save(os.path.join(directory, TOKENIZER_FILE))
+    with open(os.path.join(directory, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def quantize_int8(directory: str) -> str:
+    """Dynamic int8 quantization of the exported graph's weights; returns the quantized graph path."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    target = os.path.join(directory, INT8_GRAPH_FILE)
+    quantize_dynamic(os.path.join(directory, GRAPH_FILE), target + ".tmp", weight_type=QuantType.QInt8)
+    os.replace(target + ".tmp", target)
+    return target
+
+
+class OnnxEncoder:
+    """ONNX Runtime sentence encoder with the SentenceTransformer pooling."""
+
+    def __init__(self, directory: str, quantized: bool = False, threads: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(directory, META_FILE), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.input_names = self.meta["input_names"]
+        self.dim = int(self.meta["dim"])
+        self.tokenizer = Tokenizer.from_file(os.path.join(directory, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=int(self.meta["max_seq_length"]))
+        self.tokenizer.enable_padding(pad_id=int(self.meta["pad_token_id"]), pad_token=self.meta["pad_token"])
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        graph = os.path.join(directory, INT8_GRAPH_FILE if quantized else GRAPH_FILE)
+        self.session = ort.InferenceSession(graph, options, providers=["CPUExecutionProvider"])
+
+    def _feeds(self, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        encodings = self.tokenizer.encode_batch(list(texts))
+        columns = {
+            "input_ids": [e.ids for e in encodings],
+            "attention_mask": [e.attention_mask for e in encodings],
+            "token_type_ids": [e.type_ids for e in encodings],
+        }
+        return {name: np.asarray(columns[name], dtype=np.int64) for name in self.input_names}
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """Embeddings for texts, batched longest-first (as SentenceTransformer does) to limit padding."""
+        texts = [str(text).strip() for text in texts]
+        if self.meta.get("do_lower_case"):
+            texts = [text.lower() for text in texts]
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            feeds = self._feeds([texts[i] for i in rows])
+            hidden = self.session.run(None, feeds)[0]
+            if self.meta["pooling"] == "cls":
+                pooled = hidden[:, 0]
+            else:
+                mask = feeds["attention_mask"][:, :, None].astype(np.float32)
+                pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            if self.meta["normalize"]:
+                pooled = pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+            out[rows] = pooled
+        return out
+
+
+def ensure_export(backend: str, model_name_or_path: str, export_root: Optional[str] = None) -> str:
+    """Export (and for onnx-int8 quantize) the ONNX graph unless already on disk; returns its directory."""
+    if backend not in BACKENDS or backend == "torch":
+        raise ValueError(f"Not an ONNX encoder backend: {backend!r}")
+    directory = export_directory(export_root or "onnx", model_name_or_path)
+    if not os.path.exists(os.path.join(directory, META_FILE)):
+        export_onnx(model_name_or_path, directory)
+    if backend == "onnx-int8" and not os.path.exists(os.path.join(directory, INT8_GRAPH_FILE)):
+        quantize_int8(directory)
+    return directory
+
+
+def load_encoder(
+    backend: str,
+    model_name_or_path: str,
+    export_root: Optional[str] = None,
+    threads: int = 0,
+):
+    """Build the encoder for a backend, exporting (and quantizing) the ONNX graph on first use."""
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name_or_path)
+    directory = ensure_export(backend, model_name_or_path, export_root)
+    return OnnxEncoder(directory, quantized=backend == "onnx-int8", threads=threads)
+
+
+def parity_report(
+    reference: np.ndarray,
+    candidate: np.ndarray,
+    pairs: Sequence[tuple],
+) -> dict:
+    """
+    Agreement of a backend's normalized embeddings with the reference backend's
+    for the same texts: per-text cosine between the two backends, and the
+    deviation of pair similarity scores (the 0-1 scale used in scoring).
+    """
+    agreement = np.sum(reference * candidate, axis=1)
+    a, b = (np.asarray(side, dtype=np.int64) for side in zip(*pairs))
+    ref_scores = (np.sum(reference[a] * reference[b], axis=1) + 1.0) / 2.0
+    cand_scores = (np.sum(candidate[a] * candidate[b], axis=1) + 1.0) / 2.0
+    delta = np.abs(ref_scores - cand_scores)
+    return {
+        "min_vector_cosine": float(np.min(agreement)),
+        "mean_vector_cosine": float(np.mean(agreement)),
+        "max_score_delta": float(np.max(delta)),
+        "mean_score_delta": float(np.mean(delta)),
+    }
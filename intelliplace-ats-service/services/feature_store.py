@@ -0,0 +1,282 @@
+"""
+Per-job store of candidate feature scores.
+Persists each evaluation's feature vector, stuffing penalty, filter outcome and
+rerank score in SQLite so a job can be re-scored with new weights or thresholds
+as one vectorized operation instead of re-running the pipeline. Alongside them
+it keeps each job's requirements, the per-candidate raw inputs the features are
+composed from and the resume texts (once per distinct text), so a requirements
+edit only recomputes the inputs that depend on the changed fields.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .scoring_engine import ScoringEngine
+
+FEATURE_NAMES = ScoringEngine.FEATURE_NAMES
+
+CandidateId = Union[int, str]
+
+
+def resume_key(resume_text: str) -> str:
+    """Content hash under which a resume text is stored."""
+    return hashlib.sha256((resume_text or "").encode("utf-8")).hexdigest()[:32]
+
+
+class FeatureRecord:
+    """Scoring inputs captured from one evaluation."""
+
+    __slots__ = (
+        "features",
+        "stuffing_penalty",
+        "passes_filters",
+        "is_fresher",
+        "gemini_score",
+        "detail",
+        "resume_text",
+    )
+
+    def __init__(
+        self,
+        features: Dict[str, float],
+        stuffing_penalty: float,
+        passes_filters: bool,
+        is_fresher: bool,
+        gemini_score: Optional[float] = None,
+        detail: Optional[dict] = None,
+        resume_text: Optional[str] = None,
+    ):
+        self.features = features
+        self.stuffing_penalty = stuffing_penalty
+        self.passes_filters = passes_filters
+        self.is_fresher = is_fresher
+        # Gemini refined score on the 0-1 scale, when a rerank was applied.
+        self.gemini_score = gemini_score
+        self.detail = detail or {}
+        # Stored once per distinct text (not in detail) when set, for re-evaluation.
+        self.resume_text = resume_text
+
+
+class FeatureMatrix:
+    """Column arrays for every stored candidate of one job."""
+
+    def __init__(self, candidate_ids: List[CandidateId], rows: List[tuple]):
+        n = len(rows)
+        self.candidate_ids = candidate_ids
+        self.features = np.zeros((n, len(FEATURE_NAMES)), dtype=np.float64)
+        self.stuffing_penalty = np.zeros(n, dtype=np.float64)
+        self.passes_filters = np.zeros(n, dtype=bool)
+        self.is_fresher = np.zeros(n, dtype=bool)
+        self.gemini_score = np.full(n, np.nan, dtype=np.float64)
+        for i, row in enumerate(rows):
+            self.features[i] = row[:5]
+            self.stuffing_penalty[i] = row[5]
+            self.passes_filters[i] = bool(row[6])
+            self.is_fresher[i] = bool(row[7])
+            if row[8] is not None:
+                self.gemini_score[i] = row[8]
+
+    def __len__(self) -> int:
+        return len(self.candidate_ids)
+
+
+class FeatureStore:
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # Cached matrices, validated against (row count, last update) for the job.
+        self._matrices: Dict[str, Tuple[Tuple[int, float], FeatureMatrix]] = {}
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS candidate_features (
+                    job_key TEXT NOT NULL,
+                    candidate_id TEXT NOT NULL,
+                    semantic_score REAL NOT NULL,
+                    skill_match_ratio REAL NOT NULL,
+                    experience_score REAL NOT NULL,
+                    project_score REAL NOT NULL,
+                    education_score REAL NOT NULL,
+                    stuffing_penalty REAL NOT NULL,
+                    passes_filters INTEGER NOT NULL,
+                    is_fresher INTEGER NOT NULL,
+                    gemini_score REAL,
+                    detail TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (job_key, candidate_id)
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_requirements (
+                    job_key TEXT PRIMARY KEY,
+                    requirements TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resume_texts (
+                    resume_key TEXT PRIMARY KEY,
+                    resume_text TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+
+    def upsert_many(
+        self,
+        job_key: str,
+        records: Iterable[Tuple[CandidateId, FeatureRecord]],
+        requirements: Optional[dict] = None,
+    ) -> int:
+        """Store records (replacing earlier ones) and, when given, the job requirements they were scored under."""
+        records = list(records)
+        now = time.time()
+        rows = [
+            (
+                job_key,
+                json.dumps(candidate_id),
+                *(float(record.features[name]) for name in FEATURE_NAMES),
+                float(record.stuffing_penalty),
+                int(bool(record.passes_filters)),
+                int(bool(record.is_fresher)),
+                record.gemini_score,
+                json.dumps(record.detail),
+                now,
+            )
+            for candidate_id, record in records
+        ]
+        if not rows:
+            return 0
+        texts = {
+            resume_key(record.resume_text): record.resume_text
+            for _, record in records
+            if record.resume_text is not None
+        }
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO candidate_features VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            if texts:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO resume_texts VALUES (?, ?)", list(texts.items())
+                )
+            if requirements is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO job_requirements VALUES (?, ?, ?)",
+                    (job_key, json.dumps(requirements), now),
+                )
+            self._conn.commit()
+        return len(rows)
+
+    def upsert(self, job_key: str, candidate_id: CandidateId, record: FeatureRecord) -> None:
+        self.upsert_many(job_key, [(candidate_id, record)])
+
+    def _version(self, job_key: str) -> Tuple[int, float]:
+        count, last = self._conn.execute(
+            "SELECT COUNT(*), MAX(updated_at) FROM candidate_features WHERE job_key = ?",
+            (job_key,),
+        ).fetchone()
+        return int(count), float(last or 0.0)
+
+    def matrix(self, job_key: str) -> Optional[FeatureMatrix]:
+        """All stored candidates of a job as column arrays; None when the job is unknown."""
+        with self._lock:
+            version = self._version(job_key)
+            if version[0] == 0:
+                self._matrices.pop(job_key, None)
+                return None
+            cached = self._matrices.get(job_key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            cursor = self._conn.execute(
+                "SELECT candidate_id, semantic_score, skill_match_ratio, experience_score, project_score, "
+                "education_score, stuffing_penalty, passes_filters, is_fresher, gemini_score "
+                "FROM candidate_features WHERE job_key = ? ORDER BY rowid",
+                (job_key,),
+            )
+            ids: List[CandidateId] = []
+            rows: List[tuple] = []
+            for row in cursor:
+                ids.append(json.loads(row[0]))
+                rows.append(row[1:])
+            matrix = FeatureMatrix(ids, rows)
+            self._matrices[job_key] = (version, matrix)
+            return matrix
+
+    def records(self, job_key: str) -> List[Tuple[CandidateId, FeatureRecord]]:
+        """Every stored record of a job, detail included (resume texts are not loaded)."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT candidate_id, semantic_score, skill_match_ratio, experience_score, project_score, "
+                "education_score, stuffing_penalty, passes_filters, is_fresher, gemini_score, detail "
+                "FROM candidate_features WHERE job_key = ? ORDER BY rowid",
+                (job_key,),
+            )
+            rows = cursor.fetchall()
+        return [
+            (
+                json.loads(row[0]),
+                FeatureRecord(
+                    features=dict(zip(FEATURE_NAMES, row[1:6])),
+                    stuffing_penalty=row[6],
+                    passes_filters=bool(row[7]),
+                    is_fresher=bool(row[8]),
+                    gemini_score=row[9],
+                    detail=json.loads(row[10]) if row[10] else None,
+                ),
+            )
+            for row in rows
+        ]
+
+    def requirements(self, job_key: str) -> Optional[dict]:
+        """Requirements the job's candidates were last scored under; None when never stored."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT requirements FROM job_requirements WHERE job_key = ?", (job_key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def resume_texts(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Stored resume texts by resume_key; missing keys are left out."""
+        keys = list(dict.fromkeys(keys))
+        out: Dict[str, str] = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit.
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                cursor = self._conn.execute(
+                    "SELECT resume_key, resume_text FROM resume_texts "
+                    f"WHERE resume_key IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+                out.update(cursor)
+        return out
+
+    def reopen(self) -> None:
+        """Open a fresh connection in a forked worker; SQLite handles must not be used across a fork."""
+        if self.path == ":memory:":
+            return
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,54 +1,378 @@
 """
 Optional Gemini reranker for top candidates.
 Returns refined score (0-10) and concise feedback.
+
+Calls go through one pooled async HTTP client with a cap on in-flight requests,
+retries with jittered backoff on transient errors, and a circuit breaker that
+skips reranking immediately while the API keeps failing.
 """
 from __future__ import annotations
 
+import asyncio
 import json
 import os
-from typing import Optional, Tuple
+import random
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import httpx
+
+from .metrics import Histogram
+from .rerank_cache import RerankCache, rerank_cache_key
+
+# Status codes worth retrying; any other 4xx is a request problem and fails at once.
+RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class GeminiUnavailable(Exception):
+    """Transport error or retryable status; counts against the circuit breaker."""
+
+
+class GeminiRequestRejected(Exception):
+    """Non-retryable 4xx (bad key, quota, malformed request); fails at once and counts against the breaker."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker. Opens after `failure_threshold` failed calls,
+    rejects calls for `reset_seconds`, then lets one trial call through
+    (half-open): success closes it, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_seconds = max(0.0, float(reset_seconds))
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_seconds:
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
 
-import requests
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self.opened_at = time.monotonic()
 
 
 class GeminiReranker:
-    def __init__(self):
-        self.api_key = os.getenv("GEMINI_API_KEY", "").strip()
+    DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+    # Bump whenever the prompt changes so cached results from the old prompt are not reused.
+    PROMPT_VERSION = "1"
+    JD_CHARS = 5000
+    RESUME_CHARS = 7000
+
+    def __init__(
+        self,
+        *,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_seconds: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        cache: Optional[RerankCache] = None,
+    ):
+        self.api_key = (api_key if api_key is not None else os.getenv("GEMINI_API_KEY", "")).strip()
         self.model = os.getenv("GEMINI_MODEL", "gemini-2.5-flash").strip()
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta"
+        # Point at a local stub server (see scripts/gemini_stub.py) for testing.
+        self.base_url = (base_url or os.getenv("GEMINI_BASE_URL", "") or self.DEFAULT_BASE_URL).rstrip("/")
+        self.max_concurrency = max(1, int(max_concurrency or _env_float("GEMINI_MAX_CONCURRENCY", 8)))
+        self.timeout_seconds = timeout_seconds or _env_float("GEMINI_TIMEOUT_SECONDS", 10.0)
+        self.max_retries = max(0, int(max_retries if max_retries is not None else _env_float("GEMINI_MAX_RETRIES", 2)))
+        self.backoff_seconds = backoff_seconds if backoff_seconds is not None else _env_float("GEMINI_BACKOFF_SECONDS", 0.5)
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=int(_env_float("GEMINI_BREAKER_FAILURES", 5)),
+            reset_seconds=_env_float("GEMINI_BREAKER_RESET_SECONDS", 30.0),
+        )
+        self.cache = cache
+        # The client and semaphore belong to the event loop that created them.
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.skipped = 0
+        self.request_seconds = Histogram(
+            "ats_gemini_request_seconds",
+            "Gemini generateContent latency per call, retries included.",
+            ("outcome",),
+        )
 
     def is_enabled(self) -> bool:
         return bool(self.api_key)
 
-    def rerank(self, *, resume_text: str, job_description: str) -> Optional[Tuple[float, str]]:
-        if not self.is_enabled():
-            return None
+    async def _session(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        client, semaphore = self._client, self._semaphore
+        if client is None or self._loop is not loop:
+            # A client left on another loop (a previous asyncio.run, a forked worker) is closed, not leaked.
+            stale, stale_loop = client, self._loop
+            self._loop = loop
+            self._client = client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout_seconds, connect=min(self.timeout_seconds, 5.0)),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._semaphore = semaphore = asyncio.Semaphore(self.max_concurrency)
+            if stale is not None:
+                await self._close_client(stale, stale_loop)
+        return client, semaphore
 
-        prompt = (
+    @staticmethod
+    def _body(prompt: str) -> dict:
+        return {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": {"temperature": 0.2, "responseMimeType": "application/json"},
+        }
+
+    def _request_body(self, resume_text: str, job_description: str) -> dict:
+        return self._body(
             "You are an ATS reranker. Evaluate this resume against the job description.\n"
             "Return ONLY valid JSON with keys: refined_score_10 (number 0-10), feedback (string <= 240 chars).\n\n"
-            f"Job Description:\n{(job_description or '')[:5000]}\n\n"
-            f"Resume:\n{(resume_text or '')[:7000]}"
+            f"Job Description:\n{job_description}\n\n"
+            f"Resume:\n{resume_text}"
         )
 
-        body = {
-            "contents": [{"parts": [{"text": prompt}]}],
-            "generationConfig": {"temperature": 0.2, "responseMimeType": "application/json"},
-        }
-        url = f"{self.base_url}/models/{self.model}:generateContent?key={self.api_key}"
+    def _group_request_body(self, resume_texts: List[str], job_description: str) -> dict:
+        resumes = "\n\n".join(f"Resume {i + 1}:\n{text}" for i, text in enumerate(resume_texts))
+        return self._body(
+            "You are an ATS reranker. Evaluate each resume below against the job description, independently.\n"
+            "Return ONLY a valid JSON array with one object per resume, with keys: id (the resume number), "
+            "refined_score_10 (number 0-10), feedback (string <= 240 chars).\n\n"
+            f"Job Description:\n{job_description}\n\n"
+            f"{resumes}"
+        )
+
+    @staticmethod
+    def _response_text(data: dict) -> str:
+        return data.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
 
+    @staticmethod
+    def _result(payload: dict) -> Tuple[float, str]:
+        raw = float(payload.get("refined_score_10", 0.0))
+        score_10 = max(0.0, min(10.0, raw))
+        feedback = str(payload.get("feedback", "")).strip()[:240]
+        return score_10, feedback
+
+    @classmethod
+    def _parse(cls, data: dict) -> Optional[Tuple[float, str]]:
         try:
-            resp = requests.post(url, json=body, timeout=30)
-            if resp.status_code >= 400:
-                return None
-            data = resp.json()
-            text = data.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
+            text = cls._response_text(data)
             if not text:
                 return None
-            payload = json.loads(text)
-            raw = float(payload.get("refined_score_10", 0.0))
-            score_10 = max(0.0, min(10.0, raw))
-            feedback = str(payload.get("feedback", "")).strip()[:240]
-            return score_10, feedback
+            return cls._result(json.loads(text))
+        except Exception:
+            return None
+
+    @classmethod
+    def _parse_group(cls, data: dict, size: int) -> List[Optional[Tuple[float, str]]]:
+        results: List[Optional[Tuple[float, str]]] = [None] * size
+        try:
+            payload = json.loads(cls._response_text(data) or "[]")
         except Exception:
+            return results
+        if not isinstance(payload, list):
+            return results
+        for position, item in enumerate(payload):
+            try:
+                index = int(item.get("id", position + 1)) - 1
+                if 0 <= index < size and results[index] is None:
+                    results[index] = cls._result(item)
+            except Exception:
+                continue
+        return results
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, backoff * 2^attempt]."""
+        return random.uniform(0.0, self.backoff_seconds * (2 ** attempt))
+
+    async def _post(self, client: httpx.AsyncClient, url: str, body: dict) -> dict:
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt - 1))
+            try:
+                resp = await client.post(url, json=body)
+            except httpx.TransportError as e:
+                error = GeminiUnavailable(f"{type(e).__name__}: {e}")
+                continue
+            if resp.status_code in RETRYABLE_STATUS:
+                error = GeminiUnavailable(f"HTTP {resp.status_code}")
+                continue
+            if resp.status_code >= 400:
+                raise GeminiRequestRejected(f"HTTP {resp.status_code}")
+            try:
+                return resp.json()
+            except ValueError:
+                return {}
+        raise error
+
+    async def _generate(self, body: dict) -> Optional[dict]:
+        """One generateContent call under the concurrency cap and breaker; None when skipped or failed."""
+        if self.breaker.state == CircuitBreaker.OPEN:
+            self.skipped += 1
+            return None
+        client, semaphore = await self._session()
+        url = f"{self.base_url}/models/{self.model}:generateContent?key={self.api_key}"
+        async with semaphore:
+            # Re-check after queueing: the breaker may have opened meanwhile.
+            if not self.breaker.allow():
+                self.skipped += 1
+                return None
+            self.calls += 1
+            started = time.perf_counter()
+            try:
+                data = await self._post(client, url, body)
+            except Exception:
+                self.failures += 1
+                self.breaker.record_failure()
+                self.request_seconds.observe(time.perf_counter() - started, "error")
+                return None
+        self.request_seconds.observe(time.perf_counter() - started, "ok")
+        self.breaker.record_success()
+        return data
+
+    def _cache_key(self, prompt_version: str, resume_text: str, job_description: str) -> Optional[str]:
+        if self.cache is None:
             return None
+        return rerank_cache_key(prompt_version, self.model, resume_text, job_description)
+
+    async def _remember(self, entries: List[Tuple[Optional[str], Optional[Tuple[float, str]]]]) -> None:
+        entries = [(key, result) for key, result in entries if key is not None and result is not None]
+        if entries:
+            await asyncio.to_thread(self.cache.put_many, entries)
+
+    async def _cached(self, keys: List[Optional[str]]) -> List[Optional[Tuple[float, str]]]:
+        """Cache lookups for several keys in one worker-thread call, keeping SQLite off the event loop."""
+        present = [key for key in keys if key is not None]
+        if not present:
+            return [None] * len(keys)
+        found = await asyncio.to_thread(self.cache.get_many, present)
+        return [found.get(key) if key is not None else None for key in keys]
+
+    async def _rerank_one(self, resume_text: str, job_description: str) -> Optional[Tuple[float, str]]:
+        data = await self._generate(self._request_body(resume_text, job_description))
+        return self._parse(data) if data is not None else None
+
+    async def rerank(self, *, resume_text: str, job_description: str) -> Optional[Tuple[float, str]]:
+        """Refined (score_10, feedback), or None when disabled, skipped by the breaker, or failed."""
+        return (await self.rerank_many(resume_texts=[resume_text], job_description=job_description))[0]
+
+    async def rerank_many(
+        self,
+        *,
+        resume_texts: List[str],
+        job_description: str,
+        group_size: int = 1,
+    ) -> List[Optional[Tuple[float, str]]]:
+        """
+        Rerank several resumes for one job. Cached results are looked up in one
+        batch first; with group_size > 1, uncached resumes are packed into shared
+        prompts of up to group_size resumes each.
+        """
+        if not self.is_enabled() or not resume_texts:
+            return [None] * len(resume_texts)
+        job_description = (job_description or "")[:self.JD_CHARS]
+        texts = [(text or "")[:self.RESUME_CHARS] for text in resume_texts]
+        prompt_version = self.PROMPT_VERSION if group_size <= 1 else self.PROMPT_VERSION + "-group"
+        keys = [self._cache_key(prompt_version, text, job_description) for text in texts]
+        results = await self._cached(keys)
+        pending = [i for i, result in enumerate(results) if result is None]
+
+        if group_size <= 1:
+            fresh = await asyncio.gather(*(self._rerank_one(texts[i], job_description) for i in pending))
+            for i, result in zip(pending, fresh):
+                results[i] = result
+            await self._remember([(keys[i], results[i]) for i in pending])
+            return results
+
+        groups = [pending[i:i + group_size] for i in range(0, len(pending), group_size)]
+
+        async def run_group(indices: List[int]) -> None:
+            data = await self._generate(self._group_request_body([texts[i] for i in indices], job_description))
+            if data is None:
+                return
+            for i, result in zip(indices, self._parse_group(data, len(indices))):
+                results[i] = result
+            await self._remember([(keys[i], results[i]) for i in indices])
+
+        await asyncio.gather(*(run_group(indices) for indices in groups))
+        return results
+
+    @staticmethod
+    async def _close_client(client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Close a client on the loop that owns its connections when that loop still runs elsewhere."""
+        try:
+            if loop is not None and loop.is_running() and loop is not asyncio.get_running_loop():
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+            else:
+                await client.aclose()
+        except RuntimeError:
+            # Client bound to an event loop that is already closed.
+            pass
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._close_client(self._client, self._loop)
+            self._client = None
+            self._loop = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.is_enabled(),
+            "base_url": self.base_url,
+            "max_concurrency": self.max_concurrency,
+            "breaker": self.breaker.state,
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "skipped": self.skipped,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
@@ -0,0 +1,201 @@
+"""
+Job profile registry.
+Caches the job-side work (normalized skills, view texts, embeddings) shared by every
+candidate evaluated against the same job, keyed by a content hash of the job fields.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+import numpy as np
+
+from .skill_evidence import skill_blob
+from .skill_normalizer import SkillNormalizer
+
+if TYPE_CHECKING:
+    from .semantic_matcher import SemanticMatcher
+
+
+def job_profile_key(
+    job_title: str,
+    job_description: str,
+    job_description_pdf_text: Optional[str],
+    required_skills: List[str],
+) -> str:
+    payload = json.dumps(
+        [job_title or "", job_description or "", job_description_pdf_text or "", list(required_skills or [])],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class JobProfile:
+    """Precomputed job-side inputs for the evaluation pipeline."""
+
+    def __init__(
+        self,
+        key: str,
+        job_title: str,
+        job_description: str,
+        job_description_pdf_text: Optional[str],
+        required_skills: List[str],
+        matcher: "SemanticMatcher",
+        normalizer: SkillNormalizer,
+        on_resize: Optional[Callable[["JobProfile"], None]] = None,
+    ):
+        self.key = key
+        self.job_title = job_title or ""
+        self.job_description = job_description or ""
+        self.job_description_pdf_text = job_description_pdf_text
+        self.required_skills = list(required_skills or [])
+        self.normalized_required_skills = normalizer.normalize_skills(self.required_skills)
+
+        jd_for_projects = self.job_description.strip()
+        if job_description_pdf_text:
+            jd_for_projects = (jd_for_projects + " " + (job_description_pdf_text or "")).strip()
+        self.project_jd_text = jd_for_projects or self.job_description or "role"
+
+        # View name -> prepared text; matches the resume-side views in main._evaluate.
+        self.texts: Dict[str, str] = {
+            "job": matcher.job_view(self.job_description, job_description_pdf_text),
+            "project_jd": matcher.resume_view(self.project_jd_text),
+        }
+        title = matcher.title_view(self.job_title)
+        if title:
+            self.texts["title"] = title
+        if self.required_skills:
+            self.texts["skills"] = matcher.resume_view(skill_blob(self.required_skills, normalizer))
+
+        self.views: Optional[Dict[str, np.ndarray]] = None
+        self._lock = threading.Lock()
+        # Called after views are attached so the owning registry can re-count nbytes.
+        self._on_resize = on_resize
+
+    def ensure_embedded(self, matcher: "SemanticMatcher") -> Optional[Dict[str, np.ndarray]]:
+        """Embed the job views once; None (retried on next use) when no model is available."""
+        if self.views is not None:
+            return self.views
+        with self._lock:
+            if self.views is None:
+                emb = matcher.embed(list(self.texts.values()))
+                if emb is not None:
+                    self.views = dict(zip(self.texts.keys(), emb))
+                    self._resized()
+        return self.views
+
+    def adopt_views(self, views: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Keep job view embeddings computed alongside a request's resume views."""
+        with self._lock:
+            if self.views is None:
+                self.views = views
+                self._resized()
+        return self.views
+
+    def _resized(self) -> None:
+        if self._on_resize is not None:
+            self._on_resize(self)
+
+    @property
+    def nbytes(self) -> int:
+        total = 1024 + sum(len(t) for t in self.texts.values())
+        total += len(self.job_description) + len(self.job_description_pdf_text or "")
+        if self.views:
+            total += sum(v.nbytes for v in self.views.values())
+        return total
+
+
+class JobProfileRegistry:
+    """Thread-safe LRU of JobProfile objects bounded by an approximate memory budget."""
+
+    def __init__(
+        self,
+        matcher: "SemanticMatcher",
+        normalizer: SkillNormalizer,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.matcher = matcher
+        self.normalizer = normalizer
+        self.max_bytes = max_bytes
+        self._profiles: "OrderedDict[str, JobProfile]" = OrderedDict()
+        # Running total of _sizes, the nbytes each cached profile was last counted at.
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[JobProfile]:
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is not None:
+                self._profiles.move_to_end(key)
+            return profile
+
+    def get_or_create(
+        self,
+        job_title: str,
+        job_description: str,
+        job_description_pdf_text: Optional[str] = None,
+        required_skills: Optional[List[str]] = None,
+        *,
+        embed: bool = True,
+    ) -> JobProfile:
+        key = job_profile_key(job_title, job_description, job_description_pdf_text, required_skills or [])
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is not None:
+                self._profiles.move_to_end(key)
+                self.hits += 1
+        if profile is None:
+            profile = JobProfile(
+                key,
+                job_title,
+                job_description,
+                job_description_pdf_text,
+                required_skills or [],
+                self.matcher,
+                self.normalizer,
+                on_resize=self._resized,
+            )
+            with self._lock:
+                self.misses += 1
+                # Another thread may have created it meanwhile; keep the first one.
+                profile = self._profiles.setdefault(key, profile)
+                self._profiles.move_to_end(key)
+                self._count(profile)
+        if embed:
+            profile.ensure_embedded(self.matcher)
+        self._evict()
+        return profile
+
+    def _count(self, profile: JobProfile) -> None:
+        """Re-count a cached profile's size into the running total; caller holds the lock."""
+        size = profile.nbytes
+        self._bytes += size - self._sizes.get(profile.key, 0)
+        self._sizes[profile.key] = size
+
+    def _resized(self, profile: JobProfile) -> None:
+        with self._lock:
+            # Ignore profiles that lost the insert race or were already evicted.
+            if self._profiles.get(profile.key) is profile:
+                self._count(profile)
+
+    def _evict(self) -> None:
+        with self._lock:
+            while len(self._profiles) > 1 and self._bytes > self.max_bytes:
+                key, _ = self._profiles.popitem(last=False)
+                self._bytes -= self._sizes.pop(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "profiles": len(self._profiles),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,94 @@
+"""
+Lexical fallback for SemanticMatcher when no sentence encoder is available.
+Texts are hashed into a fixed sparse feature space (no per-comparison fitting), optionally
+weighted by an IDF fitted once on a corpus, and cached per text hash so scoring a candidate
+is a sparse dot product.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from .metrics import stage
+
+
+class LexicalIndex:
+    def __init__(self, n_features: int = 2 ** 18, max_cached: int = 20000):
+        self.n_features = n_features
+        self.max_cached = max(0, int(max_cached))
+        self._vectorizer = HashingVectorizer(
+            n_features=n_features,
+            alternate_sign=False,
+            norm=None,
+            stop_words="english",
+        )
+        self._idf: Optional[sp.dia_matrix] = None
+        self._cache: "OrderedDict[bytes, sp.csr_matrix]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fit(self, corpus: Iterable[str]) -> int:
+        """Fit smoothed IDF weights (sklearn formula) once on a corpus; returns docs seen."""
+        counts = self._vectorizer.transform(list(corpus))
+        n_docs = counts.shape[0]
+        if n_docs == 0:
+            return 0
+        df = np.bincount(counts.indices, minlength=self.n_features)
+        idf = np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+        with self._lock:
+            self._idf = sp.diags(idf.astype(np.float32), format="dia")
+            self._cache.clear()
+        return n_docs
+
+    def fit_file(self, path: str) -> int:
+        """Fit IDF from a UTF-8 text file with one document per line."""
+        with open(path, "r", encoding="utf-8") as f:
+            return self.fit(line for line in f if line.strip())
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def transform(self, texts: Sequence[str]) -> List[sp.csr_matrix]:
+        """L2-normalized (TF-)IDF rows, vectorizing all cache misses in one call."""
+        with stage("lexical"):
+            return self._transform(texts)
+
+    def _transform(self, texts: Sequence[str]) -> List[sp.csr_matrix]:
+        keys = [self._key(t) for t in texts]
+        rows: List[Optional[sp.csr_matrix]] = [None] * len(texts)
+        with self._lock:
+            for i, key in enumerate(keys):
+                row = self._cache.get(key)
+                if row is not None:
+                    self._cache.move_to_end(key)
+                    rows[i] = row
+        missing = list(dict.fromkeys(texts[i] for i, row in enumerate(rows) if row is None))
+        if missing:
+            matrix = self._vectorizer.transform(missing)
+            if self._idf is not None:
+                matrix = matrix @ self._idf
+            matrix = normalize(sp.csr_matrix(matrix), norm="l2", copy=False)
+            fresh = {text: matrix[j] for j, text in enumerate(missing)}
+            with self._lock:
+                for text, row in fresh.items():
+                    if self.max_cached:
+                        self._cache[self._key(text)] = row
+                while len(self._cache) > self.max_cached:
+                    self._cache.popitem(last=False)
+            for i, text in enumerate(texts):
+                if rows[i] is None:
+                    rows[i] = fresh[text]
+        return rows
+
+    def similarity(self, text_a: str, text_b: str) -> float:
+        """Cosine similarity (0-1) of two texts' lexical vectors."""
+        with stage("lexical"):
+            row_a, row_b = self._transform([text_a, text_b])
+            return float(max(0.0, min(1.0, row_a.multiply(row_b).sum())))
@@ -0,0 +1,206 @@
+"""
+Low-overhead pipeline instrumentation and Prometheus text exposition.
+
+Stage timers (`with stage("parse"):`) add exclusive wall time to the Timings
+collector active on the current thread, so nested stages are not double counted.
+Collectors are plain picklable objects returned from executor jobs; the event
+loop replays them into the registry's histograms, which keeps process-mode
+workers' timings visible in the parent's /metrics.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+_local = threading.local()
+
+
+class Timings:
+    """Per-request stage seconds (exclusive) and sampled values such as encode batch sizes."""
+
+    __slots__ = ("stages", "samples", "_active")
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.samples: List[Tuple[str, float]] = []
+        self._active: Optional["_Stage"] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def milliseconds(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000.0, 3) for name, seconds in self.stages.items()}
+
+    def __getstate__(self):
+        return self.stages, self.samples
+
+    def __setstate__(self, state):
+        self.stages, self.samples = state
+        self._active = None
+
+
+class _Stage:
+    __slots__ = ("name", "timings", "parent", "child", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.timings: Optional[Timings] = None
+
+    def __enter__(self):
+        timings = getattr(_local, "timings", None)
+        self.timings = timings
+        if timings is not None:
+            self.parent = timings._active
+            timings._active = self
+            self.child = 0.0
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        timings = self.timings
+        if timings is None:
+            return False
+        elapsed = time.perf_counter() - self.started
+        timings.add(self.name, elapsed - self.child)
+        if self.parent is not None:
+            self.parent.child += elapsed
+        timings._active = self.parent
+        return False
+
+
+def stage(name: str) -> _Stage:
+    """Time a block into the current thread's collector; a no-op when none is active."""
+    return _Stage(name)
+
+
+def observe(name: str, value: float) -> None:
+    """Record a sampled value (e.g. encode batch size) on the current collector."""
+    timings = getattr(_local, "timings", None)
+    if timings is not None:
+        timings.samples.append((name, float(value)))
+
+
+def collect(fn: Callable, *args, **kwargs) -> Tuple[object, Timings]:
+    """Run fn with a fresh collector on this thread; returns (result, timings)."""
+    timings = Timings()
+    previous = getattr(_local, "timings", None)
+    _local.timings = timings
+    started = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        _local.timings = previous
+    timings.add("other", (time.perf_counter() - started) - sum(timings.stages.values()))
+    return result, timings
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{str(v)}"'.replace("\n", " ") for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (+Inf last), then sum and count.
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {_format_value(cumulative)}"
+            label_text = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(series[-2])}"
+            yield f"{self.name}_count{label_text} {_format_value(series[-1])}"
+
+
+class CallbackMetric:
+    """Gauge or counter read at scrape time from fn() -> {label values tuple: value}."""
+
+    def __init__(self, name: str, documentation: str, kind: str, fn: Callable[[], Dict[Tuple[str, ...], Optional[float]]], labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> Iterable[str]:
+        try:
+            values = self.fn()
+        except Exception:
+            return
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, value in values.items():
+            if value is not None:
+                yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(float(value))}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        """Expose a metric owned elsewhere (e.g. a service's own histogram)."""
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge_callback(self, name: str, documentation: str, fn, labelnames: Sequence[str] = ()) -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, "gauge", fn, labelnames))
+
+    def counter_callback(self, name: str, documentation: str, fn, labelnames: Sequence[str] = ()) -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, "counter", fn, labelnames))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def hit_ratio(hits: float, misses: float) -> Optional[float]:
+    total = hits + misses
+    return hits / total if total else None
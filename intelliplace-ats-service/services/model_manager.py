@@ -0,0 +1,120 @@
+"""
+Sentence encoder lifecycle: load (optionally from a local path) on the configured
+backend, warm up, and remember failures so requests fall back to lexical scoring
+without retrying the load.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Optional
+
+from .encoder_backends import BACKENDS, ensure_export, load_encoder
+
+
+class ModelManager:
+    NOT_LOADED = "not_loaded"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(
+        self,
+        model_name: str,
+        model_path: Optional[str] = None,
+        retry_seconds: float = 0.0,
+        backend: str = "torch",
+        export_root: Optional[str] = None,
+        threads: int = 0,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported encoder backend {backend!r}; expected one of {list(BACKENDS)}")
+        self.model_name = model_name
+        self.model_path = model_path or None
+        self.backend = backend
+        # ONNX backends: directory for exported graphs and ONNX Runtime intra-op threads (0 = default).
+        self.export_root = export_root
+        self.threads = max(0, int(threads or 0))
+        self.retry_seconds = max(0.0, float(retry_seconds or 0.0))
+        self.state = self.NOT_LOADED
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self._model: Any = None
+        self._failed_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        """Identity of the loaded weights and backend; namespaces cached embeddings."""
+        name = self.model_path or self.model_name
+        return name if self.backend == "torch" else f"{name}@{self.backend}"
+
+    def _load_model(self):
+        return load_encoder(self.backend, self.model_path or self.model_name, self.export_root, self.threads)
+
+    def load(self, warmup: bool = True) -> bool:
+        """Load (and optionally warm up) the model; returns True when ready."""
+        with self._lock:
+            if self.state == self.READY:
+                return True
+            if self.state == self.FAILED and not self._may_retry():
+                return False
+            self.state = self.LOADING
+            started = time.perf_counter()
+            try:
+                model = self._load_model()
+                if warmup:
+                    model.encode(["warmup"])
+            except Exception as e:
+                self.state = self.FAILED
+                self.error = f"{type(e).__name__}: {e}"
+                self._failed_at = time.monotonic()
+                self.load_seconds = time.perf_counter() - started
+                return False
+            self._model = model
+            self.state = self.READY
+            self.error = None
+            self.load_seconds = time.perf_counter() - started
+            return True
+
+    def preload(self) -> bool:
+        """
+        Prepare the encoder in a process that will fork workers: torch weights are
+        loaded without a forward pass (its thread pools do not survive a fork) and
+        shared copy-on-write; ONNX backends only export, each worker opens a session.
+        """
+        if self.backend == "torch":
+            return self.load(warmup=False)
+        try:
+            ensure_export(self.backend, self.model_path or self.model_name, self.export_root)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            return False
+        return True
+
+    def _may_retry(self) -> bool:
+        return self.retry_seconds > 0 and time.monotonic() - self._failed_at >= self.retry_seconds
+
+    def get(self):
+        """The loaded model, loading it on first use; None after a cached failure."""
+        if self.state == self.READY:
+            return self._model
+        if self.state == self.FAILED and not self._may_retry():
+            return None
+        return self._model if self.load() else None
+
+    def use_model(self, model) -> None:
+        """Install an already-built encoder (anything with .encode)."""
+        with self._lock:
+            self._model = model
+            self.state = self.READY
+            self.error = None
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "model": self.model_id,
+            "backend": self.backend,
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+        }
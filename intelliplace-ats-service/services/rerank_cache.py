@@ -0,0 +1,145 @@
+"""
+Cache of Gemini rerank results.
+An in-process LRU sits in front of a local SQLite table; entries expire after a
+TTL. Keys hash the exact prompt inputs (truncated resume and JD), the model name
+and the prompt version, so changing any of them never serves a stale answer.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+RerankResult = Tuple[float, str]
+
+
+def rerank_cache_key(prompt_version: str, model: str, resume_text: str, job_description: str) -> str:
+    resume_hash = hashlib.blake2b(resume_text.encode("utf-8"), digest_size=16).hexdigest()
+    jd_hash = hashlib.blake2b(job_description.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{prompt_version}:{model}:{jd_hash}:{resume_hash}"
+
+
+class RerankCache:
+    # Expired rows are purged from SQLite once every this many writes.
+    PURGE_EVERY = 256
+
+    def __init__(self, path: str = ":memory:", ttl_seconds: float = 7 * 24 * 3600, memory_items: int = 10000):
+        self.path = path
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.memory_items = max(0, int(memory_items))
+        self._memory: "OrderedDict[str, Tuple[float, RerankResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rerank_results (
+                    key TEXT PRIMARY KEY,
+                    refined_score_10 REAL NOT NULL,
+                    feedback TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+
+    def _fresh(self, created_at: float, now: float) -> bool:
+        return not self.ttl_seconds or now - created_at < self.ttl_seconds
+
+    def _remember(self, key: str, created_at: float, result: RerankResult) -> None:
+        if not self.memory_items:
+            return
+        self._memory[key] = (created_at, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[RerankResult]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, RerankResult]:
+        """Fresh results for the keys found: memory first, then one SQLite query per 500 misses."""
+        now = time.time()
+        found: Dict[str, RerankResult] = {}
+        with self._lock:
+            missing = []
+            for key in dict.fromkeys(keys):
+                entry = self._memory.get(key)
+                if entry is not None:
+                    if self._fresh(entry[0], now):
+                        self._memory.move_to_end(key)
+                        self.memory_hits += 1
+                        found[key] = entry[1]
+                        continue
+                    del self._memory[key]
+                missing.append(key)
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                rows = self._conn.execute(
+                    "SELECT key, refined_score_10, feedback, created_at FROM rerank_results "
+                    f"WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, score_10, feedback, created_at in rows:
+                    if self._fresh(created_at, now):
+                        result = (float(score_10), feedback)
+                        self._remember(key, created_at, result)
+                        self.disk_hits += 1
+                        found[key] = result
+            self.misses += sum(1 for key in missing if key not in found)
+        return found
+
+    def put(self, key: str, result: RerankResult) -> None:
+        self.put_many([(key, result)])
+
+    def put_many(self, entries: List[Tuple[str, RerankResult]]) -> None:
+        """Store several results in one SQLite transaction."""
+        if not entries:
+            return
+        now = time.time()
+        rows = [(key, float(score_10), feedback, now) for key, (score_10, feedback) in entries]
+        with self._lock:
+            for key, score_10, feedback, _ in rows:
+                self._remember(key, now, (score_10, feedback))
+            self._conn.executemany("INSERT OR REPLACE INTO rerank_results VALUES (?, ?, ?, ?)", rows)
+            previous = self._writes
+            self._writes += len(rows)
+            if self.ttl_seconds and self._writes // self.PURGE_EVERY != previous // self.PURGE_EVERY:
+                self._conn.execute("DELETE FROM rerank_results WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_items": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    def reopen(self) -> None:
+        """Open a fresh connection in a forked worker; SQLite handles must not be used across a fork."""
+        if self.path == ":memory:":
+            return
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,342 @@
+"""
+Candidate resume index for reverse matching (job -> best students).
+
+Each candidate's resume-view embedding sits in a VectorPool in memory and in
+SQLite on disk (with the zlib-compressed resume text, for optional full
+re-scoring). Search is an exact blockwise scan of the pool; past a configured
+size an IVF index (spherical k-means lists, probing the nearest few) scores
+only a fraction of the pool instead; it trains outside the index lock and is
+swapped in when ready. When several processes share the database
+(prefork workers), each picks up the others' writes before searching.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .vector_pool import VectorPool
+
+CandidateId = Union[int, str]
+
+
+def _kmeans(vectors: np.ndarray, k: int, iterations: int, seed: int = 0) -> np.ndarray:
+    """Spherical k-means centroids (unit norm) for normalized rows."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        counts = np.bincount(assignment, minlength=k)
+        empty = counts == 0
+        # Reseed empty lists from random points so every list stays usable.
+        sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+
+class _IVF:
+    """Inverted lists of pool slots keyed by the nearest centroid."""
+
+    def __init__(self, centroids: np.ndarray, slots: np.ndarray, assignment: np.ndarray):
+        self.centroids = centroids
+        self.lists: List[List[int]] = [[] for _ in range(len(centroids))]
+        for slot, list_id in zip(slots.tolist(), assignment.tolist()):
+            self.lists[list_id].append(slot)
+        self.built_size = len(slots)
+
+    def add(self, slot: int, vector: np.ndarray) -> None:
+        self.lists[int(np.argmax(self.centroids @ vector))].append(slot)
+
+    def probe(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        nearest = np.argsort(-(self.centroids @ query))[:nprobe]
+        slots = [slot for list_id in nearest for slot in self.lists[list_id]]
+        return np.unique(np.asarray(slots, dtype=np.int64))
+
+
+class ResumeIndex:
+    SAMPLE_FOR_TRAINING = 20000
+    KMEANS_ITERATIONS = 8
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        namespace: str = "",
+        dtype: str = "float32",
+        ivf_min_items: int = 100000,
+        nprobe: int = 16,
+    ):
+        self.path = path
+        self.namespace = namespace
+        self.dtype = dtype
+        # Build an IVF index once the pool holds this many resumes (0 = always exact).
+        self.ivf_min_items = max(0, int(ivf_min_items))
+        self.nprobe = max(1, int(nprobe))
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._pool: Optional[VectorPool] = None
+        self._slots: Dict[CandidateId, int] = {}
+        self._ids: List[Optional[CandidateId]] = []
+        # Slot -> holds a current vector; freed slots are masked out of every search.
+        self._live = np.zeros(0, dtype=bool)
+        self._ivf: Optional[_IVF] = None
+        # Slots inserted while an IVF trains outside the lock; None when no training runs.
+        self._ivf_pending: Optional[List[int]] = None
+        # Candidate -> updated_at of the row held in memory, and the SQLite data_version last seen.
+        self._updated: Dict[CandidateId, float] = {}
+        self._data_version: Optional[int] = None
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resume_vectors (
+                    candidate_id TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    resume_text BLOB NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+            self._load()
+            self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _load_rows(self, rows) -> None:
+        """Insert (candidate_id, vector blob, updated_at) rows; caller holds the lock."""
+        ids = [json.loads(candidate_id) for candidate_id, _, _ in rows]
+        self._insert(ids, np.stack([np.frombuffer(blob, dtype=np.float32) for _, blob, _ in rows]))
+        self._updated.update(zip(ids, (updated_at for _, _, updated_at in rows)))
+
+    def _load(self) -> None:
+        cursor = self._conn.execute(
+            "SELECT candidate_id, vector, updated_at FROM resume_vectors WHERE namespace = ?", (self.namespace,)
+        )
+        while True:
+            rows = cursor.fetchmany(4096)
+            if not rows:
+                break
+            self._load_rows(rows)
+
+    def _sync(self) -> None:
+        """Apply rows other connections committed since the last look (prefork workers); caller holds the lock."""
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        self._data_version = version
+        current = {
+            json.loads(candidate_id): updated_at
+            for candidate_id, updated_at in self._conn.execute(
+                "SELECT candidate_id, updated_at FROM resume_vectors WHERE namespace = ?", (self.namespace,)
+            )
+        }
+        for candidate_id in [c for c in self._slots if c not in current]:
+            self._drop(candidate_id)
+        changed = [json.dumps(c) for c, updated_at in current.items() if self._updated.get(c) != updated_at]
+        for start in range(0, len(changed), 500):
+            chunk = changed[start:start + 500]
+            self._load_rows(self._conn.execute(
+                "SELECT candidate_id, vector, updated_at FROM resume_vectors "
+                f"WHERE candidate_id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall())
+
+    def _drop(self, candidate_id: CandidateId) -> bool:
+        """Free a candidate's slot; caller holds the lock."""
+        self._updated.pop(candidate_id, None)
+        slot = self._slots.pop(candidate_id, None)
+        if slot is None:
+            return False
+        self._pool.free(slot)
+        self._ids[slot] = None
+        self._live[slot] = False
+        return True
+
+    def _insert(self, candidate_ids: Sequence[CandidateId], vectors: np.ndarray) -> None:
+        """Place vectors in the pool (replacing earlier ones) and in the IVF lists; caller holds the lock."""
+        if self._pool is None:
+            self._pool = VectorPool(vectors.shape[1], self.dtype)
+        for candidate_id in candidate_ids:
+            old = self._slots.pop(candidate_id, None)
+            if old is not None:
+                self._pool.free(old)
+                self._ids[old] = None
+                self._live[old] = False
+        slots = self._pool.add_many(vectors)
+        needed = max(slots) + 1
+        if needed > len(self._ids):
+            self._ids.extend([None] * (needed - len(self._ids)))
+        if needed > len(self._live):
+            grow = max(needed - len(self._live), len(self._live))
+            self._live = np.concatenate([self._live, np.zeros(grow, dtype=bool)])
+        for candidate_id, slot, vector in zip(candidate_ids, slots, vectors):
+            self._ids[slot] = candidate_id
+            self._live[slot] = True
+            self._slots[candidate_id] = slot
+            if self._ivf is not None:
+                self._ivf.add(slot, vector)
+        if self._ivf_pending is not None:
+            self._ivf_pending.extend(slots)
+
+    def upsert_many(self, entries: Iterable[Tuple[CandidateId, np.ndarray, str]]) -> int:
+        """Index (candidate_id, normalized resume vector, resume text) entries; returns the count."""
+        entries = list(entries)
+        if not entries:
+            return 0
+        now = time.time()
+        vectors = np.stack([np.asarray(vector, dtype=np.float32) for _, vector, _ in entries])
+        rows = [
+            (json.dumps(candidate_id), self.namespace, vector.tobytes(), zlib.compress(text.encode("utf-8")), now)
+            for (candidate_id, _, text), vector in zip(entries, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO resume_vectors VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+            ids = [candidate_id for candidate_id, _, _ in entries]
+            self._insert(ids, vectors)
+            self._updated.update((candidate_id, now) for candidate_id in ids)
+        return len(entries)
+
+    def remove(self, candidate_id: CandidateId) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM resume_vectors WHERE candidate_id = ?", (json.dumps(candidate_id),))
+            self._conn.commit()
+            return self._drop(candidate_id) or cursor.rowcount > 0
+
+    def resume_texts(self, candidate_ids: Sequence[CandidateId]) -> Dict[CandidateId, str]:
+        keys = [json.dumps(candidate_id) for candidate_id in candidate_ids]
+        out: Dict[CandidateId, str] = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT candidate_id, resume_text FROM resume_vectors WHERE candidate_id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for candidate_id, blob in rows:
+                    out[json.loads(candidate_id)] = zlib.decompress(blob).decode("utf-8")
+        return out
+
+    def _ivf_training_set(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Live slots and the k-means sample vectors; caller holds the lock."""
+        live = np.fromiter(self._slots.values(), dtype=np.int64, count=len(self._slots))
+        rng = np.random.default_rng(0)
+        sample = live if len(live) <= self.SAMPLE_FOR_TRAINING else rng.choice(live, self.SAMPLE_FOR_TRAINING, replace=False)
+        return live, self._pool.get_many(sample)
+
+    def _train_ivf(self, live: np.ndarray, sample: np.ndarray) -> _IVF:
+        """
+        Train and fill an IVF without the lock, so searches and writes keep going.
+        Slots written meanwhile are recorded in _ivf_pending and re-placed at the swap.
+        """
+        lists = max(16, int(np.sqrt(len(live))))
+        centroids = _kmeans(sample, min(lists, len(sample)), self.KMEANS_ITERATIONS)
+        assignment = np.empty(len(live), dtype=np.int64)
+        for start in range(0, len(live), 8192):
+            chunk = live[start:start + 8192]
+            assignment[start:start + len(chunk)] = np.argmax(self._pool.get_many(chunk) @ centroids.T, axis=1)
+        return _IVF(centroids, live, assignment)
+
+    def _refresh_ivf(self) -> None:
+        """(Re)build the IVF when the pool outgrew it; only one thread trains at a time."""
+        with self._lock:
+            self._sync()
+            stale = self._ivf is None or len(self._slots) > 2 * self._ivf.built_size
+            if not stale or self._ivf_pending is not None or not self._slots:
+                return
+            live, sample = self._ivf_training_set()
+            self._ivf_pending = []
+        try:
+            ivf = self._train_ivf(live, sample)
+        except BaseException:
+            with self._lock:
+                self._ivf_pending = None
+            raise
+        with self._lock:
+            for slot in set(self._ivf_pending):
+                if slot < len(self._live) and self._live[slot]:
+                    ivf.add(slot, self._pool.get(slot))
+            self._ivf = ivf
+            self._ivf_pending = None
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        exclude: Iterable[CandidateId] = (),
+        exact: bool = False,
+    ) -> Tuple[List[Tuple[CandidateId, float]], str, int]:
+        """
+        Top-k (candidate_id, cosine) for a normalized query, best first.
+        Returns the hits, the method used ("exact" or "ivf") and how many
+        vectors were scored. While the first IVF is still training elsewhere
+        the search falls back to an exact scan.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        if not exact and self.ivf_min_items and len(self._slots) >= self.ivf_min_items:
+            self._refresh_ivf()
+        with self._lock:
+            self._sync()
+            if self._pool is None or not self._slots:
+                return [], "exact", 0
+            use_ivf = (
+                not exact and self.ivf_min_items and len(self._slots) >= self.ivf_min_items and self._ivf is not None
+            )
+            if use_ivf:
+                slots = self._ivf.probe(query, self.nprobe)
+                scores = self._pool.cosine_many(query, slots)
+            else:
+                slots = None
+                scores = self._pool.cosine_many(query)
+            ids = self._ids
+            if slots is None:
+                slots = np.arange(len(scores))
+            live = self._live[slots]
+            excluded = [self._slots[c] for c in exclude if c in self._slots]
+            if excluded:
+                live &= ~np.isin(slots, excluded)
+            scores = np.where(live, scores, -np.inf)
+            k = min(k, int(live.sum()))
+            if k <= 0:
+                return [], "ivf" if use_ivf else "exact", len(slots)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            hits = [(ids[int(slots[i])], float(scores[i])) for i in top]
+        return hits, "ivf" if use_ivf else "exact", len(slots)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._sync()
+            return {
+                "candidates": len(self._slots),
+                "dtype": self.dtype,
+                "memory_bytes": self._pool.nbytes if self._pool is not None else 0,
+                "ivf_lists": len(self._ivf.lists) if self._ivf is not None else 0,
+                "ivf_min_items": self.ivf_min_items,
+            }
+
+    def reopen(self) -> None:
+        """Open a fresh connection in a forked worker; SQLite handles must not be used across a fork."""
+        if self.path == ":memory:":
+            return
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._data_version = None
+        self._ivf_pending = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,11 +1,76 @@
 """
 Section-based resume parser.
 Extracts structured fields: skills, experience years, projects count, education.
+
+The text is lowercased once; section headers are found in a single scan and
+sections are kept as (start, end) offsets into that buffer, so every extractor
+runs its precompiled pattern over the span without copying or re-lowercasing.
+Parse results can be cached by text hash, since the same CV is usually
+evaluated against many jobs.
 """
+import hashlib
 import re
-from typing import Dict
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple
 
+from .metrics import stage
 from .skill_normalizer import SkillNormalizer
+from .skill_scanner import vocabulary_skill_scanner
+
+Span = Tuple[int, int]
+
+_EXPERIENCE_YEARS = re.compile(r"(\d+(?:\.\d+)?)\s*[+]?\s*(?:years?|yrs?|yoe)")
+_BULLET = re.compile(r"(^|\n)\s*(?:[-*•]|\d+\.)\s+")
+_PROJECT_KEYWORD = re.compile(r"\b(project|developed|implemented|built)\b")
+_INTERNSHIP = re.compile(r"\bintern(?:ship)?\b")
+_BLANK_LINE = re.compile(r"\n[ \t]*\n")
+_DEGREE_PATTERNS = [
+    (re.compile(rf"\b{pat}\b"), label)
+    for pat, label in [
+        (r"phd|doctorate", "phd"),
+        (r"m\.?tech|mtech|m\.?s\.?|ms|master", "masters"),
+        (r"b\.?tech|btech|b\.?e\.?|be|bachelor|b\.?s\.?|bs", "bachelor"),
+        (r"mca", "mca"),
+        (r"bca", "bca"),
+        (r"diploma", "diploma"),
+    ]
+]
+
+
+def _pack(text: str, max_chars: int, separators: Sequence[str] = ("\n\n", "\n", " ")) -> List[str]:
+    """
+    Greedily join the pieces of `text` (split at the first separator) into chunks of
+    at most max_chars; pieces that are still too long are split at the next one.
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+    if not separators:
+        return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
+    sep, rest = separators[0], separators[1:]
+    pieces = _BLANK_LINE.split(text) if sep == "\n\n" else text.split(sep)
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        piece = piece.strip()
+        if not piece:
+            continue
+        if len(piece) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_pack(piece, max_chars, rest))
+        elif not current:
+            current = piece
+        elif len(current) + len(sep) + len(piece) <= max_chars:
+            current += sep + piece
+        else:
+            chunks.append(current)
+            current = piece
+    if current:
+        chunks.append(current)
+    return chunks
 
 
 class ResumeParser:
@@ -16,52 +81,77 @@ class ResumeParser:
         "education": ["education", "academic", "qualification", "qualifications"],
     }
 
-    def __init__(self):
+    def __init__(self, cache_items: int = 0):
         self.skill_normalizer = SkillNormalizer()
+        self.skill_scanner = vocabulary_skill_scanner()
+        # Header alias -> (section, priority); earlier aliases win when several appear.
+        self._header_aliases = {
+            alias: (section, rank)
+            for section, aliases in self.SECTION_HEADERS.items()
+            for rank, alias in enumerate(aliases)
+        }
+        # A header is a line holding only an alias and an optional colon. The tail is a
+        # lookahead so adjacent header lines are all found in one non-overlapping scan.
+        aliases = sorted(self._header_aliases, key=len, reverse=True)
+        self._header_regex = re.compile(
+            r"(?:^|\n)\s*(" + "|".join(re.escape(a) for a in aliases) + r")(?=\s*:?\s*(?:\n|$))"
+        )
+        # LRU of parse results by text hash; 0 disables it.
+        self.cache_items = max(0, int(cache_items))
+        self._cache: "OrderedDict[bytes, dict]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
 
     def _normalize_text(self, text: str) -> str:
         return (text or "").replace("\r\n", "\n").replace("\r", "\n")
 
-    def _extract_sections(self, resume_text: str) -> Dict[str, str]:
-        text = self._normalize_text(resume_text)
-        lower = text.lower()
-        markers = []
-        for section, keys in self.SECTION_HEADERS.items():
-            for key in keys:
-                m = re.search(rf"(^|\n)\s*{re.escape(key)}\s*:?\s*(\n|$)", lower)
-                if m:
-                    markers.append((m.start(), section))
-                    break
-        markers.sort(key=lambda x: x[0])
-
-        if not markers:
-            return {"skills": text, "experience": text, "projects": text, "education": text}
-
-        sections = {k: "" for k in self.SECTION_HEADERS}
+    def _section_spans(self, lower: str) -> Dict[str, Span]:
+        """Offsets of each section in the lowercased text; the whole text for every section when no header is found."""
+        first: Dict[str, Tuple[int, int]] = {}
+        for m in self._header_regex.finditer(lower):
+            section, rank = self._header_aliases[m.group(1)]
+            best = first.get(section)
+            if best is None or rank < best[0]:
+                first[section] = (rank, m.start())
+        if not first:
+            return {section: (0, len(lower)) for section in self.SECTION_HEADERS}
+
+        markers = sorted((start, section) for section, (_, start) in first.items())
+        spans = {section: (0, 0) for section in self.SECTION_HEADERS}
         for i, (start, section) in enumerate(markers):
-            end = markers[i + 1][0] if i + 1 < len(markers) else len(text)
-            sections[section] = text[start:end]
-        return sections
-
-    def _extract_skills(self, section_text: str):
-        skill_pattern = (
-            r"\b(python|java|javascript|js|typescript|ts|react|reactjs|react\.js|node\.?js|node|"
-            r"express|nest\.?js|angular|vue\.?js|vue|next\.?js|nuxt|"
-            r"c\+\+|cpp|c#|\.net|dotnet|go(?:lang)?|rust|kotlin|swift|scala|ruby|rails|php|laravel|"
-            r"sql|postgres|postgresql|mysql|sqlite|redis|elasticsearch|mongodb|mongo|dynamodb|"
-            r"aws|gcp|azure|docker|kubernetes|k8s|terraform|ansible|jenkins|"
-            r"fastapi|django|flask|spring|spring boot|hibernate|graphql|grpc|kafka|rabbitmq|"
-            r"html|css|tailwind|sass|webpack|vite|pandas|numpy|scikit|tensorflow|pytorch|keras|"
-            r"opencv|nlp|natural language|computer vision|spark|airflow|dbt|snowflake|bigquery|"
-            r"machine learning|deep learning|data science|git|linux|bash|powershell|unit test|pytest)\b"
-        )
-        found = [m.group(1) for m in re.finditer(skill_pattern, (section_text or "").lower(), re.I)]
-        return self.skill_normalizer.normalize_skills(found)
-
-    def _extract_experience_years(self, section_text: str) -> float:
-        text = (section_text or "").lower()
+            end = markers[i + 1][0] if i + 1 < len(markers) else len(lower)
+            spans[section] = (start, end)
+        return spans
+
+    def section_chunks(self, resume_text: str, max_chars: int = 1000) -> List[str]:
+        """
+        The whole resume split at every section header, then into paragraph chunks of
+        at most max_chars (long paragraphs split at lines, then words). Boundaries only
+        depend on the surrounding section, so an edit leaves other sections' chunks identical.
+        """
+        text = self._normalize_text(resume_text)
+        starts = sorted({0} | {m.start() for m in self._header_regex.finditer(text.lower())})
+        ends = starts[1:] + [len(text)]
+        chunks: List[str] = []
+        for start, end in zip(starts, ends):
+            chunks.extend(_pack(text[start:end], max_chars))
+        return chunks
+
+    def _extract_skills(self, lower: str, span: Span):
+        out = []
+        seen = set()
+        terms = self.skill_scanner.terms
+        for surface in self.skill_scanner.surfaces(lower, *span):
+            for norm in terms[surface]:
+                if norm not in seen:
+                    seen.add(norm)
+                    out.append(norm)
+        return out
+
+    def _extract_experience_years(self, lower: str, span: Span) -> float:
         vals = []
-        for m in re.finditer(r"(\d+(?:\.\d+)?)\s*[+]?\s*(?:years?|yrs?|yoe)", text):
+        for m in _EXPERIENCE_YEARS.finditer(lower, *span):
             try:
                 vals.append(float(m.group(1)))
             except Exception:
@@ -70,25 +160,15 @@ class ResumeParser:
             return min(max(vals), 40.0)
         return 0.0
 
-    def _extract_project_count(self, section_text: str) -> int:
-        text = (section_text or "").lower()
-        bullets = re.findall(r"(^|\n)\s*(?:[-*•]|\d+\.)\s+", text)
-        keyword_hits = re.findall(r"\b(project|developed|implemented|built)\b", text)
-        cnt = max(len(bullets), len(keyword_hits) // 2)
+    def _extract_project_count(self, lower: str, span: Span) -> int:
+        bullets = sum(1 for _ in _BULLET.finditer(lower, *span))
+        keyword_hits = sum(1 for _ in _PROJECT_KEYWORD.finditer(lower, *span))
+        cnt = max(bullets, keyword_hits // 2)
         return min(max(cnt, 0), 25)
 
-    def _extract_education(self, section_text: str) -> str:
-        text = (section_text or "").lower()
-        degree_patterns = [
-            (r"phd|doctorate", "phd"),
-            (r"m\.?tech|mtech|m\.?s\.?|ms|master", "masters"),
-            (r"b\.?tech|btech|b\.?e\.?|be|bachelor|b\.?s\.?|bs", "bachelor"),
-            (r"mca", "mca"),
-            (r"bca", "bca"),
-            (r"diploma", "diploma"),
-        ]
-        for pat, label in degree_patterns:
-            if re.search(rf"\b{pat}\b", text):
+    def _extract_education(self, lower: str, span: Span) -> str:
+        for regex, label in _DEGREE_PATTERNS:
+            if regex.search(lower, *span):
                 return label
         return ""
 
@@ -99,15 +179,51 @@ class ResumeParser:
         return block
 
     def parse(self, resume_text: str) -> dict:
-        text = self._normalize_text(resume_text)
-        sections = self._extract_sections(text)
-
-        skills = self._extract_skills(sections.get("skills", text))
-        exp_years = self._extract_experience_years(sections.get("experience", text))
-        proj_count = self._extract_project_count(sections.get("projects", text))
-        intern_count = len(re.findall(r"\bintern(?:ship)?\b", sections.get("experience", text).lower()))
-        education_degree = self._extract_education(sections.get("education", text))
-        project_text = self._project_section_text(sections, text)
+        """
+        Structured fields of a resume. Cached results are shared: the returned dict
+        is a fresh copy, but its nested values (skills, sections) must not be mutated.
+        """
+        if not self.cache_items:
+            return self._parse(resume_text)
+        key = hashlib.blake2b((resume_text or "").encode("utf-8"), digest_size=16).digest()
+        with self._cache_lock:
+            parsed = self._cache.get(key)
+            if parsed is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return dict(parsed)
+        parsed = self._parse(resume_text)
+        with self._cache_lock:
+            self.misses += 1
+            self._cache[key] = parsed
+            while len(self._cache) > self.cache_items:
+                self._cache.popitem(last=False)
+        return dict(parsed)
+
+    def cache_stats(self) -> dict:
+        with self._cache_lock:
+            return {
+                "items": len(self._cache),
+                "max_items": self.cache_items,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _parse(self, resume_text: str) -> dict:
+        with stage("parse_sections"):
+            text = self._normalize_text(resume_text)
+            lower = text.lower()
+            spans = self._section_spans(lower)
+
+        with stage("parse_skills"):
+            skills = self._extract_skills(lower, spans["skills"])
+        with stage("parse_fields"):
+            exp_years = self._extract_experience_years(lower, spans["experience"])
+            proj_count = self._extract_project_count(lower, spans["projects"])
+            intern_count = sum(1 for _ in _INTERNSHIP.finditer(lower, *spans["experience"]))
+            education_degree = self._extract_education(lower, spans["education"])
+            sections = {section: text[start:end] for section, (start, end) in spans.items()}
+            project_text = self._project_section_text(sections, text)
 
         return {
             "skills": skills,
@@ -5,9 +5,58 @@ Calculates normalized feature scores and weighted final score.
 from __future__ import annotations
 
 from collections import Counter
+from functools import lru_cache
 import re
+from typing import Dict, FrozenSet, Iterable, Tuple
 
+import numpy as np
+
+from .metrics import stage
 from .skill_normalizer import SkillNormalizer
+from .skill_scanner import trie_pattern
+
+_STUFFING_TOKEN = re.compile(r"[a-zA-Z0-9\+\.#]+")
+
+
+@lru_cache(maxsize=1024)
+def _key_scan(keys: FrozenSet[str]) -> Tuple[re.Pattern, Dict[str, Tuple[str, ...]]]:
+    """
+    A regex giving, over newline-separated tokens, the longest key that starts at
+    each position and the newline at each token end, plus each key's prefixes among the
+    keys (they occur wherever it does). Only the first character is consumed so
+    every position is tried; the lookbehind re-reads the key from there.
+    """
+    starts = "".join(sorted({k[0] for k in keys}))
+    pattern = re.compile("[\n" + re.escape(starts) + "](?<=(?=(\n|" + trie_pattern(keys) + ")).)", re.DOTALL)
+    return pattern, {k: tuple(j for j in keys if k.startswith(j)) for k in keys}
+
+
+def _skill_occurrences(token_counts: Counter, skills: Iterable[str]) -> Dict[str, int]:
+    """
+    For each skill key (lowercase, spaces removed), the total count of tokens that
+    contain it once dots are stripped.
+
+    The distinct tokens are scanned once as a single dot-stripped buffer. Each
+    token's hits form a signature; tokens are tallied per signature, so the
+    per-key totals come from the few distinct signatures and each skill is a
+    dict lookup, however many skills there are.
+    """
+    keys = frozenset(k for k in (s.lower().replace(" ", "") for s in skills) if k)
+    if not keys:
+        return {}
+    pattern, prefixes = _key_scan(keys)
+    buffer = ("\n".join(token_counts) + "\n").replace(".", "")
+    signatures = "\t".join(pattern.findall(buffer)).split("\n")
+    weights = Counter(signatures)
+    for signature, count in zip(signatures, token_counts.values()):
+        if count > 1:
+            weights[signature] += count - 1
+
+    occurrences = dict.fromkeys(keys, 0)
+    for signature, count in weights.items():
+        for key in {k for hit in signature.split("\t") if hit for k in prefixes[hit]}:
+            occurrences[key] += count
+    return occurrences
 
 
 class ScoringEngine:
@@ -27,6 +76,11 @@ class ScoringEngine:
         "education_score": 0.05,
     }
 
+    # Column order of feature matrices used by compute_final_scores.
+    FEATURE_NAMES = tuple(WEIGHTS)
+    # Fewest tokens at which a resume can be flagged as keyword spam.
+    STUFFING_MIN_TOKENS = 1400
+
     def __init__(self):
         self.skill_normalizer = SkillNormalizer()
 
@@ -124,31 +178,34 @@ class ScoringEngine:
         Returns penalty in [0.0, 0.06].
         """
         text = (resume_text or "").lower()
-        if not text:
+        # Tokens are separated by at least one character, so shorter texts cannot reach
+        # the smallest spam threshold (1400 tokens) and need no tokenizing at all.
+        if len(text) < 2 * self.STUFFING_MIN_TOKENS - 1:
             return 0.0
 
-        tokens = re.findall(r"[a-zA-Z0-9\+\.#]+", text)
-        total_tokens = len(tokens)
+        with stage("stuffing_tokens"):
+            token_counts = Counter(_STUFFING_TOKEN.findall(text))
+        total_tokens = sum(token_counts.values())
         if total_tokens == 0:
             return 0.0
 
-        token_counts = Counter(tokens)
-        unique = len(set(tokens))
+        unique = len(token_counts)
         unique_ratio = unique / max(total_tokens, 1)
         max_freq = max(token_counts.values()) if token_counts else 0
         spam_suspect = (total_tokens >= 2200 and unique_ratio < 0.12) or (
-            total_tokens >= 1400 and max_freq >= max(25, int(0.04 * total_tokens))
+            total_tokens >= self.STUFFING_MIN_TOKENS and max_freq >= max(25, int(0.04 * total_tokens))
         )
         if not spam_suspect:
             return 0.0
 
+        with stage("stuffing_skills"):
+            occurrences = _skill_occurrences(token_counts, normalized_resume_skills or [])
         repetition_penalty = 0.0
         for skill in normalized_resume_skills or []:
             key = skill.lower().replace(" ", "")
             if not key:
                 continue
-            occurrences = sum(c for t, c in token_counts.items() if key in t.replace(".", ""))
-            ratio = occurrences / total_tokens
+            ratio = occurrences.get(key, 0) / total_tokens
             if ratio > 0.10:
                 repetition_penalty += min(0.025, (ratio - 0.10) * 0.5)
 
@@ -198,3 +255,15 @@ class ScoringEngine:
             total += val * weight
         total -= max(0.0, stuffing_penalty)
         return max(0.0, min(1.0, total))
+
+    def compute_final_scores(
+        self,
+        features: np.ndarray,
+        stuffing_penalties: np.ndarray,
+        weights: dict[str, float] | None = None,
+    ) -> np.ndarray:
+        """Vectorized compute_final_score over an N x len(FEATURE_NAMES) matrix."""
+        wmap = weights if weights is not None else self.WEIGHTS
+        w = np.array([wmap.get(name, 0.0) for name in self.FEATURE_NAMES], dtype=np.float64)
+        total = features @ w - np.maximum(0.0, stuffing_penalties)
+        return np.clip(total, 0.0, 1.0)
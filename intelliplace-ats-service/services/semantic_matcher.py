@@ -1,23 +1,166 @@
 """
 Semantic similarity between resume and job description.
-Uses sentence-transformers for embeddings, falls back to TF-IDF if unavailable.
+Uses sentence-transformers for embeddings, falls back to hashed TF-IDF if unavailable.
+
+With a chunker, the resume is embedded as section/paragraph chunks (each cached
+by content hash) pooled into one document vector: long CVs are covered past the
+model's token window, and a re-uploaded CV only encodes the chunks that changed.
 """
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .embedding_store import EmbeddingStore
+from .lexical_index import LexicalIndex
+from .metrics import observe, stage
+from .model_manager import ModelManager
 
 
 class SemanticMatcher:
-    def __init__(self):
-        self._model = None
+    MODEL_NAME = 'all-MiniLM-L6-v2'
+    MAX_CHARS = 5000
+    ROLE_RESUME_CHARS = 2000
+    ENCODE_BATCH_SIZE = 64
+    # Characters of a chunked resume that are embedded (the leading chunks up to this total).
+    MAX_CHUNKED_CHARS = 32000
+
+    def __init__(
+        self,
+        embedding_store: Optional[EmbeddingStore] = None,
+        model_manager: Optional[ModelManager] = None,
+        lexical_index: Optional[LexicalIndex] = None,
+        chunker: Optional[Callable[[str], List[str]]] = None,
+        batcher=None,
+    ):
+        self.model_manager = model_manager or ModelManager(self.MODEL_NAME)
+        self.embedding_store = embedding_store
+        self.lexical_index = lexical_index or LexicalIndex()
+        # Splits a resume into chunks (e.g. ResumeParser.section_chunks); None embeds the truncated resume view.
+        self.chunker = chunker
+        # Shared EncodeBatcher merging concurrent callers' encodes; None calls the model directly.
+        self.batcher = batcher
 
     def _get_model(self):
-        if self._model is None:
+        return self.model_manager.get()
+
+    # Text views: every similarity compares two of these prepared strings.
+    def job_view(self, job_description: str, job_description_pdf_text=None) -> str:
+        job = (job_description or "").strip()
+        if job_description_pdf_text:
+            job += " " + (job_description_pdf_text or "").strip()
+        return job[:self.MAX_CHARS] or "job"
+
+    def resume_view(self, resume_text: str) -> str:
+        return (resume_text or "").strip()[:self.MAX_CHARS]
+
+    def resume_chunks(self, resume_text: str) -> Tuple[str, ...]:
+        """Texts embedded and pooled for the resume document vector (empty for an empty resume)."""
+        if self.chunker is None:
+            view = self.resume_view(resume_text)
+            return (view,) if view else ()
+        chunks = []
+        total = 0
+        for chunk in self.chunker(resume_text or ""):
+            total += len(chunk)
+            if total > self.MAX_CHUNKED_CHARS and chunks:
+                break
+            chunks.append(chunk)
+        return tuple(chunks)
+
+    def role_resume_view(self, resume_text: str) -> str:
+        return (resume_text or "").strip().lower()[:self.ROLE_RESUME_CHARS]
+
+    def title_view(self, job_title: str) -> str:
+        return (job_title or "").strip().lower()
+
+    def embed(self, texts: Sequence[str]) -> Optional[np.ndarray]:
+        """
+        L2-normalized embeddings (one row per text) from batched encode calls.
+        Duplicate texts are encoded once and texts already in the embedding
+        store skip the model. Returns None when no model is available.
+        """
+        if not texts:
+            return None
+        unique = list(dict.fromkeys(texts))
+        vectors = {}
+        if self.embedding_store is not None:
+            for text, vec in zip(unique, self.embedding_store.get_many(unique)):
+                if vec is not None:
+                    vectors[text] = vec
+        missing = [t for t in unique if t not in vectors]
+        if missing:
+            model = self._get_model()
+            if model is None:
+                return None
+            observe("encode_batch_size", len(missing))
             try:
-                from sentence_transformers import SentenceTransformer
-                self._model = SentenceTransformer('all-MiniLM-L6-v2')
+                encoder = self.batcher if self.batcher is not None else model
+                with stage("encode"):
+                    emb = np.asarray(
+                        encoder.encode(missing, batch_size=self.ENCODE_BATCH_SIZE),
+                        dtype=np.float32,
+                    )
             except Exception:
-                self._model = None
-        return self._model
+                return None
+            norms = np.linalg.norm(emb, axis=1, keepdims=True)
+            emb = emb / np.maximum(norms, 1e-12)
+            if self.embedding_store is not None:
+                self.embedding_store.put_many(missing, emb)
+            vectors.update(zip(missing, emb))
+        return np.stack([vectors[t] for t in texts])
+
+    @staticmethod
+    def pool(chunks: Sequence[str], vectors: np.ndarray) -> np.ndarray:
+        """Document vector: chunk embeddings averaged by chunk length, re-normalized."""
+        if len(chunks) == 1:
+            return vectors[0]
+        weights = np.asarray([max(len(chunk), 1) for chunk in chunks], dtype=np.float32)
+        pooled = weights @ vectors
+        return pooled / max(float(np.linalg.norm(pooled)), 1e-12)
+
+    def encode_views(self, views: Mapping[str, Union[str, Sequence[str]]]) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Embed every named text view a request needs in one batched pass.
+        A view may be a sequence of chunks, pooled into one vector. Identical
+        texts under different names are encoded once. Returns view name ->
+        normalized embedding, or None when no model is available.
+        """
+        if not views:
+            return {}
+        parts = {name: (text,) if isinstance(text, str) else tuple(text) for name, text in views.items()}
+        emb = self.embed([text for chunks in parts.values() for text in chunks])
+        if emb is None:
+            return None
+        out = {}
+        offset = 0
+        for name, chunks in parts.items():
+            out[name] = self.pool(chunks, emb[offset:offset + len(chunks)])
+            offset += len(chunks)
+        return out
+
+    def embed_resumes(self, resume_texts: Sequence[str]) -> Optional[np.ndarray]:
+        """Resume document vectors (as used for the semantic score), one row per resume."""
+        views = {str(i): self.resume_chunks(text) or ("",) for i, text in enumerate(resume_texts)}
+        embedded = self.encode_views(views)
+        if embedded is None:
+            return None
+        return np.stack([embedded[str(i)] for i in range(len(resume_texts))])
+
+    @staticmethod
+    def similarity_score(cosine: float) -> float:
+        """Map a cosine similarity (-1..1) to the 0-1 scale used in scoring."""
+        return float(max(0, min(1, (float(cosine) + 1) / 2)))
+
+    @classmethod
+    def vector_similarity(cls, vec_a: np.ndarray, vec_b: np.ndarray) -> float:
+        """Cosine similarity of two normalized embeddings mapped to 0-1."""
+        return cls.similarity_score(np.dot(vec_a, vec_b))
+
+    def _embedded_similarity(self, text_a: Union[str, Sequence[str]], text_b: str) -> Optional[float]:
+        embedded = self.encode_views({"a": text_a, "b": text_b})
+        if embedded is None:
+            return None
+        return self.vector_similarity(embedded["a"], embedded["b"])
 
     def compute_similarity(
         self,
@@ -26,67 +169,43 @@ class SemanticMatcher:
         job_description_pdf_text=None
     ) -> float:
         """Compute semantic similarity between resume and job description (0-1)."""
-        resume = (resume_text or "").strip()[:5000]
-        job = (job_description or "").strip()
-        if job_description_pdf_text:
-            job += " " + (job_description_pdf_text or "").strip()
-        job = job[:5000] or "job"
+        resume = self.resume_view(resume_text)
+        job = self.job_view(job_description, job_description_pdf_text)
 
-        model = self._get_model()
-        if model is not None:
-            try:
-                emb = model.encode([resume, job])
-                sim = cosine_similarity([emb[0]], [emb[1]])[0][0]
-                return float(max(0, min(1, (sim + 1) / 2)))
-            except Exception:
-                pass
+        sim = self._embedded_similarity(self.resume_chunks(resume_text) or resume, job)
+        if sim is not None:
+            return sim
 
-        # Fallback: TF-IDF cosine similarity
-        vectorizer = TfidfVectorizer(max_features=500, stop_words='english')
+        # Fallback: lexical (hashed TF-IDF) cosine similarity
         try:
-            matrix = vectorizer.fit_transform([resume, job])
-            sim = cosine_similarity(matrix[0:1], matrix[1:2])[0][0]
-            return float(max(0, min(1, sim)))
+            return self.lexical_index.similarity(resume, job)
         except Exception:
             return 0.0
 
     def compute_pair_similarity(self, text_a: str, text_b: str) -> float:
         """Symmetric similarity between two arbitrary texts (0-1)."""
-        a = (text_a or "").strip()[:5000]
-        b = (text_b or "").strip()[:5000]
+        a = (text_a or "").strip()[:self.MAX_CHARS]
+        b = (text_b or "").strip()[:self.MAX_CHARS]
         if not a or not b:
             return 0.0
-        model = self._get_model()
-        if model is not None:
-            try:
-                emb = model.encode([a, b])
-                sim = cosine_similarity([emb[0]], [emb[1]])[0][0]
-                return float(max(0, min(1, (sim + 1) / 2)))
-            except Exception:
-                pass
-        vectorizer = TfidfVectorizer(max_features=500, stop_words="english")
+        sim = self._embedded_similarity(a, b)
+        if sim is not None:
+            return sim
         try:
-            matrix = vectorizer.fit_transform([a, b])
-            sim = cosine_similarity(matrix[0:1], matrix[1:2])[0][0]
-            return float(max(0, min(1, sim)))
+            return self.lexical_index.similarity(a, b)
         except Exception:
             return 0.0
 
     def compute_role_similarity(self, resume_text: str, job_title: str) -> float:
         """Compute similarity between resume and job title/role (0-1)."""
-        resume = (resume_text or "").strip().lower()[:2000]
-        title = (job_title or "").strip().lower()
+        resume = self.role_resume_view(resume_text)
+        title = self.title_view(job_title)
         if not title:
             return 0.7
 
-        model = self._get_model()
-        if model is not None:
-            try:
-                emb = model.encode([resume, title])
-                sim = cosine_similarity([emb[0]], [emb[1]])[0][0]
-                return float(max(0, min(1, (sim + 1) / 2)))
-            except Exception:
-                pass
+        sim = self._embedded_similarity(resume, title)
+        if sim is not None:
+            return sim
 
         # Fallback: keyword overlap
         title_words = set(w for w in title.split() if len(w) > 2)
@@ -5,7 +5,9 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from .metrics import stage
 from .skill_normalizer import SkillNormalizer
+from .skill_scanner import compact_label, part_label, required_skill_scanner
 
 if TYPE_CHECKING:
     from .semantic_matcher import SemanticMatcher
@@ -16,32 +18,30 @@ def text_coverage_score(
     required_skills: list,
     normalizer: SkillNormalizer,
 ) -> float:
-    """Fraction of required skills (and aliases) found as substrings in resume text."""
+    """
+    Fraction of required skills (and aliases) mentioned in resume text.
+    One pass of the job's compiled skill scanner finds every hit.
+    """
     if not required_skills:
         return 1.0
     req_norm = normalizer.normalize_skills(required_skills)
     if not req_norm:
         return 1.0
+    with stage("skill_coverage"):
+        found = required_skill_scanner(tuple(req_norm)).scan(resume_lower)
     hits = 0
     for skill in req_norm:
-        variants = {skill, skill.replace(" ", ""), skill.replace(" ", "_")}
-        for alias, canon in normalizer.SKILL_MAP.items():
-            if canon == skill:
-                variants.add(alias)
-                variants.add(alias.replace(" ", ""))
-        if any(len(v) > 1 and v in resume_lower for v in variants):
+        if skill in found:
             hits += 1
             continue
         parts = skill.split()
-        if len(parts) > 1 and all(len(p) > 2 and p in resume_lower for p in parts):
+        if len(parts) > 1 and all(len(p) > 2 and part_label(p) in found for p in parts):
             hits += 1
             continue
         # Two-word stacks often abbreviated in CVs (e.g. "machine learning" → "ml" covered by aliases;
         # this catches cases where JD uses two tokens and CV uses a compact form).
-        if len(parts) == 2 and len(parts[0]) > 2 and len(parts[1]) > 2:
-            compact = (parts[0][0] + parts[1][0]).lower()
-            if len(compact) == 2 and compact in resume_lower.replace(" ", ""):
-                hits += 1
+        if compact_label(skill) in found:
+            hits += 1
     return min(1.0, hits / len(req_norm))
 
 
@@ -54,14 +54,19 @@ def semantic_skill_alignment(
     """Embedding alignment between resume and a synthesized skills phrase."""
     if not required_skills:
         return 1.0
+    blob = skill_blob(required_skills, normalizer)
+    if not blob.strip():
+        return 1.0
+    return matcher.compute_pair_similarity(resume_text, blob)
+
+
+def skill_blob(required_skills: list, normalizer: SkillNormalizer | None = None) -> str:
+    """Synthesized skills phrase embedded against the resume."""
     if normalizer is not None:
         skills = normalizer.normalize_skills(required_skills)
     else:
         skills = [str(s).strip().lower() for s in required_skills if s]
-    blob = "Required technical skills: " + ", ".join(skills[:40])
-    if not blob.strip():
-        return 1.0
-    return matcher.compute_pair_similarity(resume_text, blob)
+    return "Required technical skills: " + ", ".join(skills[:40])
 
 
 def blend_skill_match(
@@ -67,6 +67,26 @@ class SkillNormalizer:
         "data structure": "data structures and algorithms",
     }
 
+    # Surface forms ResumeParser recognizes in resume text (matched on token boundaries).
+    SKILL_TERMS = (
+        "python", "java", "javascript", "js", "typescript", "ts", "react", "reactjs", "react.js",
+        "node.js", "nodejs", "node", "express", "nest.js", "nestjs", "angular", "vue.js", "vuejs",
+        "vue", "next.js", "nextjs", "nuxt",
+        "c++", "cpp", "c#", ".net", "dotnet", "go", "golang", "rust", "kotlin", "swift", "scala",
+        "ruby", "rails", "php", "laravel",
+        "sql", "postgres", "postgresql", "mysql", "sqlite", "redis", "elasticsearch", "mongodb",
+        "mongo", "dynamodb",
+        "aws", "gcp", "azure", "docker", "kubernetes", "k8s", "terraform", "ansible", "jenkins",
+        "fastapi", "django", "flask", "spring", "spring boot", "hibernate", "graphql", "grpc",
+        "kafka", "rabbitmq",
+        "html", "css", "tailwind", "sass", "webpack", "vite", "pandas", "numpy", "scikit",
+        "tensorflow", "pytorch", "keras",
+        "opencv", "nlp", "natural language", "computer vision", "spark", "airflow", "dbt",
+        "snowflake", "bigquery",
+        "machine learning", "deep learning", "data science", "git", "linux", "bash", "powershell",
+        "unit test", "pytest",
+    )
+
     def normalize_skill(self, value: str) -> str:
         if not value:
             return ""
@@ -0,0 +1,141 @@
+"""
+Compiled single-pass skill matcher.
+A scanner's surface terms (parser vocabulary, or one job's required-skill variants) are
+folded into one trie-shaped regex, so finding every skill mention costs one scan over the
+text regardless of how many skills or aliases are being looked for. Coverage scanners also
+keep a short list of per-job substring variants, built once per required-skill set.
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Iterator, Mapping, Optional, Set, Tuple
+
+from .skill_normalizer import SkillNormalizer
+
+# Terms match on token boundaries; '+', '#' and '.' are part of terms (c++, c#, .net, node.js).
+_BOUNDARY_BEFORE = r"(?<![a-z0-9_])"
+_BOUNDARY_AFTER = r"(?![a-z0-9_])"
+_NEVER = r"(?!x)x"
+
+
+def trie_pattern(terms: Iterable[str]) -> str:
+    """Regex alternation shaped as a trie; greedy optional tails prefer the longest term."""
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if "" in node:
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class SkillScanner:
+    """
+    Maps lowercase surface terms to labels (canonical skills) and finds them in a text.
+
+    By default terms match on token boundaries and the longest term wins. With
+    substring_min_len, terms at least that long match anywhere in the text
+    ("sql" in "postgresql", "java" in "java8"), overlapping hits included;
+    shorter terms keep the boundary guards ("go" not in "google").
+    """
+
+    def __init__(self, terms: Mapping[str, Iterable[str]], substring_min_len: Optional[int] = None):
+        self.terms: Dict[str, FrozenSet[str]] = {
+            surface: frozenset(labels) for surface, labels in terms.items() if surface
+        }
+        loose = {
+            s for s in self.terms if substring_min_len is not None and len(s) >= substring_min_len
+        }
+        bounded = [s for s in self.terms if s not in loose]
+        pattern = trie_pattern(bounded) or _NEVER
+        self._regex = re.compile(_BOUNDARY_BEFORE + "(" + pattern + ")" + _BOUNDARY_AFTER)
+        # scan() form: leading with a class of first characters lets the regex engine skip
+        # offsets that cannot start a term; the guards and the term sit in a lookbehind.
+        starts = "".join(sorted({s[0] for s in bounded}))
+        self._scan_regex = re.compile(
+            "[" + re.escape(starts) + "](?<=" + _BOUNDARY_BEFORE + "(?=(" + pattern + ")" + _BOUNDARY_AFTER + ").)",
+            re.DOTALL,
+        ) if bounded else None
+        # Checked with `in`: for the few dozen variants of one job, C substring search is far
+        # cheaper than a regex that has to be retried at every offset to see overlapping hits.
+        self._substring_terms = sorted(loose)
+
+    def surfaces(self, text_lower: str, pos: int = 0, endpos: Optional[int] = None) -> Iterator[str]:
+        """Boundary-matched surface terms in text order, optionally within text_lower[pos:endpos] without slicing."""
+        text_lower = text_lower or ""
+        for m in self._regex.finditer(text_lower, pos, len(text_lower) if endpos is None else endpos):
+            yield m.group(1)
+
+    def scan(self, text_lower: str) -> Set[str]:
+        """Every label hit in the text."""
+        text_lower = text_lower or ""
+        hits: Set[str] = set()
+        if self._scan_regex is not None:
+            for surface in set(self._scan_regex.findall(text_lower)):
+                hits |= self.terms[surface]
+        for surface in self._substring_terms:
+            if surface in text_lower:
+                hits |= self.terms[surface]
+        return hits
+
+
+@lru_cache(maxsize=1)
+def vocabulary_skill_scanner() -> SkillScanner:
+    """
+    Scanner over the parser vocabulary only, so an alias that contains a
+    vocabulary term ("scikit learn", "go lang") cannot take the longest match
+    and hide that term from resume skill extraction.
+    """
+    normalizer = SkillNormalizer()
+    return SkillScanner({term: {normalizer.normalize_skill(term)} for term in SkillNormalizer.SKILL_TERMS})
+
+
+def part_label(part: str) -> str:
+    return "part:" + part
+
+
+def compact_label(skill: str) -> str:
+    return "compact:" + skill
+
+
+# Variants shorter than this only match as whole tokens ("ts" is not in "projects").
+_SUBSTRING_MIN_LEN = 3
+
+
+@lru_cache(maxsize=256)
+def required_skill_scanner(required: Tuple[str, ...]) -> SkillScanner:
+    """
+    Scanner over the variants coverage scoring looks for, and nothing else:
+    each normalized required skill's spacing variants and aliases, the words of
+    multi-word skills, and two-letter compact forms ("machine learning" -> "ml").
+    Variants of three or more characters match as substrings like the original
+    per-skill `in` checks; shorter ones need token boundaries.
+    """
+    terms: Dict[str, Set[str]] = {}
+    for skill in required:
+        variants = {skill, skill.replace(" ", ""), skill.replace(" ", "_")}
+        for alias, canon in SkillNormalizer.SKILL_MAP.items():
+            if canon == skill:
+                variants.update((alias, alias.replace(" ", "")))
+        for variant in variants:
+            if len(variant) > 1:
+                terms.setdefault(variant, set()).add(skill)
+        parts = skill.split()
+        if len(parts) > 1:
+            for p in parts:
+                if len(p) > 2:
+                    terms.setdefault(p, set()).add(part_label(p))
+        if len(parts) == 2 and len(parts[0]) > 2 and len(parts[1]) > 2:
+            terms.setdefault(parts[0][0] + parts[1][0], set()).add(compact_label(skill))
+    return SkillScanner(terms, substring_min_len=_SUBSTRING_MIN_LEN)
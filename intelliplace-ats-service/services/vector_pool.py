@@ -0,0 +1,165 @@
+"""
+Compact storage for fixed-size embeddings.
+
+Vectors live in contiguous fixed-size blocks of codes (float32, float16 or int8)
+with one float32 scale per row, instead of one ndarray object per vector. For
+float16/int8 the scales make each dequantized row unit norm, so a dot product
+against a normalized query is already the cosine similarity. The kernels apply
+the scale after the dot product and never build dequantized copies of the pool.
+"""
+from __future__ import annotations
+
+import threading
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+
+def quantize(vectors: np.ndarray, dtype: str):
+    """
+    (codes, scales) for a 2-D float array. Quantized rows are rescaled so that
+    codes * scales[:, None] has unit norm; float32 rows are kept as given.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dtype == "int8":
+        peak = np.max(np.abs(vectors), axis=1)
+        codes = np.rint(vectors * (127.0 / np.maximum(peak, 1e-12))[:, None]).astype(np.int8)
+    elif dtype == "float16":
+        codes = vectors.astype(np.float16)
+    else:
+        return vectors.copy(), np.ones(len(vectors), dtype=np.float32)
+    norms = np.linalg.norm(codes.astype(np.float32), axis=1)
+    scales = (1.0 / np.maximum(norms, 1e-12)).astype(np.float32)
+    return codes, scales
+
+
+# float16 rows are widened to float32 this many at a time, so the scratch stays in cache.
+_WIDEN_ROWS = 256
+# float16 bits moved into a float32 (sign to bit 31, the rest shifted left by 13)
+# encode the value times 2**-112 exactly, subnormals included.
+_HALF_SHIFT_SCALE = np.float32(2.0 ** 112)
+
+
+def _dot(codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    codes @ query in float32 without a float32 copy of the block. int8 codes go
+    through einsum, which casts in small internal buffers. numpy's float16 cast is
+    a scalar loop, so float16 rows are widened with integer ops into a reused
+    chunk and multiplied by a query carrying the 2**112 factor.
+    """
+    if codes.dtype == np.float32:
+        return codes @ query
+    if codes.dtype == np.int8:
+        return np.einsum("ij,j->i", codes, query, dtype=np.float32)
+    halves = codes.view(np.uint16)
+    scaled = query * _HALF_SHIFT_SCALE
+    out = np.empty(len(codes), dtype=np.float32)
+    bits = np.empty((min(len(codes), _WIDEN_ROWS), codes.shape[1]), dtype=np.uint32)
+    sign = np.empty_like(bits)
+    for start in range(0, len(codes), _WIDEN_ROWS):
+        chunk = halves[start:start + _WIDEN_ROWS]
+        b, s = bits[:len(chunk)], sign[:len(chunk)]
+        np.copyto(b, chunk)
+        np.bitwise_and(b, 0x8000, out=s)
+        np.bitwise_xor(b, s, out=b)
+        np.left_shift(b, 13, out=b)
+        np.left_shift(s, 16, out=s)
+        np.bitwise_or(b, s, out=b)
+        np.dot(b.view(np.float32), scaled, out=out[start:start + len(chunk)])
+    return out
+
+
+class VectorPool:
+    """Slot-addressed vectors in contiguous quantized blocks; freed slots are reused."""
+
+    BLOCK_ROWS = 4096
+
+    def __init__(self, dim: int, dtype: str = "float32", block_rows: Optional[int] = None):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported embedding dtype {dtype!r}; expected one of {sorted(DTYPES)}")
+        self.dim = int(dim)
+        self.dtype = dtype
+        self.block_rows = int(block_rows or self.BLOCK_ROWS)
+        self._codes: List[np.ndarray] = []
+        self._scales: List[np.ndarray] = []
+        self._free: List[int] = []
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._next - len(self._free)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the allocated blocks (codes plus scales)."""
+        return sum(c.nbytes + s.nbytes for c, s in zip(self._codes, self._scales))
+
+    def _locate(self, slot: int):
+        return divmod(slot, self.block_rows)
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        slot = self._next
+        if slot >= len(self._codes) * self.block_rows:
+            self._codes.append(np.zeros((self.block_rows, self.dim), dtype=DTYPES[self.dtype]))
+            self._scales.append(np.zeros(self.block_rows, dtype=np.float32))
+        self._next += 1
+        return slot
+
+    def add_many(self, vectors: np.ndarray) -> List[int]:
+        codes, scales = quantize(np.atleast_2d(vectors), self.dtype)
+        with self._lock:
+            slots = [self._allocate() for _ in range(len(codes))]
+            for slot, code, scale in zip(slots, codes, scales):
+                block, row = self._locate(slot)
+                self._codes[block][row] = code
+                self._scales[block][row] = scale
+        return slots
+
+    def add(self, vector: np.ndarray) -> int:
+        return self.add_many(vector)[0]
+
+    def free(self, slot: int) -> None:
+        with self._lock:
+            block, row = self._locate(slot)
+            self._scales[block][row] = 0.0
+            self._free.append(slot)
+
+    def get(self, slot: int) -> np.ndarray:
+        """Dequantized float32 copy of one vector."""
+        block, row = self._locate(slot)
+        return self._codes[block][row].astype(np.float32) * self._scales[block][row]
+
+    def get_many(self, slots: Sequence[int]) -> np.ndarray:
+        if not len(slots):
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([self.get(slot) for slot in slots])
+
+    def cosine_many(self, query: np.ndarray, slots: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        Cosine similarity of a normalized float32 query against the given slots
+        (every allocated slot when None; freed slots score 0). One matrix-vector
+        product per block, scaled per row afterwards.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        if slots is None:
+            out = []
+            remaining = self._next
+            for codes, scales in zip(self._codes, self._scales):
+                rows = min(remaining, self.block_rows)
+                if rows <= 0:
+                    break
+                out.append(_dot(codes[:rows], query) * scales[:rows])
+                remaining -= rows
+            return np.concatenate(out) if out else np.zeros(0, dtype=np.float32)
+        slots = np.asarray(slots, dtype=np.int64)
+        out = np.empty(len(slots), dtype=np.float32)
+        blocks, rows = np.divmod(slots, self.block_rows)
+        for block in np.unique(blocks):
+            mask = blocks == block
+            picked = rows[mask]
+            out[mask] = _dot(self._codes[block][picked], query) * self._scales[block][picked]
+        return out
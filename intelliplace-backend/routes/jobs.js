@@ -1708,7 +1708,9 @@ router.post('/:jobId/shortlist-ats', authenticateToken, authorizeCompany, async
           candidate_backlogs: typeof appBacklog === 'number' ? appBacklog : null,
           allow_backlogs: job.allowBacklog === true,
           max_backlogs: typeof job.maxBacklog === 'number' ? job.maxBacklog : null,
-          use_gemini_rerank: true
+          use_gemini_rerank: true,
+          // Only the score, decision and explanation headline are used below.
+          compact: true
         };
 
         const atsResponse = await axios.post(